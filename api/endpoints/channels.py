@@ -0,0 +1,37 @@
+# api/endpoints/channels.py
+from fastapi import APIRouter
+from infrastructure.config.di import (
+    get_channel_sender_stats,
+    get_message_queue_stats,
+    get_webhook_dedup_stats,
+    get_burst_stats
+)
+
+router = APIRouter(tags=["Channels"])
+
+
+@router.get("/channels/senders/stats")
+async def channel_sender_stats():
+    """Envíos, reintentos, 429 recibidos, pendientes y latencia por canal de salida"""
+    return get_channel_sender_stats()
+
+
+@router.get("/channels/webhook-queue/stats")
+async def webhook_queue_stats():
+    """Profundidad de la cola, uso de los workers y latencia desde el encolado hasta la respuesta"""
+    stats = await get_message_queue_stats()
+    return stats if stats else {"enabled": False}
+
+
+@router.get("/channels/webhook-dedup/stats")
+async def webhook_dedup_stats():
+    """Entregas nuevas y duplicadas (reintentos de Twilio/Telegram respondidos sin reprocesar)"""
+    stats = get_webhook_dedup_stats()
+    return stats if stats else {"enabled": False}
+
+
+@router.get("/channels/bursts/stats")
+async def burst_stats():
+    """Ráfagas de mensajes agrupadas y ejecuciones del pipeline ahorradas"""
+    stats = get_burst_stats()
+    return stats if stats else {"enabled": False}
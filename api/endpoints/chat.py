@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket
 from infrastructure.adapters.inbound.websocket_adapter import WebSocketAdapter
 from infrastructure.adapters.inbound.twilio_adapter import TwilioWhatsAppAdapter
 from infrastructure.adapters.inbound.telegram_adapter import TelegramAdapter
+from infrastructure.queue import QueueFull
 import json
 from fastapi import Query
 
@@ -36,6 +37,12 @@ async def websocket_endpoint(
             if 'metadata' not in data or data['metadata'] is None:
                 data['metadata'] = {}
 
+            # 2a. Modo streaming ({"stream": true}): un evento por fragmento del LLM
+            if data.get('stream'):
+                async for event in adapter._stream_message(json.dumps(data)):
+                    await websocket.send_json(event)
+                continue
+
             # 2. Procesa usando el mismo adapter
             response = await adapter._process_message(json.dumps(data))
             logger.info(f"response : {response}")
@@ -69,6 +76,8 @@ async def twilio_webhook(
         logger.info(f"Twilio webhook - Business: {business_id}, whatsapp_from: {whatsapp_from}")
 
         return await adapter.handle_webhook(form_data, business_id=business_id, whatsapp_from=whatsapp_from)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Twilio error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -98,6 +107,12 @@ async def telegram_webhook(
             content=result
         )
         
+    except QueueFull as e:
+        logger.error(f"Telegram webhook rechazado: {str(e)}")
+        return JSONResponse(
+            status_code=503,
+            content={"status": "error", "message": str(e)}
+        )
     except Exception as e:
         logger.error(f"Telegram webhook error: {str(e)}")
         return JSONResponse(
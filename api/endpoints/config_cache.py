@@ -0,0 +1,71 @@
+# api/endpoints/config_cache.py
+import hmac
+import os
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel
+from infrastructure.adapters.outbound import CachedConfigLoaderAdapter
+from core.ports.outbound import IAnswerCachePort
+from infrastructure.config.di import get_config_cache, get_answer_cache, get_django_config_stats
+
+router = APIRouter(tags=["Config Cache"])
+logger = logging.getLogger(__name__)
+
+
+class ConfigInvalidationRequest(BaseModel):
+    business_id: str
+    # bot_config, bot_template, chunk_settings; vacío = todos
+    resources: Optional[List[str]] = None
+    # True: recarga las entradas de inmediato; False: solo las elimina
+    refresh: bool = False
+
+
+def verify_invalidation_token(
+    x_invalidation_token: Optional[str] = Header(None)
+) -> None:
+    """Valida el token compartido con Django (CONFIG_CACHE_INVALIDATION_TOKEN)"""
+    expected = os.getenv("CONFIG_CACHE_INVALIDATION_TOKEN")
+    if not expected:
+        # Sin token configurado el endpoint queda cerrado, no abierto a cualquiera
+        logger.error("CONFIG_CACHE_INVALIDATION_TOKEN no configurado: se rechaza la petición")
+        raise HTTPException(status_code=503, detail="Endpoint no configurado")
+    if not x_invalidation_token or not hmac.compare_digest(x_invalidation_token, expected):
+        raise HTTPException(status_code=401, detail="Token de invalidación inválido")
+
+
+@router.post("/config-cache/invalidate", dependencies=[Depends(verify_invalidation_token)])
+async def invalidate_config_cache(
+    payload: ConfigInvalidationRequest,
+    cache: CachedConfigLoaderAdapter = Depends(get_config_cache),
+    answer_cache: Optional[IAnswerCachePort] = Depends(get_answer_cache)
+):
+    """
+    Llamado por Django al editar la configuración o las plantillas de un negocio.
+    Body esperado: {"business_id": "...", "resources": ["bot_template"], "refresh": true}
+    """
+    try:
+        result = await cache.invalidate_business(
+            payload.business_id,
+            resources=payload.resources,
+            refresh=payload.refresh
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Las respuestas cacheadas dependen de la configuración y la plantilla
+    if answer_cache and (not payload.resources or {"bot_config", "bot_template"} & set(payload.resources)):
+        await answer_cache.invalidate(payload.business_id)
+
+    return {"status": "success", "business_id": payload.business_id, **result}
+
+
+@router.get("/config-cache/stats", dependencies=[Depends(verify_invalidation_token)])
+async def config_cache_stats(
+    cache: CachedConfigLoaderAdapter = Depends(get_config_cache)
+):
+    """Contadores de la caché de configuración y de las revalidaciones con Django"""
+    return {
+        **cache.stats(),
+        **get_django_config_stats()
+    }
@@ -0,0 +1,33 @@
+# api/endpoints/database.py
+from fastapi import APIRouter
+from infrastructure.config.database import REPOSITORY_BACKEND
+from infrastructure.config.di import (
+    get_db_executor_stats,
+    get_identity_cache,
+    get_message_writer_stats
+)
+
+router = APIRouter(tags=["Database"])
+
+
+@router.get("/database/executor/stats")
+async def database_executor_stats():
+    """Profundidad de cola y tiempos de espera del pool de hilos de la DB (REPOSITORY_BACKEND=threaded)"""
+    return {
+        "backend": REPOSITORY_BACKEND,
+        "executor": get_db_executor_stats()
+    }
+
+
+@router.get("/database/identity-cache/stats")
+async def identity_cache_stats():
+    """Aciertos de la caché de usuarios y conversaciones activas"""
+    cache = get_identity_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
+@router.get("/database/message-writer/stats")
+async def message_writer_stats():
+    """Tamaño del buffer y lotes escritos de la escritura diferida de mensajes"""
+    stats = get_message_writer_stats()
+    return stats if stats else {"enabled": False}
@@ -0,0 +1,65 @@
+# api/endpoints/history.py
+import hmac
+import os
+import logging
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from core.domain.entities import MessagePage
+from core.ports.inbound import IConversationHistoryPort
+from infrastructure.config.di import get_history_use_case
+
+router = APIRouter(tags=["History"])
+logger = logging.getLogger(__name__)
+
+
+def verify_history_token(
+    x_history_token: Optional[str] = Header(None)
+) -> None:
+    """Valida el token de los servicios internos que leen el historial (HISTORY_API_TOKEN)"""
+    expected = os.getenv("HISTORY_API_TOKEN")
+    if not expected:
+        # Sin token configurado el endpoint queda cerrado, no abierto a cualquiera
+        logger.error("HISTORY_API_TOKEN no configurado: se rechaza la petición")
+        raise HTTPException(status_code=503, detail="Endpoint no configurado")
+    if not x_history_token or not hmac.compare_digest(x_history_token, expected):
+        raise HTTPException(status_code=401, detail="Token de historial inválido")
+
+
+@router.get(
+    "/conversations/{conversation_id}/messages",
+    response_model=MessagePage,
+    dependencies=[Depends(verify_history_token)]
+)
+async def conversation_messages(
+    conversation_id: UUID,
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    limit: int = Query(50, ge=1, le=200),
+    history: IConversationHistoryPort = Depends(get_history_use_case)
+):
+    """Historial de una conversación por páginas (orden cronológico)"""
+    try:
+        return await history.get_page(conversation_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get(
+    "/conversations/{conversation_id}/messages/export",
+    dependencies=[Depends(verify_history_token)]
+)
+async def export_conversation_messages(
+    conversation_id: UUID,
+    history: IConversationHistoryPort = Depends(get_history_use_case)
+):
+    """Exporta la conversación completa como NDJSON (un mensaje por línea) sin cargarla en memoria"""
+    async def lines():
+        async for message in history.export(conversation_id):
+            yield message.json() + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="conversation-{conversation_id}.ndjson"'}
+    )
@@ -0,0 +1,11 @@
+# api/endpoints/resilience.py
+from fastapi import APIRouter
+from infrastructure.config.di import get_resilience_stats
+
+router = APIRouter(tags=["Resilience"])
+
+
+@router.get("/resilience/stats")
+async def resilience_stats():
+    """Estado del circuit breaker, p95 y tasa de acierto del hedging por servicio externo"""
+    return get_resilience_stats()
@@ -1,10 +1,12 @@
 # core/domain/entities/__init__.py
 from .conversation import Conversation
 from .end_user import EndUser
-from .message import Message
+from .message import Message, MessageChunk, MessagePage
 
 __all__ = [
     'Conversation',
     'EndUser',
-    'Message'
+    'Message',
+    'MessageChunk',
+    'MessagePage'
 ]
\ No newline at end of file
@@ -2,7 +2,8 @@
 from pydantic import BaseModel, UUID4,Field,validator
 from datetime import datetime
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from uuid import UUID, uuid5
 
 class SenderType(str, Enum):
     USER = "user"
@@ -24,5 +25,23 @@ class Message(BaseModel):
             return None
         return v if isinstance(v, dict) else None
 
+    @staticmethod
+    def derived_id(base: UUID, name: str) -> UUID:
+        """Id determinista a partir de otro (uuid5 con formato UUID4, que exige `id`)"""
+        return UUID(bytes=uuid5(base, name).bytes, version=4)
+
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class MessageChunk(BaseModel):
+    """Fragmento de una respuesta en streaming; el último trae el Message guardado"""
+    end_user_id: UUID4
+    conversation_id: UUID4
+    delta: str = ""
+    is_final: bool = False
+    message: Optional[Message] = None
+
+class MessagePage(BaseModel):
+    """Página del historial; next_cursor es None en la última"""
+    messages: List[Message]
+    next_cursor: Optional[str] = None
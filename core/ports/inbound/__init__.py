@@ -1,6 +1,8 @@
 # core/ports/inbound/__init__.py
 from .message_receiver import IMessageReceiverPort
+from .conversation_history import IConversationHistoryPort
 
 __all__ = [
-    'IMessageReceiverPort'
+    'IMessageReceiverPort',
+    'IConversationHistoryPort'
 ]
\ No newline at end of file
@@ -0,0 +1,21 @@
+#core/ports/inbound/conversation_history.py
+from abc import ABC, abstractmethod
+from core.domain.entities import Message, MessagePage
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+class IConversationHistoryPort(ABC):
+    @abstractmethod
+    async def get_page(
+        self,
+        conversation_id: UUID,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> MessagePage:
+        """Página del historial a partir de `cursor` (el next_cursor de la página anterior)"""
+        pass
+
+    @abstractmethod
+    def export(self, conversation_id: UUID) -> AsyncIterator[Message]:
+        """Todos los mensajes de la conversación en orden, con memoria constante"""
+        pass
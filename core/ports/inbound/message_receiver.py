@@ -1,7 +1,8 @@
 #core/ports/inbound/mesagge_receiver.py
 from abc import ABC, abstractmethod
-from core.domain.entities import Message, Conversation, EndUser
-from typing import Tuple
+from core.domain.entities import Message, MessageChunk, Conversation, EndUser
+from typing import AsyncIterator, Optional, Tuple
+from uuid import UUID
 
 class IMessageReceiverPort(ABC):
     @abstractmethod
@@ -11,7 +12,26 @@ class IMessageReceiverPort(ABC):
         external_id: str,
         business_id: str,
         message_content: str,
+        metadata: dict = {},
+        coalesce_burst: bool = False,
+        message_id: Optional[UUID] = None
+    ) -> Tuple[EndUser, Conversation, Optional[Message]]:
+        """
+        Procesa un nuevo mensaje de cualquier canal. Con coalesce_burst los mensajes
+        seguidos de la conversación se responden juntos: los que no cierran la ráfaga
+        devuelven None como respuesta. Un message_id fijo hace idempotente el
+        reintento de un mismo mensaje
+        """
+        pass
+
+    @abstractmethod
+    def stream_new_message(
+        self,
+        channel: str,
+        external_id: str,
+        business_id: str,
+        message_content: str,
         metadata: dict = {}
-    ) -> Tuple[EndUser, Conversation, Message]:
-        """Procesa un nuevo mensaje de cualquier canal"""
+    ) -> AsyncIterator[MessageChunk]:
+        """Igual que handle_new_message pero entrega la respuesta por fragmentos"""
         pass
@@ -6,6 +6,9 @@ from .llm_client import ILLMClientPort
 from .repositories import IEndUserRepository
 from .repositories import IConversationRepository
 from .repositories import IMessageRepository
+from .repositories import IUnitOfWork
+from .answer_cache import IAnswerCachePort, CachedAnswer
+from .channel_sender import IChannelSenderPort
 
 __all__ = [
     'IConfigLoaderPort',
@@ -14,5 +17,9 @@ __all__ = [
     'ILLMClientPort',
     'IEndUserRepository',
     'IConversationRepository',
-    'IMessageRepository'
+    'IMessageRepository',
+    'IUnitOfWork',
+    'IAnswerCachePort',
+    'CachedAnswer',
+    'IChannelSenderPort'
 ]
\ No newline at end of file
@@ -0,0 +1,35 @@
+#core/ports/outbound/answer_cache.py
+
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from pydantic import BaseModel
+
+class CachedAnswer(BaseModel):
+    content: str
+    similarity: float
+
+class IAnswerCachePort(ABC):
+    @abstractmethod
+    async def lookup(
+        self,
+        business_id: str,
+        vector: List[float],
+        version: str,
+        min_similarity: Optional[float] = None
+    ) -> Optional[CachedAnswer]:
+        """Return a previous answer to a semantically equivalent question, if any"""
+
+    @abstractmethod
+    async def store(
+        self,
+        business_id: str,
+        vector: List[float],
+        answer: str,
+        version: str,
+        generation_seconds: float
+    ) -> None:
+        """Store a generated answer with the config/template version it was built with"""
+
+    @abstractmethod
+    async def invalidate(self, business_id: str) -> None:
+        """Drop every cached answer of a business"""
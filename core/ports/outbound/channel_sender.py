@@ -0,0 +1,27 @@
+#core/ports/outbound/channel_sender.py
+
+from abc import ABC, abstractmethod
+from typing import Optional
+
+class IChannelSenderPort(ABC):
+    """Envío de respuestas por un canal de mensajería (WhatsApp, Telegram)"""
+
+    @abstractmethod
+    async def send(
+        self,
+        business_id: str,
+        recipient: str,
+        text: str,
+        sender: Optional[str] = None
+    ) -> bool:
+        """Envía el mensaje y espera la confirmación de la plataforma"""
+
+    @abstractmethod
+    def dispatch(
+        self,
+        business_id: str,
+        recipient: str,
+        text: str,
+        sender: Optional[str] = None
+    ) -> None:
+        """Programa el envío en segundo plano sin esperar a la plataforma"""
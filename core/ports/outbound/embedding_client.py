@@ -1,5 +1,6 @@
 #core/ports/outbound/embedding_client.py
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List
 
@@ -10,4 +11,14 @@ class IEmbeddingClientPort(ABC):
         text: str, 
         model_name: str
         ) -> List[float]:
-        """Vectorize text using embedding model"""
\ No newline at end of file
+        """Vectorize text using embedding model"""
+
+    async def vectorize_texts(
+        self,
+        texts: List[str],
+        model_name: str
+        ) -> List[List[float]]:
+        """Vectorize several texts; returns one vector per text, in order"""
+        return list(await asyncio.gather(
+            *[self.vectorize_text(text, model_name) for text in texts]
+        ))
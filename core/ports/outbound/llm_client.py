@@ -1,7 +1,7 @@
 #core/ports/outbound/llm_client.py
 
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import AsyncIterator, Dict
 
 class ILLMClientPort(ABC):
     @abstractmethod
@@ -14,4 +14,23 @@ class ILLMClientPort(ABC):
         frequency_penalty: float,
         presence_penalty: float
     ) -> str:
-        """Generate response using LLM"""
\ No newline at end of file
+        """Generate response using LLM"""
+
+    async def stream_response(
+        self,
+        prompt: str,
+        model_name: str,
+        temperature: float,
+        top_p: float,
+        frequency_penalty: float,
+        presence_penalty: float
+    ) -> AsyncIterator[str]:
+        """Stream the response as content deltas; by default yields the full response once"""
+        yield await self.generate_response(
+            prompt=prompt,
+            model_name=model_name,
+            temperature=temperature,
+            top_p=top_p,
+            frequency_penalty=frequency_penalty,
+            presence_penalty=presence_penalty
+        )
@@ -1,7 +1,8 @@
 #core/ports/outbound/repositories.py
 from abc import ABC, abstractmethod
 from core.domain.entities import EndUser, Conversation, Message
-from typing import Optional,List
+from datetime import datetime
+from typing import AsyncContextManager, AsyncIterator, Optional, List, Tuple
 from uuid import UUID
 
 class IEndUserRepository(ABC):
@@ -18,6 +19,17 @@ class IEndUserRepository(ABC):
     async def create(self, end_user: EndUser) -> EndUser:
         pass
 
+    async def get_or_create(self, end_user: EndUser) -> EndUser:
+        """
+        Devuelve el usuario con la misma identidad (business_id, channel, external_id)
+        o crea `end_user`. Las implementaciones sobre base de datos lo hacen en una sola
+        sentencia atómica; esta versión por defecto consulta y luego crea.
+        """
+        existing = await self.get_by_external_id(
+            end_user.external_id, end_user.channel, str(end_user.business_id)
+        )
+        return existing or await self.create(end_user)
+
 class IConversationRepository(ABC):
     @abstractmethod
     async def get_active_by_user(
@@ -31,6 +43,21 @@ class IConversationRepository(ABC):
     @abstractmethod
     async def create(self, conversation: Conversation) -> Conversation:
         pass
+
+    async def get_or_create_active(
+        self,
+        conversation: Conversation,
+        threshold_minutes: int = 30
+    ) -> Conversation:
+        """
+        Devuelve la conversación activa del usuario dentro de la ventana o crea
+        `conversation`, garantizando como mucho una activa por usuario. Esta versión
+        por defecto consulta y luego crea.
+        """
+        existing = await self.get_active_by_user(
+            conversation.end_user_id, str(conversation.business_id), threshold_minutes
+        )
+        return existing or await self.create(conversation)
     
     @abstractmethod
     async def close_conversation(self, conversation_id: UUID) -> None:
@@ -41,6 +68,53 @@ class IMessageRepository(ABC):
     async def create(self, message: Message) -> Message:
         pass
 
+    async def create_many(self, messages: List[Message]) -> List[Message]:
+        """
+        Persiste un lote de mensajes. Las implementaciones sobre base de datos usan
+        un solo INSERT multi-fila; esta versión por defecto crea uno a uno.
+        """
+        return [await self.create(message) for message in messages]
+
     @abstractmethod
     async def get_by_conversation(self, conversation_id: UUID) -> List[Message]:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    async def get_page(
+        self,
+        conversation_id: UUID,
+        limit: int = 50,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[Message]:
+        """
+        Hasta `limit` mensajes de la conversación en orden (timestamp, id), a partir
+        del siguiente a `after` (paginación por keyset)
+        """
+        pass
+
+    async def stream_by_conversation(
+        self,
+        conversation_id: UUID,
+        batch_size: int = 500
+    ) -> AsyncIterator[Message]:
+        """
+        Todos los mensajes de la conversación en orden, sin cargarlos a la vez en
+        memoria. Esta versión por defecto recorre páginas por keyset.
+        """
+        after = None
+        while True:
+            page = await self.get_page(conversation_id, batch_size, after)
+            for message in page:
+                yield message
+            if len(page) < batch_size:
+                return
+            after = (page[-1].timestamp, page[-1].id)
+
+class IUnitOfWork(ABC):
+    @abstractmethod
+    def transaction(self) -> AsyncContextManager[None]:
+        """
+        Las operaciones de los repositorios dentro del bloque `async with` comparten
+        una transacción: un solo commit al salir, rollback si hay error
+        """
+        pass
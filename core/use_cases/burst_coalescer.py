@@ -0,0 +1,103 @@
+#core/use_cases/burst_coalescer.py
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional, Set
+from core.domain.entities import Message
+
+@dataclass
+class _Burst:
+    started_at: float
+    last_at: float
+    window: float
+    messages: List[Message] = field(default_factory=list)
+    version: int = 0
+    # Versiones de los mensajes cuyos llamadores siguen esperando el cierre
+    waiting: Set[int] = field(default_factory=set)
+    flushed: bool = False
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def notify(self) -> None:
+        """Despierta a los que esperan para que vuelvan a evaluar quién cierra"""
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+class BurstCoalescer:
+    """
+    Agrupa los mensajes de una conversación que llegan en ráfaga ("hola", "quería
+    saber", "el precio del plan"). La ráfaga se cierra `window` segundos después de
+    su último mensaje, o como mucho a los `max_wait` segundos del primero.
+
+    La cierra el llamador del mensaje más reciente que siga esperando: recibe todos
+    los mensajes para una sola respuesta. Los demás esperan a que se cierre y reciben
+    None; si el que iba a cerrarla se cancela, la cierra el siguiente, así que la
+    ráfaga solo se pierde si se cancelan todos sus llamadores.
+    """
+
+    def __init__(self, max_wait: float = 6.0):
+        self.max_wait = max_wait
+        self._bursts: Dict[Hashable, _Burst] = {}
+        self.bursts = 0
+        self.messages = 0
+        self.coalesced = 0
+
+    async def join(self, key: Hashable, message: Message, window: float) -> Optional[List[Message]]:
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        burst = self._bursts.get(key)
+        if burst is None:
+            burst = _Burst(started_at=now, last_at=now, window=window)
+            self._bursts[key] = burst
+        burst.messages.append(message)
+        burst.version += 1
+        version = burst.version
+        burst.waiting.add(version)
+        burst.last_at = now
+        burst.window = window
+        burst.notify()
+        self.messages += 1
+
+        try:
+            while not burst.flushed:
+                closes_at = min(burst.last_at + burst.window, burst.started_at + self.max_wait)
+                is_closer = version == max(burst.waiting)
+                if is_closer and loop.time() >= closes_at:
+                    return self._flush(key, burst)
+                changed = burst.changed
+                try:
+                    await asyncio.wait_for(
+                        changed.wait(),
+                        max(0.0, closes_at - loop.time()) if is_closer else None
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            burst.waiting.discard(version)
+            if not burst.flushed:
+                if burst.waiting:
+                    # Otro llamador sigue esperando: pasa a cerrar la ráfaga
+                    burst.notify()
+                elif self._bursts.get(key) is burst:
+                    # Nadie más la espera: se descarta para no dejarla abierta
+                    del self._bursts[key]
+            raise
+        burst.waiting.discard(version)
+        return None
+
+    def _flush(self, key: Hashable, burst: _Burst) -> List[Message]:
+        burst.flushed = True
+        burst.waiting.clear()
+        if self._bursts.get(key) is burst:
+            del self._bursts[key]
+        self.bursts += 1
+        self.coalesced += len(burst.messages) - 1
+        burst.notify()
+        return list(burst.messages)
+
+    def stats(self) -> Dict:
+        return {
+            "open_bursts": len(self._bursts),
+            "bursts": self.bursts,
+            "messages": self.messages,
+            # Ejecuciones del pipeline (y respuestas) ahorradas
+            "coalesced": self.coalesced
+        }
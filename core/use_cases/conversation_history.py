@@ -0,0 +1,64 @@
+#core/use_cases/conversation_history.py
+import base64
+import logging
+from datetime import datetime
+from uuid import UUID
+from typing import AsyncIterator, Optional, Tuple
+from core.domain.entities import Message, MessagePage
+from core.ports.inbound import IConversationHistoryPort
+from core.ports.outbound import IMessageRepository
+
+logger = logging.getLogger(__name__)
+
+def encode_cursor(message: Message) -> str:
+    """Cursor opaco con la clave (timestamp, id) del último mensaje de la página"""
+    raw = f"{message.timestamp.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, message_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), UUID(message_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
+
+class ConversationHistoryUseCase(IConversationHistoryPort):
+    """
+    Historial de una conversación por páginas (keyset sobre (timestamp, id)) o
+    completo como stream para exportaciones; en ambos casos la memoria usada no
+    depende de la longitud de la conversación.
+    """
+
+    def __init__(
+        self,
+        message_repo: IMessageRepository,
+        max_page_size: int = 200,
+        export_batch_size: int = 500
+    ):
+        self.message_repo = message_repo
+        self.max_page_size = max_page_size
+        self.export_batch_size = export_batch_size
+
+    async def get_page(
+        self,
+        conversation_id: UUID,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> MessagePage:
+        limit = max(1, min(limit, self.max_page_size))
+        after = decode_cursor(cursor) if cursor else None
+        # Un mensaje de más indica si hay página siguiente sin contar el total
+        messages = await self.message_repo.get_page(conversation_id, limit + 1, after)
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        return MessagePage(
+            messages=messages,
+            next_cursor=encode_cursor(messages[-1]) if has_more else None
+        )
+
+    async def export(self, conversation_id: UUID) -> AsyncIterator[Message]:
+        async for message in self.message_repo.stream_by_conversation(
+            conversation_id, self.export_batch_size
+        ):
+            yield message
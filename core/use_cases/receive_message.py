@@ -1,9 +1,13 @@
 #core/use_cases/receive_message.py
+import hashlib
+import json
 import logging
+import time
+from contextlib import nullcontext
 from datetime import datetime, timedelta
-from uuid import uuid4
-from typing import Tuple
-from core.domain.entities import EndUser, Conversation, Message
+from uuid import UUID, uuid4
+from typing import AsyncContextManager, AsyncIterator, Optional, Tuple
+from core.domain.entities import EndUser, Conversation, Message, MessageChunk
 from core.ports.inbound import IMessageReceiverPort
 from core.ports.outbound import (
     IConfigLoaderPort,
@@ -12,8 +16,12 @@ from core.ports.outbound import (
     ILLMClientPort,
     IEndUserRepository,
     IConversationRepository,
-    IMessageRepository
+    IMessageRepository,
+    IAnswerCachePort,
+    IUnitOfWork
 )
+from core.use_cases.stage_graph import StageGraph
+from core.use_cases.burst_coalescer import BurstCoalescer
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +34,11 @@ class ReceiveMessageUseCase(IMessageReceiverPort):
         llm_client: ILLMClientPort,
         end_user_repo: IEndUserRepository,
         conversation_repo: IConversationRepository,
-        message_repo: IMessageRepository
+        message_repo: IMessageRepository,
+        answer_cache: Optional[IAnswerCachePort] = None,
+        unit_of_work: Optional[IUnitOfWork] = None,
+        burst_coalescer: Optional[BurstCoalescer] = None,
+        debounce_seconds: float = 0.0
     ):
         self.config_loader = config_loader
         self.embedding_client = embedding_client
@@ -35,6 +47,11 @@ class ReceiveMessageUseCase(IMessageReceiverPort):
         self.end_user_repo = end_user_repo
         self.conversation_repo = conversation_repo
         self.message_repo = message_repo
+        self.answer_cache = answer_cache
+        self.unit_of_work = unit_of_work
+        # Ventana de ráfaga por defecto; cada negocio la ajusta con message_debounce_seconds
+        self.burst_coalescer = burst_coalescer
+        self.debounce_seconds = debounce_seconds
         self.logger = logging.getLogger(__name__)
         self.identified_channels = {
             'whatsapp', 
@@ -49,43 +66,154 @@ class ReceiveMessageUseCase(IMessageReceiverPort):
         external_id: str,
         business_id: str,
         message_content: str,
-        metadata: dict = {}
-    ) -> Tuple[EndUser, Conversation, Message]:
-        # 1. Get or create EndUser
-        logger.info("# 1. Get or create EndUser")
-
-        end_user = await self._get_or_create_end_user(
-            external_id, channel, business_id, metadata
+        metadata: dict = {},
+        coalesce_burst: bool = False,
+        message_id: Optional[UUID] = None
+    ) -> Tuple[EndUser, Conversation, Optional[Message]]:
+        end_user, conversation, message = await self._open_turn(
+            channel, external_id, business_id, message_content, metadata, message_id
         )
-        
-        # 2. Get or create Conversation
-        logger.info("#2. Get or create Conversation")
 
-        conversation = await self._get_or_create_conversation(
-            end_user.id, business_id, channel
-        )
-        
-        # 3. Create and save Message
-        logger.info("3. Create and save Message")
-
-        message = Message(
-            id=uuid4(),
-            conversation_id=conversation.id,
-            sender_type="user",
-            content=message_content,
-            timestamp=datetime.utcnow(),
-            metadata=metadata
-        )
-        await self.message_repo.create(message)
+        extra_metadata = None
+        window = await self._debounce_window(business_id) if coalesce_burst else 0.0
+        if window > 0:
+            burst = await self.burst_coalescer.join(conversation.id, message, window)
+            if burst is None:
+                # Un mensaje posterior de la ráfaga genera la respuesta de todos
+                logger.info(f"Mensaje agrupado en una ráfaga de la conversación {conversation.id}")
+                return end_user, conversation, None
+            if len(burst) > 1:
+                message = message.copy(update={"content": "\n".join(m.content for m in burst)})
+                extra_metadata = {"burst": {"message_ids": [str(m.id) for m in burst]}}
         
         # 4. Process message and generate response
         logger.info("4. Process message and generate response")
-        message=await self._process_message(message, business_id)
+        message=await self._process_message(message, business_id, extra_metadata)
 
         logger.info("return end_user, conversation, message")
         #logger.info(f"message: {message}")
 
         return end_user, conversation, message
+
+    async def stream_new_message(
+        self,
+        channel: str,
+        external_id: str,
+        business_id: str,
+        message_content: str,
+        metadata: dict = {}
+    ) -> AsyncIterator[MessageChunk]:
+        """
+        Variante en streaming: entrega los fragmentos del LLM a medida que llegan y un
+        último fragmento (is_final) con el Message del bot, que se guarda una sola vez
+        al completar la respuesta.
+        """
+        end_user, conversation, message = await self._open_turn(
+            channel, external_id, business_id, message_content, metadata
+        )
+
+        logger.info("4. Process message and stream response")
+        try:
+            results = await self._build_pipeline(message, business_id).run()
+            bot_config, template, cached = results["bot_config"], results["template"], results["cached"]
+
+            if cached:
+                yield MessageChunk(
+                    end_user_id=end_user.id,
+                    conversation_id=conversation.id,
+                    delta=cached.content
+                )
+                response = cached.content
+            else:
+                generation_started = time.perf_counter()
+                parts = []
+                async for delta in self.llm_client.stream_response(
+                    **self._llm_params(message.content, bot_config, template, results["context"])
+                ):
+                    if not delta:
+                        continue
+                    parts.append(delta)
+                    yield MessageChunk(
+                        end_user_id=end_user.id,
+                        conversation_id=conversation.id,
+                        delta=delta
+                    )
+                response = "".join(parts)
+                await self._store_cached_answer(
+                    business_id, bot_config, template, results["vector"], response,
+                    time.perf_counter() - generation_started
+                )
+
+            bot_message = await self._save_bot_message(
+                message,
+                response,
+                metadata={"answer_cache": {"similarity": cached.similarity}} if cached else None
+            )
+        except Exception as e:
+            self.logger.error(f"Error streaming message: {str(e)}")
+            raise
+
+        yield MessageChunk(
+            end_user_id=end_user.id,
+            conversation_id=conversation.id,
+            is_final=True,
+            message=bot_message
+        )
+
+    async def _open_turn(
+        self,
+        channel: str,
+        external_id: str,
+        business_id: str,
+        message_content: str,
+        metadata: dict,
+        message_id: Optional[UUID] = None
+    ) -> Tuple[EndUser, Conversation, Message]:
+        # Usuario, conversación y mensaje del usuario en una sola transacción,
+        # cerrada antes de las llamadas externas
+        async with self._transaction():
+            # 1. Get or create EndUser
+            logger.info("# 1. Get or create EndUser")
+
+            end_user = await self._get_or_create_end_user(
+                external_id, channel, business_id, metadata
+            )
+
+            # 2. Get or create Conversation
+            logger.info("#2. Get or create Conversation")
+
+            conversation = await self._get_or_create_conversation(
+                end_user.id, business_id, channel
+            )
+
+            # 3. Create and save Message
+            logger.info("3. Create and save Message")
+
+            # Con message_id (reintento de un trabajo) el INSERT ignora el duplicado
+            message = Message(
+                id=message_id or uuid4(),
+                conversation_id=conversation.id,
+                sender_type="user",
+                content=message_content,
+                timestamp=datetime.utcnow(),
+                metadata=metadata
+            )
+            await self.message_repo.create(message)
+
+        return end_user, conversation, message
+
+    async def _debounce_window(self, business_id: str) -> float:
+        if self.burst_coalescer is None:
+            return 0.0
+        bot_config = await self.config_loader.load_bot_config(business_id)
+        value = bot_config.get("message_debounce_seconds")
+        return float(value) if value is not None else self.debounce_seconds
+
+    def _transaction(self) -> AsyncContextManager:
+        """Transacción de la unidad de trabajo; sin ella cada operación hace su commit"""
+        if self.unit_of_work is None:
+            return nullcontext()
+        return self.unit_of_work.transaction()
     
     async def _get_or_create_end_user(
         self, 
@@ -98,28 +226,22 @@ class ReceiveMessageUseCase(IMessageReceiverPort):
         normalized_id = self._normalize_external_id(external_id, channel)
         normalized_id = external_id
         logger.info(f'normalized_id: {normalized_id}')
-        end_user = await self.end_user_repo.get_by_external_id(
-            normalized_id, channel, business_id
+        is_anonymous = channel not in self.identified_channels
+
+        new_user = EndUser(
+            id=uuid4(),
+            business_id=business_id,
+            external_id=normalized_id,
+            channel=channel,
+            phone_number=metadata.get("phone_number"),
+            metadata={
+                **metadata,
+                "is_anonymous": is_anonymous,
+                "original_external_id": external_id
+            }
         )
-        
-        if not end_user:
-            is_anonymous = channel not in self.identified_channels
-
-            new_user = EndUser(
-                id=uuid4(),
-                business_id=business_id,
-                external_id=normalized_id,
-                channel=channel,
-                phone_number=metadata.get("phone_number"),
-                metadata={
-                    **metadata,
-                    "is_anonymous": is_anonymous,
-                    "original_external_id": external_id
-                }
-            )
-            end_user = await self.end_user_repo.create(new_user)
-        
-        return end_user
+        # Upsert atómico: devuelve el usuario existente o crea el nuevo
+        return await self.end_user_repo.get_or_create(new_user)
     
     async def _get_or_create_conversation(
         self, 
@@ -127,94 +249,203 @@ class ReceiveMessageUseCase(IMessageReceiverPort):
         business_id: str,
         channel: str
     ) -> Conversation:
-        # Check for active conversation within threshold
-        conversation = await self.conversation_repo.get_active_by_user(
-            end_user_id, business_id
+        # Active conversation within threshold, or a new one (at most one active)
+        new_conversation = Conversation(
+            id=uuid4(),
+            end_user_id=end_user_id,
+            business_id=business_id,
+            channel=channel,
+            started_at=datetime.utcnow(),
+            is_active=True
         )
-        
-        if not conversation:
-            new_conversation = Conversation(
-                id=uuid4(),
-                end_user_id=end_user_id,
-                business_id=business_id,
-                channel=channel,
-                started_at=datetime.utcnow(),
-                is_active=True
-            )
-            conversation = await self.conversation_repo.create(new_conversation)
-        
-        return conversation
+        return await self.conversation_repo.get_or_create_active(new_conversation)
     
-    async def _process_message(self, message: Message, business_id: str) -> Message:
+    async def _process_message(
+        self,
+        message: Message,
+        business_id: str,
+        extra_metadata: Optional[dict] = None
+    ) -> Message:
         try:
-            # 1. Load bot configuration
-            bot_config = await self.config_loader.load_bot_config(business_id)
-            """  chunk_settings = await self.config_loader.load_chunk_settings(
-                business_id, "message"
-            )  """
-            
-            # 2. Vectorize message
-            vector = await self.embedding_client.vectorize_text(
+            graph = self._build_pipeline(message, business_id)
+
+            # 6. Generate response
+            async def generate(bot_config, template, vector, cached, context):
+                if cached:
+                    return cached.content
+
+                generation_started = time.perf_counter()
+                logger.info(f"Generate response: ")
+                response = await self.llm_client.generate_response(
+                    **self._llm_params(message.content, bot_config, template, context)
+                )
+              #  logger.info(f"response llma: {response}")
+
+                await self._store_cached_answer(
+                    business_id, bot_config, template, vector, response,
+                    time.perf_counter() - generation_started
+                )
+                return response
+
+            graph.add(
+                "response",
+                generate,
+                depends_on=["bot_config", "template", "vector", "cached", "context"]
+            )
+
+            results = await graph.run()
+
+            # 7. Save and return bot response
+            cached = results["cached"]
+            metadata = dict(extra_metadata or {})
+            if cached:
+                metadata["answer_cache"] = {"similarity": cached.similarity}
+            return await self._save_bot_message(
+                message,
+                results["response"],
+                metadata=metadata or None
+            )
+        
+        except Exception as e:
+            self.logger.error(f"Error processing message: {str(e)}")
+            raise
+
+    def _build_pipeline(self, message: Message, business_id: str) -> StageGraph:
+        """
+        Arma el grafo de etapas previas al LLM: la configuración y la plantilla
+        arrancan a la vez; el embedding solo espera a la configuración y la búsqueda
+        de contexto solo al embedding.
+        """
+        graph = StageGraph()
+
+        # 1. Load bot configuration
+        graph.add("bot_config", lambda: self.config_loader.load_bot_config(business_id))
+        """  chunk_settings = await self.config_loader.load_chunk_settings(
+            business_id, "message"
+        )  """
+
+        # 2. Get response template (independiente de la configuración)
+        graph.add("template", lambda: self.config_loader.load_bot_template(
+            business_id, "other"
+        ))
+
+        # 3. Vectorize message
+        graph.add(
+            "vector",
+            lambda bot_config: self.embedding_client.vectorize_text(
                 message.content,
                 bot_config["embedding_model_name"]
+            ),
+            depends_on=["bot_config"]
+        )
+
+        # 4. Reuse the answer of a semantically equivalent question
+        async def lookup_cached_answer(bot_config, template, vector):
+            if not self.answer_cache:
+                return None
+            return await self.answer_cache.lookup(
+                business_id,
+                vector,
+                self._config_version(bot_config, template),
+                bot_config.get("answer_cache_min_similarity")
             )
-            
-            # 3. Retrieve relevant context
-            context = await self.context_retriever.retrieve_document_context(
+
+        graph.add(
+            "cached",
+            lookup_cached_answer,
+            depends_on=["bot_config", "template", "vector"]
+        )
+
+        # 5. Retrieve relevant context
+        async def retrieve_context(bot_config, vector, cached):
+            if cached:
+                return None
+            return await self.context_retriever.retrieve_document_context(
                 vector,
                 business_id,
                 bot_config["search_top_k"],
                 bot_config["search_min_similarity"]
             )
-            
-            # 4. Get response template
-            template = await self.config_loader.load_bot_template(
-                business_id, "other"
-            )
-
 
-            logger.info(f"Generate response: ")
-            # 5. Generate response
-            prompt_template=template["prompt_template"]
-            model_namerar=bot_config["llm_model_name"]
-            temperaturerar=template["temperature"]
-            top_prar=template["top_p"]
-            frequency_penaltyrar=template["frequency_penalty"]
-            presence_penaltyrar=template["presence_penalty"]
+        graph.add(
+            "context",
+            retrieve_context,
+            depends_on=["bot_config", "vector", "cached"]
+        )
+        return graph
 
+    def _llm_params(
+        self,
+        message_content: str,
+        bot_config: dict,
+        template: dict,
+        context: dict
+    ) -> dict:
+        prompt_template=template["prompt_template"]
+        model_namerar=bot_config["llm_model_name"]
+        temperaturerar=template["temperature"]
+        top_prar=template["top_p"]
+        frequency_penaltyrar=template["frequency_penalty"]
+        presence_penaltyrar=template["presence_penalty"]
 
-            promptrar=self._build_prompt(message.content, context, prompt_template)
-            logger.info(f"promptrar: {promptrar}")
 
-            response = await self.llm_client.generate_response(
-                prompt=promptrar,
-                model_name=model_namerar,
-                temperature=temperaturerar,
-                top_p=top_prar,
-                frequency_penalty=frequency_penaltyrar,
-                presence_penalty=presence_penaltyrar
-            )
+        promptrar=self._build_prompt(message_content, context, prompt_template)
+        logger.info(f"promptrar: {promptrar}")
 
-          #  logger.info(f"response llma: {response}")
+        return dict(
+            prompt=promptrar,
+            model_name=model_namerar,
+            temperature=temperaturerar,
+            top_p=top_prar,
+            frequency_penalty=frequency_penaltyrar,
+            presence_penalty=presence_penaltyrar
+        )
 
-            # 6. Save and return bot response
-            bot_message = Message(
-                id=uuid4(),
-                conversation_id=message.conversation_id,
-                sender_type="bot",
-                content=response,
-                timestamp=datetime.utcnow()
+    async def _store_cached_answer(
+        self,
+        business_id: str,
+        bot_config: dict,
+        template: dict,
+        vector: list,
+        response: str,
+        generation_seconds: float
+    ) -> None:
+        if self.answer_cache:
+            await self.answer_cache.store(
+                business_id,
+                vector,
+                response,
+                self._config_version(bot_config, template),
+                generation_seconds
             )
 
+    async def _save_bot_message(
+        self,
+        message: Message,
+        content: str,
+        metadata: Optional[dict] = None
+    ) -> Message:
+        bot_message = Message(
+            # Derivado del mensaje que responde: un reintento no duplica la respuesta
+            id=Message.derived_id(message.id, "bot"),
+            conversation_id=message.conversation_id,
+            sender_type="bot",
+            content=content,
+            timestamp=datetime.utcnow(),
+            metadata=metadata
+        )
+
+        # Segunda transacción corta, después de la llamada al LLM
+        async with self._transaction():
             await self.message_repo.create(bot_message)
 
-            
+        return bot_message
 
-            return bot_message
-        
-        except Exception as e:
-            self.logger.error(f"Error processing message: {str(e)}")
-            raise
+    @staticmethod
+    def _config_version(bot_config: dict, template: dict) -> str:
+        """Huella de la configuración y la plantilla con que se generó una respuesta"""
+        payload = json.dumps([bot_config, template], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
     
     def _build_prompt(self, message: str, context: dict, prompt_template: str) -> str:
         # 1. Extrae los resultados del contexto
@@ -0,0 +1,56 @@
+#core/use_cases/stage_graph.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple
+
+StageFn = Callable[..., Awaitable[Any]]
+
+class StageGraph:
+    """
+    Grafo mínimo de etapas asíncronas con dependencias.
+    Cada etapa recibe como kwargs los resultados de las etapas de las que depende
+    y se lanza en cuanto estos están listos, así las etapas independientes corren
+    en paralelo. Si una etapa falla se cancelan las que siguen en curso y se
+    propaga la excepción original.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, Tuple[StageFn, Tuple[str, ...]]] = {}
+
+    def add(self, name: str, fn: StageFn, depends_on: Iterable[str] = ()) -> "StageGraph":
+        depends_on = tuple(depends_on)
+        if name in self._stages:
+            raise ValueError(f"Etapa duplicada: {name}")
+        # Las dependencias deben declararse antes: así el grafo nunca tiene ciclos
+        missing = [dep for dep in depends_on if dep not in self._stages]
+        if missing:
+            raise ValueError(f"La etapa '{name}' depende de etapas no declaradas: {missing}")
+        self._stages[name] = (fn, depends_on)
+        return self
+
+    async def run(self) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        pending = dict(self._stages)
+        running: Dict[asyncio.Future, str] = {}
+
+        try:
+            while pending or running:
+                ready = [
+                    name for name, (_, deps) in pending.items()
+                    if all(dep in results for dep in deps)
+                ]
+                for name in ready:
+                    fn, deps = pending.pop(name)
+                    task = asyncio.ensure_future(fn(**{dep: results[dep] for dep in deps}))
+                    running[task] = name
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    results[name] = task.result()
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        return results
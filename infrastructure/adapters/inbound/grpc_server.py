@@ -1,9 +1,18 @@
 # infrastructure/adapters/inbound/grpc_server.py
 import grpc
+import os
 from concurrent import futures
 from proto import chat_pb2, chat_pb2_grpc
 from core.ports.inbound import IMessageReceiverPort
-from infrastructure.config.database import SessionLocal  # Importa SessionLocal directamente
+from infrastructure.config.database import request_session_scope
+from infrastructure.runtime import (
+    CircuitOpenError,
+    Deadline,
+    DeadlineExceeded,
+    budget_from_env,
+    deadline_scope,
+    run_with_deadline
+)
 
 import logging
 
@@ -11,9 +20,18 @@ logger = logging.getLogger(__name__)
 
 class ChatServiceServicer(chat_pb2_grpc.ChatServiceServicer):
     def __init__(self,message_receiver: IMessageReceiverPort):
-        # Crea una sesión de DB directamente (sin Depends)
+        # Los repositorios del message_receiver usan ScopedSession: cada RPC abre su
+        # propio request_session_scope() y obtiene una Session distinta del pool
         self.message_receiver = message_receiver  
-        self.db = SessionLocal()
+
+    @staticmethod
+    def _request_deadline(context) -> Deadline | None:
+        """Deadline del cliente gRPC o, si no envió uno, el presupuesto configurado"""
+        remaining = context.time_remaining()
+        if remaining is not None:
+            return Deadline.after(remaining)
+        return budget_from_env(os.getenv("GRPC_REQUEST_BUDGET_SECONDS"))
+
     async def ProcessMessage(self, request, context):
         try:
             logger.info(f'channel: {request.channel}')
@@ -22,28 +40,73 @@ class ChatServiceServicer(chat_pb2_grpc.ChatServiceServicer):
             logger.info(f'message_content: {request.content}')
             logger.info(f'metadata: {dict(request.metadata)}')
 
-            response = await self.message_receiver.handle_new_message(
-                channel=request.channel,
-                external_id=request.external_id,
-                business_id=request.business_id,
-                message_content=request.content,
-                metadata=dict(request.metadata)
-            )
+            with request_session_scope():
+                response = await run_with_deadline(
+                    self.message_receiver.handle_new_message(
+                        channel=request.channel,
+                        external_id=request.external_id,
+                        business_id=request.business_id,
+                        message_content=request.content,
+                        metadata=dict(request.metadata)
+                    ),
+                    self._request_deadline(context)
+                )
 
             end_user, conversation, message = response
             
-            self.db.commit()
             return chat_pb2.ChatResponse(
                 external_id=request.external_id,
                 content=message.content,
                 conversation_id=str(conversation.id),
                 end_user_id= str(end_user.id)
             )
+        except DeadlineExceeded as e:
+            logger.error(f"gRPC deadline exceeded: {str(e)}")
+            context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
+            context.set_details(str(e))
+            return chat_pb2.ChatResponse()
+        except CircuitOpenError as e:
+            # Un servicio externo está caído: el cliente puede reintentar más tarde
+            logger.error(f"gRPC upstream unavailable: {str(e)}")
+            context.set_code(grpc.StatusCode.UNAVAILABLE)
+            context.set_details(str(e))
+            return chat_pb2.ChatResponse()
         except Exception as e:
-            self.db.rollback()
             logger.error(f"gRPC error: {str(e)}")
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(str(e))
             return chat_pb2.ChatResponse()
-        finally:
-            self.db.close()
\ No newline at end of file
+
+    async def StreamMessage(self, request, context):
+        """Server-streaming: envía cada fragmento del LLM apenas llega"""
+        try:
+            logger.info(f'stream - channel: {request.channel}, business_id: {request.business_id}')
+
+            # gRPC cancela el stream al vencer el deadline del cliente; el deadline
+            # acota además cada llamada externa
+            with request_session_scope(), deadline_scope(self._request_deadline(context)):
+                async for chunk in self.message_receiver.stream_new_message(
+                    channel=request.channel,
+                    external_id=request.external_id,
+                    business_id=request.business_id,
+                    message_content=request.content,
+                    metadata=dict(request.metadata)
+                ):
+                    yield chat_pb2.ChatResponseChunk(
+                        external_id=request.external_id,
+                        end_user_id=str(chunk.end_user_id),
+                        conversation_id=str(chunk.conversation_id),
+                        delta=chunk.delta,
+                        is_final=chunk.is_final,
+                        content=chunk.message.content if chunk.message else "",
+                        message_id=str(chunk.message.id) if chunk.message else ""
+                    )
+        except DeadlineExceeded as e:
+            logger.error(f"gRPC stream deadline exceeded: {str(e)}")
+            await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, str(e))
+        except CircuitOpenError as e:
+            logger.error(f"gRPC stream upstream unavailable: {str(e)}")
+            await context.abort(grpc.StatusCode.UNAVAILABLE, str(e))
+        except Exception as e:
+            logger.error(f"gRPC stream error: {str(e)}")
+            await context.abort(grpc.StatusCode.INTERNAL, str(e))
\ No newline at end of file
@@ -1,31 +1,45 @@
 # infrastructure/adapters/inbound/telegram_adapter.py
 import os
-import aiohttp
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from core.ports.inbound import IMessageReceiverPort
+from core.ports.outbound import IChannelSenderPort
+from infrastructure.runtime import budget_from_env, run_with_deadline
+from infrastructure.queue import MessageJob, MessageQueue, QueueFull
+from infrastructure.cache.webhook_dedup import WebhookDeduplicator
 import logging
 
 logger = logging.getLogger(__name__)
 
 class TelegramAdapter:
-    def __init__(self, message_receiver: IMessageReceiverPort):
+    def __init__(
+        self,
+        message_receiver: IMessageReceiverPort,
+        sender: IChannelSenderPort,
+        queue: Optional[MessageQueue] = None,
+        deduplicator: Optional[WebhookDeduplicator] = None
+    ):
         self.message_receiver = message_receiver
-    
-    def _get_bot_token(self, business_id: str) -> str:
-        """Obtiene el token del bot para un negocio específico"""
-        token_key = f"TELEGRAM_TOKEN_{business_id}"
-        #logger.info(f"Token key: {token_key}")
-        token = os.getenv(token_key)
-
-        if not token:
-            raise ValueError(f"Token de Telegram no configurado para negocio: {business_id}")
-        #logger.info(f"Token de Telegram: {token}")
-        return token
+        self.sender = sender
+        # Con cola (WEBHOOK_PROCESSING_MODE=async o durable) el webhook solo valida y encola
+        self.queue = queue
+        # Telegram reenvía el mismo update_id si el webhook tarda: se responde sin reprocesar
+        self.deduplicator = deduplicator
     
     async def handle_update(self, update: Dict[str, Any], business_id: str) -> Dict[str, str]:
         """
         Procesa un update de Telegram para un negocio específico
         """
+        update_id = update.get("update_id")
+        if self.deduplicator is None or update_id is None:
+            return await self._process_update(update, business_id)
+        # update_id es único por bot (un bot por negocio); los errores se pueden reintentar
+        return await self.deduplicator.run_once(
+            f"telegram:{business_id}:{update_id}",
+            lambda: self._process_update(update, business_id),
+            is_final=lambda result: result.get("status") != "error"
+        )
+
+    async def _process_update(self, update: Dict[str, Any], business_id: str) -> Dict[str, str]:
         try:
             # Extraer información del mensaje
             message = update.get("message", {})
@@ -62,60 +76,51 @@ class TelegramAdapter:
             }
             
             logger.info(f"Telegram webhook - Business: {business_id}, Chat ID: {external_id}")
+
+            if self.queue is not None:
+                await self.queue.enqueue(MessageJob(
+                    channel="telegram",
+                    business_id=business_id,
+                    external_id=external_id,
+                    content=message_content,
+                    metadata=metadata,
+                    recipient=external_id
+                ))
+                return {"status": "accepted", "message": "Mensaje encolado"}
             
             # Procesar mensaje usando el use case
-            message = await self.message_receiver.handle_new_message(
-                channel="telegram",
-                external_id=external_id,
-                business_id=business_id,
-                message_content=message_content,
-                metadata=metadata
+            # Presupuesto del webhook: se cancela el pipeline si se agota
+            message = await run_with_deadline(
+                self.message_receiver.handle_new_message(
+                    channel="telegram",
+                    external_id=external_id,
+                    business_id=business_id,
+                    message_content=message_content,
+                    metadata=metadata,
+                    coalesce_burst=True
+                ),
+                budget_from_env(os.getenv("TELEGRAM_WEBHOOK_BUDGET_SECONDS", os.getenv("WEBHOOK_BUDGET_SECONDS", "14")))
             )
 
             end_user, conversation, message = message
 
             #logger.info(f"message: {message.content}")
             logger.info(f"Telegram webhook - Business: {business_id}, Chat ID: {external_id} - Mensaje procesado")
-            # Si hay respuesta del bot, enviarla
+            # Si hay respuesta del bot, enviarla en segundo plano (el webhook no espera a Telegram)
             if hasattr(message, 'content') and message.content:
-                await self._send_message(
-                    business_id=business_id,
-                    chat_id=external_id,
-                    text=message.content
-                )
+                self.sender.dispatch(business_id, external_id, message.content)
             
             return {"status": "success", "message": "Procesado correctamente"}
             
+        except QueueFull:
+            # El endpoint responde 503 para que Telegram reintente la entrega
+            raise
         except Exception as e:
             logger.error(f"Error en Telegram webhook: {str(e)}")
             return {"status": "error", "message": str(e)}
     
-    async def _send_message(self, business_id: str, chat_id: str, text: str):
-        """
-        Envía un mensaje a través de la API de Telegram
-        """
-        try:
-            token = self._get_bot_token(business_id)
-            url = f"https://api.telegram.org/bot{token}/sendMessage"
-            payload = {
-                "chat_id": chat_id,
-                "text": text,
-                "parse_mode": "HTML"  # Permite formato HTML
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"Error enviando mensaje Telegram: {error_text}")
-                    else:
-                        logger.info(f"Mensaje enviado exitosamente a chat {chat_id}")
-                        
-        except Exception as e:
-            logger.error(f"Error enviando mensaje Telegram: {str(e)}")
-    
-    async def send_message_external(self, business_id: str, chat_id: str, text: str):
+    async def send_message_external(self, business_id: str, chat_id: str, text: str) -> bool:
         """
         Método público para enviar mensajes desde otros servicios
         """
-        await self._send_message(business_id, chat_id, text)
\ No newline at end of file
+        return await self.sender.send(business_id, chat_id, text)
@@ -1,16 +1,30 @@
 # CAMBIO MÍNIMO 2: infrastructure/adapters/inbound/twilio_adapter.py
 from fastapi import Request, HTTPException
 from core.ports.inbound import IMessageReceiverPort
+from core.ports.outbound import IChannelSenderPort
 from typing import Dict, Any, Optional
 import os
-from twilio.rest import Client
+from infrastructure.runtime import budget_from_env, run_with_deadline
+from infrastructure.queue import MessageJob, MessageQueue, QueueFull
+from infrastructure.cache.webhook_dedup import WebhookDeduplicator
 import logging
 
 logger = logging.getLogger(__name__)
 
 class TwilioWhatsAppAdapter:
-    def __init__(self, message_receiver: IMessageReceiverPort):
+    def __init__(
+        self,
+        message_receiver: IMessageReceiverPort,
+        sender: IChannelSenderPort,
+        queue: Optional[MessageQueue] = None,
+        deduplicator: Optional[WebhookDeduplicator] = None
+    ):
         self.message_receiver = message_receiver
+        self.sender = sender
+        # Con cola (WEBHOOK_PROCESSING_MODE=async o durable) el webhook solo valida y encola
+        self.queue = queue
+        # Los reintentos de Twilio repiten el MessageSid: se responden sin reprocesar
+        self.deduplicator = deduplicator
         # Variables de entorno globales (una sola cuenta Twilio)
         self.account_sid = os.getenv("TWILIO_ACCOUNT_SID")
         self.auth_token = os.getenv("TWILIO_AUTH_TOKEN")
@@ -19,7 +33,6 @@ class TwilioWhatsAppAdapter:
         if not self.account_sid or not self.auth_token:
             raise ValueError("TWILIO_ACCOUNT_SID y TWILIO_AUTH_TOKEN son requeridos")
             
-        self.client = Client(self.account_sid, self.auth_token)
         logger.info(f"TwilioWhatsAppAdapter inicializado")
 
     # CAMBIO: Agregar parámetro whatsapp_from
@@ -30,6 +43,18 @@ class TwilioWhatsAppAdapter:
         """
         Maneja el webhook de Twilio con business_id y número específico
         """
+        message_sid = form_data.get("MessageSid", "")
+        if self.deduplicator is None or not message_sid:
+            return await self._process_webhook(form_data, business_id, whatsapp_from)
+        return await self.deduplicator.run_once(
+            f"twilio:{message_sid}",
+            lambda: self._process_webhook(form_data, business_id, whatsapp_from)
+        )
+
+    async def _process_webhook(self,
+                        form_data: Dict[str, Any],
+                        business_id: str,
+                        whatsapp_from: str = None) -> Dict[str, str]:
         try:
             message_content = form_data.get("Body", "")
             external_id = form_data.get("From", "")
@@ -60,21 +85,39 @@ class TwilioWhatsAppAdapter:
             }
             
             logger.info(f"Procesando mensaje - Business: {business_id}, From: {clean_phone}, Business Number: {whatsapp_from}")
+
+            if self.queue is not None:
+                await self.queue.enqueue(MessageJob(
+                    channel="whatsapp",
+                    business_id=business_id,
+                    external_id=external_id,
+                    content=message_content,
+                    metadata=metadata,
+                    recipient=clean_phone,
+                    reply_from=whatsapp_from or self.default_whatsapp_from
+                ))
+                return {"status": "accepted", "business_id": business_id, "whatsapp_from": whatsapp_from}
             
-            message = await self.message_receiver.handle_new_message(
-                channel="whatsapp",
-                external_id=external_id,
-                business_id=business_id,
-                message_content=message_content,
-                metadata=metadata
+            # Presupuesto del webhook: se cancela el pipeline si se agota
+            message = await run_with_deadline(
+                self.message_receiver.handle_new_message(
+                    channel="whatsapp",
+                    external_id=external_id,
+                    business_id=business_id,
+                    message_content=message_content,
+                    metadata=metadata,
+                    coalesce_burst=True
+                ),
+                budget_from_env(os.getenv("TWILIO_WEBHOOK_BUDGET_SECONDS", os.getenv("WEBHOOK_BUDGET_SECONDS", "14")))
             )
             
             end_user, conversation, message = message
 
             # CAMBIO: Usar el número específico del negocio para responder
+            # El envío sigue en segundo plano: el webhook no espera a Twilio
             if message and message.content:
                 business_number = whatsapp_from or self.default_whatsapp_from
-                await self.send_whatsapp_message(clean_phone, message.content, from_number=business_number)
+                self.sender.dispatch(business_id, clean_phone, message.content, sender=business_number)
             
             return {
                 "status": "success", 
@@ -83,36 +126,21 @@ class TwilioWhatsAppAdapter:
                 "whatsapp_from": whatsapp_from
             }
             
+        except QueueFull as e:
+            logger.error(f"Webhook de Twilio rechazado: {str(e)}")
+            raise HTTPException(status_code=503, detail=str(e))
         except Exception as e:
             logger.error(f"Error procesando webhook de Twilio: {str(e)}")
             raise HTTPException(status_code=400, detail=str(e))
 
     # CAMBIO: Agregar parámetro from_number
-    async def send_whatsapp_message(self, to_phone: str, message_content: str, from_number: str = None) -> bool:
+    async def send_whatsapp_message(self, to_phone: str, message_content: str, from_number: str = None, business_id: str = "") -> bool:
         """
         Envía mensaje de WhatsApp usando número específico del negocio
         """
-        try:
-            if not to_phone.startswith("whatsapp:"):
-                to_number = f"whatsapp:{to_phone}"
-            else:
-                to_number = to_phone
-            
-            # Usar número específico del negocio o el default
-            send_from = from_number or self.default_whatsapp_from
-                
-            message = self.client.messages.create(
-                body=message_content,
-                from_=send_from,  # CAMBIO: Usar número del negocio
-                to=to_number
-            )
-            
-            logger.info(f"Mensaje enviado exitosamente - SID: {message.sid}, From: {send_from}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error enviando mensaje de WhatsApp: {str(e)}")
-            return False
+        # Usar número específico del negocio o el default
+        send_from = from_number or self.default_whatsapp_from
+        return await self.sender.send(business_id, to_phone, message_content, sender=send_from)
 
     def validate_webhook(self, request_url: str, form_data: Dict[str, Any], signature: str) -> bool:
         try:
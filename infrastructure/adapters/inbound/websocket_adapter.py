@@ -4,7 +4,7 @@ import asyncio
 import json
 from websockets import connect, WebSocketClientProtocol
 from core.ports.inbound import IMessageReceiverPort
-from typing import Optional, Dict, Any
+from typing import AsyncIterator, Optional, Dict, Any
 from datetime import datetime, timedelta
 import os
 from jose import jwt
@@ -126,6 +126,42 @@ class WebSocketAdapter:
         except Exception as e:
             logger.error(f"Error procesando mensaje: {str(e)}")
 
+    async def _stream_message(self, message: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Procesa un mensaje en modo streaming: produce un evento "delta" por cada
+        fragmento del LLM y un evento "final" con el mismo formato de _process_message
+        """
+        data = json.loads(message)
+
+        async for chunk in self.message_receiver.stream_new_message(
+            channel=data["channel"],
+            external_id=data["external_id"],
+            business_id=data["business_id"],
+            message_content=data["content"],
+            metadata=data.get("metadata", {}) or {}
+        ):
+            if not chunk.is_final:
+                yield {
+                    "type": "delta",
+                    "external_id": data["external_id"],
+                    "end_user_id": str(chunk.end_user_id),
+                    "conversation_id": str(chunk.conversation_id),
+                    "content": chunk.delta
+                }
+                continue
+
+            yield {
+                "type": "final",
+                "external_id": data["external_id"],
+                "end_user_id": str(chunk.end_user_id),
+                "conversation_id": str(chunk.conversation_id),
+                "content": chunk.message.content if chunk.message else "No se recibió respuesta del bot",
+                "metadata": {
+                    "user_id": str(chunk.end_user_id),
+                    "message_id": str(chunk.message.id) if chunk.message else None
+                }
+            }
+
     async def _send_response(self, response: Dict[str, Any]):
         """Envía respuesta a WebFlux"""
         logger.info(f'response: {response}')
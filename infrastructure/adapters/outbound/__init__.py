@@ -3,10 +3,32 @@ from .django_config import DjangoConfigAdapter
 from .fastapi_embedding import FastAPIEmbeddingAdapter
 from .fastapi_context import FastAPIContextRetrieverAdapter
 from .openai_client import OpenAIClientAdapter
+from .cached_config import CachedConfigLoaderAdapter
+from .cached_embedding import CachedEmbeddingAdapter
+from .batching_embedding import BatchingEmbeddingAdapter
+from .resilient import (
+    ResilientEmbeddingAdapter,
+    ResilientContextRetrieverAdapter,
+    ResilientConfigLoaderAdapter
+)
+from .channel_senders import (
+    ChannelSender,
+    TelegramSender,
+    TwilioWhatsAppSender
+)
 
 __all__ = [
     'DjangoConfigAdapter',
     'FastAPIEmbeddingAdapter',
     'FastAPIContextRetrieverAdapter',
-    'OpenAIClientAdapter'
+    'OpenAIClientAdapter',
+    'CachedConfigLoaderAdapter',
+    'CachedEmbeddingAdapter',
+    'BatchingEmbeddingAdapter',
+    'ResilientEmbeddingAdapter',
+    'ResilientContextRetrieverAdapter',
+    'ResilientConfigLoaderAdapter',
+    'ChannelSender',
+    'TelegramSender',
+    'TwilioWhatsAppSender'
 ]
\ No newline at end of file
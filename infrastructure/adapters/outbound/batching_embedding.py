@@ -0,0 +1,109 @@
+# infrastructure/adapters/outbound/batching_embedding.py
+import asyncio
+import logging
+from typing import Dict, List, Tuple
+from core.ports.outbound import IEmbeddingClientPort
+from infrastructure.runtime import deadline_scope
+
+
+class BatchingEmbeddingAdapter(IEmbeddingClientPort):
+    """
+    Agrupa llamadas concurrentes a vectorize_text del mismo modelo en una sola
+    petición a /api/v1/embeddings/generate. Cada lote se envía cuando alcanza
+    `max_batch_size` textos o cuando pasan `max_delay` segundos desde el primero;
+    cada llamador recibe su propio vector.
+    """
+
+    def __init__(
+        self,
+        inner: IEmbeddingClientPort,
+        max_batch_size: int = 32,
+        max_delay: float = 0.005
+    ):
+        self.inner = inner
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._pending: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._flushes: set = set()
+        self.batches = 0
+        self.batched_texts = 0
+        self.requests = 0
+        self.logger = logging.getLogger(__name__)
+
+    async def vectorize_text(
+        self,
+        text: str,
+        model_name: str
+        ) -> List[float]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.requests += 1
+
+        pending = self._pending.setdefault(model_name, [])
+        pending.append((text, future))
+
+        if len(pending) >= self.max_batch_size:
+            self._flush(model_name)
+        elif model_name not in self._timers:
+            self._timers[model_name] = loop.call_later(self.max_delay, self._flush, model_name)
+
+        return await future
+
+    async def vectorize_texts(
+        self,
+        texts: List[str],
+        model_name: str
+        ) -> List[List[float]]:
+        return await self.inner.vectorize_texts(texts, model_name)
+
+    def _flush(self, model_name: str) -> None:
+        timer = self._timers.pop(model_name, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(model_name, [])
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._send_batch(model_name, batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _send_batch(self, model_name: str, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        # Textos repetidos dentro del lote se envían una sola vez
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+        self.batches += 1
+        self.batched_texts += len(unique_texts)
+
+        try:
+            # El lote sirve a varias peticiones: no hereda el deadline de ninguna;
+            # cada llamador sigue acotado por su propio deadline mientras espera
+            with deadline_scope(None):
+                embeddings = await self.inner.vectorize_texts(unique_texts, model_name)
+        except Exception as e:
+            self.logger.error(f"Error vectorizing batch of {len(unique_texts)} texts: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_text = dict(zip(unique_texts, embeddings))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(by_text[text])
+
+    async def aclose(self) -> None:
+        """Envía los lotes pendientes y espera a que terminen (shutdown)"""
+        for model_name in list(self._pending):
+            self._flush(model_name)
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "batched_texts": self.batched_texts,
+            "avg_batch_size": self.batched_texts / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_delay_ms": self.max_delay * 1000
+        }
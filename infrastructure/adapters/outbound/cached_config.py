@@ -0,0 +1,113 @@
+# infrastructure/adapters/outbound/cached_config.py
+import asyncio
+import logging
+from typing import Dict, Iterable, Optional
+from core.ports.outbound import IConfigLoaderPort
+from infrastructure.cache import AsyncTTLCache
+
+
+CACHED_RESOURCES = ("bot_config", "bot_template", "chunk_settings")
+
+
+class CachedConfigLoaderAdapter(IConfigLoaderPort):
+    """
+    Decorador de IConfigLoaderPort que cachea la configuración del bot por negocio.
+    Una ráfaga de mensajes del mismo negocio provoca una sola consulta a Django y,
+    cuando Django está lento, se sigue respondiendo con el valor anterior mientras
+    se refresca en segundo plano. Los dicts devueltos se comparten: son de solo lectura.
+    """
+
+    def __init__(
+        self,
+        inner: IConfigLoaderPort,
+        default_ttl: float = 300.0,
+        stale_ttl: float = 3600.0,
+        max_entries: int = 2048,
+        ttl_overrides: Optional[Dict[str, float]] = None
+    ):
+        self.inner = inner
+        self.default_ttl = default_ttl
+        self.ttl_overrides = ttl_overrides or {}
+        self.cache = AsyncTTLCache(max_entries=max_entries, stale_ttl=stale_ttl)
+        self.logger = logging.getLogger(__name__)
+
+    def ttl_for(self, business_id: str) -> float:
+        return self.ttl_overrides.get(str(business_id), self.default_ttl)
+
+    async def load_bot_config(self, business_id: str) -> Dict:
+        return await self.cache.get_or_load(
+            ("bot_config", str(business_id)),
+            lambda: self.inner.load_bot_config(business_id),
+            self.ttl_for(business_id)
+        )
+
+    async def load_bot_template(self, business_id: str, template_type: str) -> Dict:
+        return await self.cache.get_or_load(
+            ("bot_template", str(business_id), template_type),
+            lambda: self.inner.load_bot_template(business_id, template_type),
+            self.ttl_for(business_id)
+        )
+
+    async def load_chunk_settings(self, business_id: str, entity_type: str) -> Dict:
+        return await self.cache.get_or_load(
+            ("chunk_settings", str(business_id), entity_type),
+            lambda: self.inner.load_chunk_settings(business_id, entity_type),
+            self.ttl_for(business_id)
+        )
+
+    async def invalidate_business(
+        self,
+        business_id: str,
+        resources: Optional[Iterable[str]] = None,
+        refresh: bool = False
+    ) -> Dict[str, int]:
+        """
+        Elimina las entradas de un negocio (todas o solo `resources`).
+        Con refresh=True las vuelve a cargar de inmediato en lugar de esperar al próximo mensaje.
+        """
+        business_id = str(business_id)
+        kinds = set(resources or CACHED_RESOURCES)
+        unknown = kinds - set(CACHED_RESOURCES)
+        if unknown:
+            raise ValueError(f"Recursos de configuración desconocidos: {sorted(unknown)}")
+
+        keys = [
+            key for key in self.cache.keys()
+            if key[0] in kinds and key[1] == business_id
+        ]
+        dropped = self.cache.invalidate_where(
+            lambda key: key[0] in kinds and key[1] == business_id
+        )
+        self.logger.info(f"Caché de configuración invalidada - Business: {business_id}, entradas: {dropped}")
+
+        refreshed = 0
+        if refresh:
+            results = await asyncio.gather(
+                *[self._reload(key) for key in keys],
+                return_exceptions=True
+            )
+            refreshed = sum(1 for result in results if not isinstance(result, Exception))
+
+        return {"invalidated": dropped, "refreshed": refreshed}
+
+    async def _reload(self, key: tuple) -> Dict:
+        kind, business_id = key[0], key[1]
+        if kind == "bot_config":
+            return await self.load_bot_config(business_id)
+        if kind == "bot_template":
+            return await self.load_bot_template(business_id, key[2])
+        return await self.load_chunk_settings(business_id, key[2])
+
+    def stats(self) -> Dict:
+        return self.cache.stats()
+
+
+def parse_ttl_overrides(raw: Optional[str]) -> Dict[str, float]:
+    """Convierte "negocio_a=60,negocio_b=900" en {"negocio_a": 60.0, "negocio_b": 900.0}"""
+    overrides = {}
+    for item in (raw or "").split(","):
+        if "=" not in item:
+            continue
+        business_id, ttl = item.split("=", 1)
+        overrides[business_id.strip()] = float(ttl)
+    return overrides
@@ -0,0 +1,34 @@
+# infrastructure/adapters/outbound/cached_embedding.py
+import logging
+from typing import Dict, List
+from core.ports.outbound import IEmbeddingClientPort
+from infrastructure.cache import EmbeddingCache
+
+
+class CachedEmbeddingAdapter(IEmbeddingClientPort):
+    """
+    Decorador de IEmbeddingClientPort con caché direccionada por contenido.
+    Los mensajes repetidos ("hola", "precio", "horario") no vuelven a llamar
+    al servicio de embeddings mientras estén en memoria o en el archivo mmap.
+    """
+
+    def __init__(self, inner: IEmbeddingClientPort, cache: EmbeddingCache):
+        self.inner = inner
+        self.cache = cache
+        self.logger = logging.getLogger(__name__)
+
+    async def vectorize_text(
+        self,
+        text: str,
+        model_name: str
+        ) -> List[float]:
+        vector = await self.cache.get(model_name, text)
+        if vector is not None:
+            return vector.tolist()
+
+        embedding = await self.inner.vectorize_text(text, model_name)
+        await self.cache.put(model_name, text, embedding)
+        return embedding
+
+    def stats(self) -> Dict:
+        return self.cache.stats()
@@ -0,0 +1,242 @@
+# infrastructure/adapters/outbound/channel_senders.py
+
+import asyncio
+import logging
+import os
+import random
+import time
+from abc import abstractmethod
+from typing import Dict, Hashable, Optional, Set, Tuple
+import httpx
+from core.ports.outbound import IChannelSenderPort
+from infrastructure.runtime import KeyedLimiter, LatencyTracker, deadline_scope
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelSender(IChannelSenderPort):
+    """
+    Base de los envíos salientes a plataformas de mensajería:
+
+    - cliente httpx del pool (conexiones keep-alive compartidas por todos los envíos);
+    - límites por destinatario y por cuenta emisora (KeyedLimiter);
+    - reintentos con backoff exponencial y jitter ante 429, 5xx y errores de red,
+      respetando el tiempo de espera que indique la plataforma;
+    - envíos en segundo plano (dispatch) que no bloquean la petición y se esperan
+      al cerrar el proceso.
+    """
+
+    channel = ""
+
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient,
+        limiter: KeyedLimiter,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        max_retry_after: float = 60.0,
+        max_pending: int = 1000
+    ):
+        self.client = http_client
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.max_pending = max_pending
+        self._tasks: Set[asyncio.Task] = set()
+        self._latency = LatencyTracker()
+        self._counters = {"sent": 0, "failed": 0, "retries": 0, "rate_limited": 0, "dropped": 0}
+
+    @abstractmethod
+    def _destination(self, business_id: str, recipient: str, sender: Optional[str]) -> Tuple[Hashable, Hashable]:
+        """Clave del destinatario y de la cuenta emisora para el limitador"""
+        pass
+
+    @abstractmethod
+    async def _post(self, business_id: str, recipient: str, text: str, sender: Optional[str]) -> httpx.Response:
+        """Una llamada a la API de la plataforma, sin reintentos"""
+        pass
+
+    def _retry_after(self, response: httpx.Response) -> Optional[float]:
+        try:
+            return float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            return None
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: reparte los reintentos de muchos envíos fallidos a la vez
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def send(
+        self,
+        business_id: str,
+        recipient: str,
+        text: str,
+        sender: Optional[str] = None
+    ) -> bool:
+        started = time.perf_counter()
+        try:
+            key, group = self._destination(business_id, recipient, sender)
+        except ValueError as e:
+            self._counters["failed"] += 1
+            logger.error(f"Error enviando mensaje {self.channel}: {str(e)}")
+            return False
+
+        error = ""
+        # Los reintentos ocupan el turno del destinatario para no desordenar sus mensajes
+        async with self.limiter.slot(key, group):
+            for attempt in range(self.max_retries + 1):
+                delay = None
+                try:
+                    response = await self._post(business_id, recipient, text, sender)
+                except httpx.TransportError as e:
+                    error = f"{type(e).__name__}: {str(e)}"
+                else:
+                    if response.is_success:
+                        self._counters["sent"] += 1
+                        self._latency.record(time.perf_counter() - started)
+                        logger.info(f"Mensaje {self.channel} enviado a {recipient}")
+                        return True
+                    error = f"HTTP {response.status_code}: {response.text[:200]}"
+                    if response.status_code == 429:
+                        self._counters["rate_limited"] += 1
+                        delay = self._retry_after(response)
+                    elif response.status_code < 500:
+                        break
+                if attempt == self.max_retries or (delay or 0) > self.max_retry_after:
+                    break
+                self._counters["retries"] += 1
+                # El reintento también respeta el intervalo mínimo del destinatario
+                delay = delay if delay is not None else self._backoff(attempt)
+                await asyncio.sleep(max(delay, self.limiter.per_key_interval))
+
+        self._counters["failed"] += 1
+        logger.error(f"Error enviando mensaje {self.channel} a {recipient}: {error}")
+        return False
+
+    def dispatch(
+        self,
+        business_id: str,
+        recipient: str,
+        text: str,
+        sender: Optional[str] = None
+    ) -> None:
+        if len(self._tasks) >= self.max_pending:
+            self._counters["dropped"] += 1
+            logger.error(f"Cola de envíos {self.channel} llena: se descarta el mensaje a {recipient}")
+            return
+        # El envío no hereda el deadline de la petición que lo origina
+        with deadline_scope(None):
+            task = asyncio.get_running_loop().create_task(
+                self.send(business_id, recipient, text, sender)
+            )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def aclose(self, timeout: float = 10.0) -> None:
+        """Espera los envíos pendientes (shutdown) y cancela los que no terminen a tiempo"""
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"{len(pending)} envíos {self.channel} cancelados al cerrar")
+
+    def stats(self) -> Dict:
+        p50 = self._latency.percentile(50)
+        p95 = self._latency.percentile(95)
+        return {
+            **self._counters,
+            "pending": len(self._tasks),
+            "latency_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "latency_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "limiter": self.limiter.stats()
+        }
+
+
+class TelegramSender(ChannelSender):
+    """
+    sendMessage de la Bot API con el bot de cada negocio (TELEGRAM_TOKEN_<business_id>).
+    Telegram admite ~1 mensaje/s por chat y ~30 mensajes/s por bot.
+    """
+
+    channel = "telegram"
+
+    def __init__(self, http_client: httpx.AsyncClient, limiter: KeyedLimiter, base_url: str = "https://api.telegram.org", **kwargs):
+        super().__init__(http_client, limiter, **kwargs)
+        self.base_url = base_url.rstrip("/")
+
+    def _get_bot_token(self, business_id: str) -> str:
+        token = os.getenv(f"TELEGRAM_TOKEN_{business_id}")
+        if not token:
+            raise ValueError(f"Token de Telegram no configurado para negocio: {business_id}")
+        return token
+
+    def _destination(self, business_id: str, recipient: str, sender: Optional[str]) -> Tuple[Hashable, Hashable]:
+        self._get_bot_token(business_id)
+        return (business_id, recipient), business_id
+
+    async def _post(self, business_id: str, recipient: str, text: str, sender: Optional[str]) -> httpx.Response:
+        token = self._get_bot_token(business_id)
+        return await self.client.post(
+            f"{self.base_url}/bot{token}/sendMessage",
+            json={
+                "chat_id": recipient,
+                "text": text,
+                "parse_mode": "HTML"  # Permite formato HTML
+            }
+        )
+
+    def _retry_after(self, response: httpx.Response) -> Optional[float]:
+        # 429: {"ok": false, "parameters": {"retry_after": N}}
+        try:
+            return float(response.json()["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            return super()._retry_after(response)
+
+
+class TwilioWhatsAppSender(ChannelSender):
+    """
+    Mensajes de WhatsApp con la API REST de Twilio (Messages.json) sobre el cliente
+    del pool, en lugar del twilio.rest.Client bloqueante. Los límites de tasa van por
+    número emisor del negocio.
+    """
+
+    channel = "whatsapp"
+
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient,
+        limiter: KeyedLimiter,
+        account_sid: str,
+        auth_token: str,
+        default_from: str,
+        base_url: str = "https://api.twilio.com",
+        **kwargs
+    ):
+        super().__init__(http_client, limiter, **kwargs)
+        self.account_sid = account_sid
+        self.auth_token = auth_token
+        self.default_from = default_from
+        self.base_url = base_url.rstrip("/")
+
+    @staticmethod
+    def _whatsapp_number(number: str) -> str:
+        return number if number.startswith("whatsapp:") else f"whatsapp:{number}"
+
+    def _destination(self, business_id: str, recipient: str, sender: Optional[str]) -> Tuple[Hashable, Hashable]:
+        return self._whatsapp_number(recipient), sender or self.default_from
+
+    async def _post(self, business_id: str, recipient: str, text: str, sender: Optional[str]) -> httpx.Response:
+        return await self.client.post(
+            f"{self.base_url}/2010-04-01/Accounts/{self.account_sid}/Messages.json",
+            data={
+                "To": self._whatsapp_number(recipient),
+                "From": sender or self.default_from,
+                "Body": text
+            },
+            auth=(self.account_sid, self.auth_token)
+        )
@@ -1,25 +1,75 @@
 #infrastructure/adapters/outbound/django_config.py
 import httpx
-from typing import Dict
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+from infrastructure.config.http_pool import request_timeout
 from core.ports.outbound import IConfigLoaderPort
 import logging
-from datetime import datetime
 
 class DjangoConfigAdapter(IConfigLoaderPort):
-    def __init__(self, base_url: str):
+    def __init__(
+        self,
+        base_url: str,
+        http_client: httpx.AsyncClient,
+        max_validators: int = 4096
+    ):
         self.base_url = base_url
+        # Cliente compartido del pool HTTP (keep-alive y timeouts del upstream "django")
+        self.client = http_client
+        # ETag y valor devuelto por URL+params, para revalidar con If-None-Match. El
+        # valor es el mismo objeto que guarda la caché de configuración (no una copia):
+        # un 304 no trae cuerpo, así que hace falta tenerlo aunque la caché lo expulse
+        self.max_validators = max_validators
+        self._validators: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.not_modified = 0
         self.logger = logging.getLogger(__name__)
 
+    async def _get_json(
+        self,
+        path: str,
+        params: Dict[str, str],
+        select: Callable[[Any], Any] = lambda data: data
+    ) -> Any:
+        """
+        GET con revalidación condicional: si Django responde 304 se reutiliza el valor
+        ya parseado de la respuesta anterior en lugar de descargarlo de nuevo. `select`
+        extrae lo que se devuelve; solo eso se conserva, no el cuerpo completo.
+        """
+        key = (path, tuple(sorted(params.items())))
+        cached = self._validators.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else None
+
+        response = await self.client.get(
+            f"{self.base_url}{path}",
+            params=params,
+            headers=headers,
+            timeout=request_timeout(self.client)
+        )
+
+        if response.status_code == 304 and cached:
+            self.not_modified += 1
+            self._validators.move_to_end(key)
+            return cached[1]
+
+        response.raise_for_status()
+        data = select(response.json())
+
+        etag = response.headers.get("ETag")
+        if etag:
+            self._validators[key] = (etag, data)
+            self._validators.move_to_end(key)
+            while len(self._validators) > self.max_validators:
+                self._validators.popitem(last=False)
+        else:
+            self._validators.pop(key, None)
+        return data
+
     async def load_bot_config(self, business_id: str) -> Dict:
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/api/bot-settings/by_business/",
-                    params={"business_id": business_id},
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                return response.json()
+            return await self._get_json(
+                "/api/bot-settings/by_business/",
+                {"business_id": business_id}
+            )
         except httpx.HTTPStatusError as e:
             self.logger.error(f"HTTP error loading bot config: {e}")
             raise
@@ -29,18 +79,14 @@ class DjangoConfigAdapter(IConfigLoaderPort):
 
     async def load_bot_template(self, business_id: str, template_type: str) -> Dict:
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/api/bot-templates/by_type/",
-                    params={
-                        "business_id": business_id,
-                        "type": template_type
-                    },
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data[0] if data else {}
+            return await self._get_json(
+                "/api/bot-templates/by_type/",
+                {
+                    "business_id": business_id,
+                    "type": template_type
+                },
+                select=lambda data: data[0] if data else {}
+            )
         except httpx.HTTPStatusError as e:
             self.logger.error(f"HTTP error loading bot template: {e}")
             raise
@@ -50,22 +96,23 @@ class DjangoConfigAdapter(IConfigLoaderPort):
 
     async def load_chunk_settings(self, business_id: str, entity_type: str) -> Dict:
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/api/chunking-settings/by_entity/",
-                    params={
-                        "business_id": business_id,
-                        "entity_type": entity_type
-                    },
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                return response.json()
+            return await self._get_json(
+                "/api/chunking-settings/by_entity/",
+                {
+                    "business_id": business_id,
+                    "entity_type": entity_type
+                }
+            )
         except httpx.HTTPStatusError as e:
             self.logger.error(f"HTTP error loading chunk settings: {e}")
             raise
         except Exception as e:
             self.logger.error(f"Error loading chunk settings: {e}")
             raise
-        
 
+    def stats(self) -> Dict:
+        return {
+            # Respuestas 304: el JSON anterior se reutilizó sin descargarlo
+            "not_modified": self.not_modified,
+            "validators": len(self._validators)
+        }
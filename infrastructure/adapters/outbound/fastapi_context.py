@@ -1,35 +1,37 @@
 # infrastructure/adapters/outbound/fastapi_context.py
 import httpx
 from typing import List, Dict
+from infrastructure.config.http_pool import request_timeout
 from core.ports.outbound import IContextRetrieverPort
 import logging
 
 class FastAPIContextRetrieverAdapter(IContextRetrieverPort):
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, http_client: httpx.AsyncClient):
         self.base_url = base_url
+        # Cliente compartido del pool HTTP (upstream "context")
+        self.client = http_client
         self.logger = logging.getLogger(__name__)
 
     async def retrieve_document_context(
-        self, 
-        vector: List[float], 
+        self,
+        vector: List[float],
         business_id: str,
         top_k: int,
         min_similarity: float
     ) -> List[Dict]:
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/api/embeddings/search/",
-                    json={
-                        "vector": vector,
-                        "top_k": top_k,
-                        "min_similarity": min_similarity,
-                        "business_id": business_id
-                    },
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await self.client.post(
+                f"{self.base_url}/api/embeddings/search/",
+                json={
+                    "vector": vector,
+                    "top_k": top_k,
+                    "min_similarity": min_similarity,
+                    "business_id": business_id
+                },
+                timeout=request_timeout(self.client)
+            )
+            response.raise_for_status()
+            return response.json()
         except httpx.HTTPStatusError as e:
             self.logger.error(f"HTTP error retrieving context: {e}")
             raise
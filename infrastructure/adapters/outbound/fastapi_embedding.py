@@ -2,32 +2,47 @@
 
 import httpx
 from typing import List
+from infrastructure.config.http_pool import request_timeout
 from core.ports.outbound import IEmbeddingClientPort
 import logging
 
 class FastAPIEmbeddingAdapter(IEmbeddingClientPort):
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, http_client: httpx.AsyncClient):
         self.base_url = base_url
+        # Cliente compartido del pool HTTP (upstream "embedding")
+        self.client = http_client
         self.logger = logging.getLogger(__name__)
 
     async def vectorize_text(
-        self, 
-        text: str, 
+        self,
+        text: str,
         model_name: str
         ) -> List[float]:
+        embeddings = await self.vectorize_texts([text], model_name)
+        return embeddings[0]  # Return first embedding vector
+
+    async def vectorize_texts(
+        self,
+        texts: List[str],
+        model_name: str
+        ) -> List[List[float]]:
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/api/v1/embeddings/generate",
-                    json={
-                        "texts": [text],
-                        "embedding_model": model_name
-                    },
-                    timeout=30.0
+            response = await self.client.post(
+                f"{self.base_url}/api/v1/embeddings/generate",
+                json={
+                    "texts": texts,
+                    "embedding_model": model_name
+                },
+                timeout=request_timeout(self.client)
+            )
+            response.raise_for_status()
+            data = response.json()
+            embeddings = data["embeddings"]
+            if len(embeddings) != len(texts):
+                raise ValueError(
+                    f"Embedding service returned {len(embeddings)} vectors for {len(texts)} texts"
                 )
-                response.raise_for_status()
-                data = response.json()
-                return data["embeddings"][0]  # Return first embedding vector
+            return embeddings
         except httpx.HTTPStatusError as e:
             self.logger.error(f"HTTP error vectorizing text: {e}")
             raise
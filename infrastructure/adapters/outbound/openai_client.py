@@ -1,9 +1,10 @@
 # infrastructure/adapters/outbound/openai_client.py
 
 import openai
+from infrastructure.runtime import remaining_timeout
 from core.ports.outbound import ILLMClientPort
 import logging
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 class OpenAIClientAdapter(ILLMClientPort):
     def __init__(self, api_key: str):
@@ -30,9 +31,40 @@ class OpenAIClientAdapter(ILLMClientPort):
                 top_p=top_p,
                 frequency_penalty=frequency_penalty,
                 presence_penalty=presence_penalty,
-                max_tokens=200
+                max_tokens=200,
+                # Sin deadline no hay timeout (comportamiento previo)
+                request_timeout=remaining_timeout()
             )
             return response.choices[0].message.content
         except Exception as e:
             self.logger.error(f"Error generating response with OpenAI: {e}")
+            raise
+
+    async def stream_response(
+        self,
+        prompt: str,
+        model_name: str,
+        temperature: float,
+        top_p: float,
+        frequency_penalty: float,
+        presence_penalty: float
+    ) -> AsyncIterator[str]:
+        try:
+            stream = await openai.ChatCompletion.acreate(
+                model=model_name,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                top_p=top_p,
+                frequency_penalty=frequency_penalty,
+                presence_penalty=presence_penalty,
+                max_tokens=200,
+                stream=True,
+                request_timeout=remaining_timeout()
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.get("content")
+                if delta:
+                    yield delta
+        except Exception as e:
+            self.logger.error(f"Error streaming response with OpenAI: {e}")
             raise
\ No newline at end of file
@@ -0,0 +1,118 @@
+# infrastructure/adapters/outbound/resilient.py
+import httpx
+from typing import Dict, List
+from core.ports.outbound import (
+    IConfigLoaderPort,
+    IEmbeddingClientPort,
+    IContextRetrieverPort
+)
+from infrastructure.runtime import DeadlineExceeded, current_deadline
+from infrastructure.runtime.resilience import ResilientCall
+
+
+# Margen con el que se considera que un timeout lo marcó el deadline del llamador
+DEADLINE_TIMEOUT_SLACK = 0.05
+
+
+def _deadline_exhausted() -> bool:
+    deadline = current_deadline()
+    return deadline is not None and deadline.remaining() <= DEADLINE_TIMEOUT_SLACK
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """
+    Solo los errores del servicio externo cuentan para abrir el circuito:
+    timeouts, errores de conexión y respuestas 5xx/429. Un 4xx es un error de la
+    petición y un deadline agotado es del llamador, no del servicio.
+
+    request_timeout() acota el timeout de httpx por lo que queda del deadline: si
+    el timeout salta con el deadline ya agotado, lo que venció fue el presupuesto
+    del llamador y no el timeout propio del servicio, así que tampoco cuenta.
+    """
+    if isinstance(error, DeadlineExceeded):
+        return False
+    if isinstance(error, httpx.TimeoutException) and _deadline_exhausted():
+        return False
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status in (408, 429)
+    return True
+
+
+class ResilientEmbeddingAdapter(IEmbeddingClientPort):
+    """Circuit breaker y hedging para el servicio de embeddings (llamadas idempotentes)"""
+
+    def __init__(self, inner: IEmbeddingClientPort, guard: ResilientCall):
+        self.inner = inner
+        self.guard = guard
+
+    async def vectorize_text(
+        self,
+        text: str,
+        model_name: str
+        ) -> List[float]:
+        return await self.guard.run(
+            lambda: self.inner.vectorize_text(text, model_name),
+            idempotent=True
+        )
+
+    async def vectorize_texts(
+        self,
+        texts: List[str],
+        model_name: str
+        ) -> List[List[float]]:
+        return await self.guard.run(
+            lambda: self.inner.vectorize_texts(texts, model_name),
+            idempotent=True
+        )
+
+
+class ResilientContextRetrieverAdapter(IContextRetrieverPort):
+    """Circuit breaker y hedging para la búsqueda de contexto (llamada idempotente)"""
+
+    def __init__(self, inner: IContextRetrieverPort, guard: ResilientCall):
+        self.inner = inner
+        self.guard = guard
+
+    async def retrieve_document_context(
+        self,
+        vector: List[float],
+        business_id: str,
+        top_k: int,
+        min_similarity: float
+    ) -> List[Dict]:
+        return await self.guard.run(
+            lambda: self.inner.retrieve_document_context(
+                vector, business_id, top_k, min_similarity
+            ),
+            idempotent=True
+        )
+
+
+class ResilientConfigLoaderAdapter(IConfigLoaderPort):
+    """
+    Circuit breaker para Django. Va debajo de CachedConfigLoaderAdapter: con el
+    circuito abierto la caché sigue sirviendo las entradas vencidas (stale).
+    """
+
+    def __init__(self, inner: IConfigLoaderPort, guard: ResilientCall):
+        self.inner = inner
+        self.guard = guard
+
+    async def load_bot_config(self, business_id: str) -> Dict:
+        return await self.guard.run(
+            lambda: self.inner.load_bot_config(business_id),
+            idempotent=True
+        )
+
+    async def load_bot_template(self, business_id: str, template_type: str) -> Dict:
+        return await self.guard.run(
+            lambda: self.inner.load_bot_template(business_id, template_type),
+            idempotent=True
+        )
+
+    async def load_chunk_settings(self, business_id: str, entity_type: str) -> Dict:
+        return await self.guard.run(
+            lambda: self.inner.load_chunk_settings(business_id, entity_type),
+            idempotent=True
+        )
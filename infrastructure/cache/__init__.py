@@ -0,0 +1,11 @@
+# infrastructure/cache/__init__.py
+from .ttl_cache import AsyncTTLCache
+from .embedding_cache import EmbeddingCache
+from .webhook_dedup import DeliveryClaim, WebhookDeduplicator
+
+__all__ = [
+    'AsyncTTLCache',
+    'EmbeddingCache',
+    'DeliveryClaim',
+    'WebhookDeduplicator'
+]
@@ -0,0 +1,300 @@
+# infrastructure/cache/embedding_cache.py
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: el tier en disco queda sin lock entre procesos
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normaliza el texto para que "Hola ", "hola" y "HOLA" compartan embedding"""
+    text = unicodedata.normalize("NFKC", text)
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def embedding_key(model_name: str, text: str) -> bytes:
+    """Clave de 16 bytes direccionada por contenido: hash(modelo, texto normalizado)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.digest()
+
+
+class MemoryEmbeddingTier:
+    """LRU en memoria acotado en bytes; guarda vectores como arrays float32 compactos"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        vector = self._entries.get(key)
+        if vector is not None:
+            self._entries.move_to_end(key)
+        return vector
+
+    def put(self, key: bytes, vector: np.ndarray) -> None:
+        # Los vectores se comparten entre llamadores: se marcan de solo lectura
+        vector.setflags(write=False)
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes_used -= previous.nbytes
+        if vector.nbytes > self.max_bytes:
+            return
+        self._entries[key] = vector
+        self.bytes_used += vector.nbytes
+        while self.bytes_used > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes_used -= evicted.nbytes
+            self.evictions += 1
+
+
+class MmapEmbeddingTier:
+    """
+    Tabla hash de tamaño fijo en un archivo memory-mapped, compartida por los workers
+    del mismo nodo y persistente entre reinicios. Un archivo por (modelo, dimensión).
+
+    Cada slot guarda [clave 16 bytes][vector float32]. Las escrituras se serializan con
+    flock; las lecturas no bloquean: la clave se borra antes de escribir el vector y se
+    escribe al final, y el lector verifica la clave antes y después de copiar el vector.
+    Si otro proceso tiene el lock, la escritura se omite en lugar de esperarlo.
+
+    Los métodos hacen E/S de disco (open, flock, lectura de páginas): EmbeddingCache
+    los llama en un hilo, nunca en el event loop.
+    """
+
+    MAGIC = b"JAIEMB01"
+    HEADER_BYTES = 64
+    MAX_PROBES = 8
+    _EMPTY_KEY = bytes(16)
+
+    def __init__(self, directory: str, slots: int = 65536):
+        self.directory = directory
+        self.slots = slots
+        self._tables: Dict[tuple, tuple] = {}
+        self._tables_lock = threading.Lock()
+        self.skipped_writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def _safe_model(model_name: str) -> str:
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+
+    def _table_path(self, model_name: str, dim: int) -> str:
+        return os.path.join(self.directory, f"{self._safe_model(model_name)}_{dim}.emb")
+
+    def _existing_dims(self, model_name: str):
+        """Dimensiones con archivo en disco para el modelo (p.ej. tras un reinicio)"""
+        pattern = re.compile(re.escape(self._safe_model(model_name)) + r"_(\d+)\.emb$")
+        for name in os.listdir(self.directory):
+            match = pattern.match(name)
+            if match:
+                yield int(match.group(1))
+
+    def _open_table(self, model_name: str, dim: int, create: bool):
+        table = self._tables.get((model_name, dim))
+        if table is not None:
+            return table
+        with self._tables_lock:
+            return self._tables.get((model_name, dim)) or self._map_table(model_name, dim, create)
+
+    def _map_table(self, model_name: str, dim: int, create: bool):
+        path = self._table_path(model_name, dim)
+        dtype = np.dtype([("key", "V16"), ("vec", "<f4", (dim,))])
+        size = self.HEADER_BYTES + dtype.itemsize * self.slots
+
+        if not os.path.exists(path):
+            if not create:
+                return None
+            with open(path, "ab") as fh:
+                self._lock(fh)
+                try:
+                    if os.path.getsize(path) == 0:
+                        header = self.MAGIC + dim.to_bytes(4, "little") + self.slots.to_bytes(4, "little")
+                        fh.write(header.ljust(self.HEADER_BYTES, b"\x00"))
+                        fh.truncate(size)
+                finally:
+                    self._unlock(fh)
+
+        with open(path, "rb") as fh:
+            header = fh.read(self.HEADER_BYTES)
+        if header[:8] != self.MAGIC or int.from_bytes(header[8:12], "little") != dim:
+            logger.warning(f"Archivo de embeddings incompatible, se ignora: {path}")
+            return None
+        slots = int.from_bytes(header[12:16], "little")
+        if os.path.getsize(path) < self.HEADER_BYTES + dtype.itemsize * slots:
+            logger.warning(f"Archivo de embeddings truncado, se ignora: {path}")
+            return None
+
+        data = np.memmap(path, dtype=dtype, mode="r+", offset=self.HEADER_BYTES, shape=(slots,))
+        table = (path, data, slots)
+        self._tables[(model_name, dim)] = table
+        return table
+
+    @staticmethod
+    def _lock(fh, blocking: bool = True) -> bool:
+        """Lock exclusivo del archivo; sin `blocking` devuelve False si otro proceso lo tiene"""
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    @staticmethod
+    def _unlock(fh) -> None:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+    def _probe(self, key: bytes, slots: int):
+        start = int.from_bytes(key[:8], "little") % slots
+        for i in range(min(self.MAX_PROBES, slots)):
+            yield (start + i) % slots
+
+    def get(self, model_name: str, dim_hint: Optional[int], key: bytes) -> Optional[np.ndarray]:
+        dims = [dim_hint] if dim_hint else list(self._existing_dims(model_name))
+        for dim in dims:
+            table = self._open_table(model_name, dim, create=False)
+            if table is None:
+                continue
+            _, data, slots = table
+            for index in self._probe(key, slots):
+                slot_key = data["key"][index].tobytes()
+                if slot_key == self._EMPTY_KEY:
+                    break
+                if slot_key != key:
+                    continue
+                vector = np.array(data["vec"][index], dtype=np.float32)
+                if data["key"][index].tobytes() == key:
+                    return vector
+                break
+        return None
+
+    def put(self, model_name: str, key: bytes, vector: np.ndarray) -> None:
+        table = self._open_table(model_name, vector.shape[0], create=True)
+        if table is None:
+            return
+        path, data, slots = table
+        with open(path, "rb+") as fh:
+            if not self._lock(fh, blocking=False):
+                # Otro worker está escribiendo: la entrada se guardará en otra ocasión
+                self.skipped_writes += 1
+                return
+            try:
+                target = None
+                for index in self._probe(key, slots):
+                    slot_key = data["key"][index].tobytes()
+                    if slot_key == key or slot_key == self._EMPTY_KEY:
+                        target = index
+                        break
+                if target is None:
+                    # Ventana de sondeo llena: se reemplaza el primer slot (expulsión simple)
+                    target = next(self._probe(key, slots))
+                data["key"][target] = np.void(self._EMPTY_KEY)
+                data["vec"][target] = vector
+                data["key"][target] = np.void(key)
+            finally:
+                self._unlock(fh)
+
+    @property
+    def bytes_used(self) -> int:
+        return sum(os.path.getsize(path) for path, _, _ in list(self._tables.values()))
+
+    def close(self) -> None:
+        for _, data, _ in self._tables.values():
+            data.flush()
+        self._tables.clear()
+
+
+class EmbeddingCache:
+    """Caché de embeddings en dos niveles: LRU en memoria y, opcionalmente, archivo mmap"""
+
+    def __init__(
+        self,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        disk_directory: Optional[str] = None,
+        disk_slots: int = 65536
+    ):
+        self.memory = MemoryEmbeddingTier(max_memory_bytes)
+        self.disk = MmapEmbeddingTier(disk_directory, disk_slots) if disk_directory else None
+        # Dimensión observada por modelo, para ubicar el archivo del tier en disco
+        self._dims: Dict[str, int] = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    async def get(self, model_name: str, text: str) -> Optional[np.ndarray]:
+        key = embedding_key(model_name, text)
+        vector = self.memory.get(key)
+        if vector is not None:
+            self.memory_hits += 1
+            return vector
+
+        if self.disk is not None:
+            try:
+                vector = await asyncio.to_thread(
+                    self.disk.get, model_name, self._dims.get(model_name), key
+                )
+            except Exception as e:
+                logger.error(f"Error leyendo caché de embeddings en disco: {str(e)}")
+                vector = None
+            if vector is not None:
+                self.disk_hits += 1
+                self._dims.setdefault(model_name, vector.shape[0])
+                self.memory.put(key, vector)
+                return vector
+
+        self.misses += 1
+        return None
+
+    async def put(self, model_name: str, text: str, embedding) -> np.ndarray:
+        vector = np.array(embedding, dtype=np.float32)
+        key = embedding_key(model_name, text)
+        self._dims[model_name] = vector.shape[0]
+        self.memory.put(key, vector)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.put, model_name, key, vector)
+            except Exception as e:
+                logger.error(f"Error escribiendo caché de embeddings en disco: {str(e)}")
+        return vector
+
+    def stats(self) -> Dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.bytes_used,
+            "memory_max_bytes": self.memory.max_bytes,
+            "memory_evictions": self.memory.evictions,
+            "disk_bytes": self.disk.bytes_used if self.disk is not None else 0,
+            "disk_skipped_writes": self.disk.skipped_writes if self.disk is not None else 0,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+        }
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
@@ -0,0 +1,183 @@
+# infrastructure/cache/semantic_cache.py
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from core.ports.outbound import IAnswerCachePort, CachedAnswer
+
+logger = logging.getLogger(__name__)
+
+
+class _BusinessIndex:
+    """
+    Respuestas cacheadas de un negocio. Los embeddings de las preguntas se guardan
+    normalizados en una matriz float32 contigua para que la búsqueda del vecino más
+    cercano sea un único producto matriz-vector. La matriz crece hasta `max_capacity`
+    y a partir de ahí funciona como buffer circular.
+    """
+
+    INITIAL_CAPACITY = 16
+
+    def __init__(self, dim: int, max_capacity: int, version: str):
+        self.version = version
+        self.max_capacity = max_capacity
+        capacity = min(self.INITIAL_CAPACITY, max_capacity)
+        self.matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self.answers: List[Optional[str]] = [None] * capacity
+        self.created_at = np.zeros(capacity, dtype=np.float64)
+        self.generation_seconds = np.zeros(capacity, dtype=np.float32)
+        self.size = 0
+        self.next_slot = 0
+
+    def _grow(self) -> None:
+        capacity = min(self.matrix.shape[0] * 2, self.max_capacity)
+        extra = capacity - self.matrix.shape[0]
+        self.matrix = np.vstack([self.matrix, np.zeros((extra, self.matrix.shape[1]), dtype=np.float32)])
+        self.answers.extend([None] * extra)
+        self.created_at = np.concatenate([self.created_at, np.zeros(extra, dtype=np.float64)])
+        self.generation_seconds = np.concatenate([self.generation_seconds, np.zeros(extra, dtype=np.float32)])
+        self.next_slot = self.size
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes + self.created_at.nbytes + self.generation_seconds.nbytes
+
+    def add(self, vector: np.ndarray, answer: str, now: float, generation_seconds: float) -> None:
+        if self.size == self.matrix.shape[0] and self.size < self.max_capacity:
+            self._grow()
+        slot = self.next_slot
+        self.matrix[slot] = vector
+        self.answers[slot] = answer
+        self.created_at[slot] = now
+        self.generation_seconds[slot] = generation_seconds
+        self.next_slot = (slot + 1) % self.matrix.shape[0]
+        self.size = min(self.size + 1, self.matrix.shape[0])
+
+    def nearest(self, vector: np.ndarray, not_before: float):
+        if self.size == 0:
+            return None, 0.0
+        similarities = self.matrix[:self.size] @ vector
+        # Las entradas vencidas nunca ganan
+        similarities[self.created_at[:self.size] < not_before] = -1.0
+        index = int(np.argmax(similarities))
+        return index, float(similarities[index])
+
+
+class SemanticAnswerCache(IAnswerCachePort):
+    """
+    Caché semántica de respuestas por negocio: si una pregunta nueva tiene similitud
+    coseno >= `min_similarity` con una ya respondida (con la misma versión de
+    configuración/plantilla) se reutiliza la respuesta y se evita RAG + LLM.
+    """
+
+    def __init__(
+        self,
+        min_similarity: float = 0.95,
+        ttl_seconds: float = 3600.0,
+        max_entries_per_business: int = 1024,
+        max_businesses: int = 256,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.min_similarity = min_similarity
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_business = max_entries_per_business
+        self.max_businesses = max_businesses
+        self._clock = clock
+        self._indexes: "OrderedDict[str, _BusinessIndex]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.saved_seconds = 0.0
+        self._savings_by_business: Dict[str, Dict[str, float]] = {}
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> Optional[np.ndarray]:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(array))
+        if norm == 0.0:
+            return None
+        return array / norm
+
+    async def lookup(
+        self,
+        business_id: str,
+        vector: List[float],
+        version: str,
+        min_similarity: Optional[float] = None
+    ) -> Optional[CachedAnswer]:
+        business_id = str(business_id)
+        index = self._indexes.get(business_id)
+        query = self._normalize(vector)
+
+        if index is None or query is None or index.version != version or index.matrix.shape[1] != query.shape[0]:
+            if index is not None and index.version != version:
+                # Cambió la configuración o la plantilla: las respuestas ya no son válidas
+                self._drop(business_id)
+            self.misses += 1
+            return None
+
+        self._indexes.move_to_end(business_id)
+        slot, similarity = index.nearest(query, self._clock() - self.ttl_seconds)
+        threshold = self.min_similarity if min_similarity is None else min_similarity
+        if slot is None or similarity < threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        saved = float(index.generation_seconds[slot])
+        self.saved_seconds += saved
+        savings = self._savings_by_business.setdefault(
+            business_id, {"hits": 0, "saved_seconds": 0.0}
+        )
+        savings["hits"] += 1
+        savings["saved_seconds"] += saved
+        logger.info(
+            f"Respuesta semántica cacheada - Business: {business_id}, "
+            f"similitud: {similarity:.4f}, ahorro: {saved * 1000:.0f} ms"
+        )
+        return CachedAnswer(content=index.answers[slot], similarity=similarity)
+
+    async def store(
+        self,
+        business_id: str,
+        vector: List[float],
+        answer: str,
+        version: str,
+        generation_seconds: float
+    ) -> None:
+        business_id = str(business_id)
+        entry = self._normalize(vector)
+        if entry is None or not answer:
+            return
+
+        index = self._indexes.get(business_id)
+        if index is None or index.version != version or index.matrix.shape[1] != entry.shape[0]:
+            index = _BusinessIndex(entry.shape[0], self.max_entries_per_business, version)
+            self._indexes[business_id] = index
+
+        index.add(entry, answer, self._clock(), generation_seconds)
+        self._indexes.move_to_end(business_id)
+        while len(self._indexes) > self.max_businesses:
+            self._indexes.popitem(last=False)
+
+    async def invalidate(self, business_id: str) -> None:
+        self._drop(str(business_id))
+
+    def _drop(self, business_id: str) -> None:
+        if self._indexes.pop(business_id, None) is not None:
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "businesses": len(self._indexes),
+            "entries": sum(index.size for index in self._indexes.values()),
+            "bytes": sum(index.nbytes for index in self._indexes.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "saved_seconds": self.saved_seconds,
+            "savings_by_business": self._savings_by_business
+        }
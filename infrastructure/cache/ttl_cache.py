@@ -0,0 +1,180 @@
+# infrastructure/cache/ttl_cache.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+from infrastructure.runtime import deadline_scope
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    stale_until: float
+
+
+class AsyncTTLCache:
+    """
+    Caché asíncrona en memoria con:
+    - TTL por entrada
+    - single-flight: llamadas concurrentes a la misma clave comparten una sola carga
+    - stale-while-revalidate: una entrada vencida se sigue sirviendo durante
+      `stale_ttl` segundos mientras se refresca en segundo plano
+    - tamaño acotado con expulsión LRU
+    - contadores de aciertos/fallos
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        stale_ttl: float = 0.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        # Carga en curso por clave. Invalidar una clave la quita de aquí: una carga que
+        # ya no es la registrada para su clave no re-puebla la caché
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.loads = 0
+        self.load_errors = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float
+    ) -> Any:
+        """Devuelve el valor cacheado o lo carga con `loader` (una sola vez por clave)"""
+        now = self._clock()
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            if now < entry.expires_at:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.value
+
+            if now < entry.stale_until:
+                # Vencida pero servible: se responde ya y se refresca en segundo plano
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._start_load(key, loader, ttl)
+                return entry.value
+
+        if key in self._inflight:
+            # Ya hay una carga en curso para esta clave: se espera la misma
+            self.coalesced += 1
+        else:
+            self.misses += 1
+        task = self._start_load(key, loader, ttl)
+        # shield: si un llamador se cancela no se cancela la carga compartida
+        return await asyncio.shield(task)
+
+    def _start_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float
+    ) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader, ttl))
+            # Los refrescos en segundo plano pueden fallar sin nadie esperando
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        return task
+
+    async def _load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float
+    ) -> Any:
+        self.loads += 1
+        try:
+            # La carga es compartida: no hereda el deadline de la petición que la inició
+            with deadline_scope(None):
+                value = await loader()
+        except Exception as e:
+            self.load_errors += 1
+            logger.error(f"Error cargando clave de caché {key}: {str(e)}")
+            raise
+        finally:
+            current = self._inflight.get(key) is asyncio.current_task()
+            if current:
+                self._inflight.pop(key, None)
+
+        # Solo se descarta si se invalidó esta clave; las demás cargas siguen valiendo
+        if current:
+            self.set(key, value, ttl)
+        return value
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Lectura sin carga: devuelve el valor si sigue vigente (o servible como stale)"""
+        entry = self._entries.get(key)
+        if entry is None or self._clock() >= entry.stale_until:
+            return None
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        now = self._clock()
+        self._entries[key] = _Entry(
+            value=value,
+            expires_at=now + ttl,
+            stale_until=now + ttl + self.stale_ttl
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        return self.invalidate_where(lambda k: k == key) > 0
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Elimina todas las claves que cumplan `predicate` y devuelve cuántas se borraron"""
+        keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            del self._entries[key]
+        # Las cargas en curso siguen respondiendo a quien las espera, pero los
+        # nuevos llamadores inician una carga fresca
+        for key in [key for key in self._inflight if predicate(key)]:
+            del self._inflight[key]
+        return len(keys)
+
+    def keys(self) -> List[Hashable]:
+        return list(self._entries.keys())
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._inflight.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+            "evictions": self.evictions,
+            "inflight": len(self._inflight)
+        }
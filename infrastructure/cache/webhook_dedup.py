@@ -0,0 +1,121 @@
+# infrastructure/cache/webhook_dedup.py
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+from .ttl_cache import AsyncTTLCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DeliveryClaim:
+    """Resultado de registrar una entrega: nueva o duplicada (con su resultado si ya terminó)"""
+    is_new: bool
+    result: Optional[Dict[str, Any]] = None
+
+
+class WebhookDeduplicator:
+    """
+    Idempotencia de los webhooks por identificador de entrega (MessageSid de Twilio,
+    update_id de Telegram). La primera entrega se procesa y su respuesta se guarda
+    `ttl` segundos; los reintentos de la plataforma reciben esa respuesta sin volver
+    a ejecutar el caso de uso. Mientras la primera sigue en curso (como mucho
+    `processing_timeout`) los duplicados se responden sin esperar.
+
+    La memoria sirve a un solo proceso; con `store` (Postgres) la deduplicación se
+    comparte entre réplicas. Si el store falla se procesa la entrega (fail-open).
+    """
+
+    def __init__(
+        self,
+        ttl: float = 86400.0,
+        max_entries: int = 100000,
+        processing_timeout: float = 120.0,
+        store: Optional[Any] = None
+    ):
+        self.ttl = ttl
+        self.processing_timeout = processing_timeout
+        self.store = store
+        # Solo se usan get/set: la carga la hace el propio webhook
+        self.cache = AsyncTTLCache(max_entries=max_entries)
+        self._counters = {"new": 0, "hits": 0, "store_hits": 0, "in_progress_hits": 0, "store_errors": 0}
+
+    async def begin(self, key: str) -> DeliveryClaim:
+        entry = self.cache.get(key)
+        if entry is not None:
+            self._counters["hits"] += 1
+            if entry.result is None:
+                self._counters["in_progress_hits"] += 1
+            return entry
+
+        if self.store is not None:
+            try:
+                claim = await self.store.begin(key, self.processing_timeout)
+            except Exception as e:
+                self._counters["store_errors"] += 1
+                logger.error(f"Error consultando entregas de webhooks: {str(e)}")
+            else:
+                if not claim.is_new:
+                    self._counters["hits"] += 1
+                    self._counters["store_hits"] += 1
+                    if claim.result is None:
+                        self._counters["in_progress_hits"] += 1
+                    else:
+                        self.cache.set(key, claim, self.ttl)
+                    return claim
+
+        self._counters["new"] += 1
+        self.cache.set(key, DeliveryClaim(is_new=False), self.processing_timeout)
+        return DeliveryClaim(is_new=True)
+
+    async def complete(self, key: str, result: Dict[str, Any]) -> None:
+        self.cache.set(key, DeliveryClaim(is_new=False, result=result), self.ttl)
+        if self.store is not None:
+            try:
+                await self.store.complete(key, result, self.ttl)
+            except Exception as e:
+                self._counters["store_errors"] += 1
+                logger.error(f"Error guardando entrega de webhook {key}: {str(e)}")
+
+    async def release(self, key: str) -> None:
+        """Olvida una entrega que falló para que el reintento de la plataforma se procese"""
+        # Entrada ya vencida: invalidate() recorre todas las claves de la caché
+        self.cache.set(key, None, 0)
+        if self.store is not None:
+            try:
+                await self.store.release(key)
+            except Exception as e:
+                self._counters["store_errors"] += 1
+                logger.error(f"Error liberando entrega de webhook {key}: {str(e)}")
+
+    async def run_once(
+        self,
+        key: str,
+        handler: Callable[[], Awaitable[Dict[str, Any]]],
+        is_final: Callable[[Dict[str, Any]], bool] = lambda result: True
+    ) -> Dict[str, Any]:
+        """
+        Ejecuta `handler` solo para la primera entrega de `key`. Los resultados que no
+        son finales (errores) y las excepciones liberan la clave para el reintento.
+        """
+        claim = await self.begin(key)
+        if not claim.is_new:
+            logger.info(f"Entrega duplicada de webhook: {key}")
+            return claim.result or {"status": "duplicate", "message": "Entrega en proceso"}
+        try:
+            result = await handler()
+        except Exception:
+            await self.release(key)
+            raise
+        if is_final(result):
+            await self.complete(key, result)
+        else:
+            await self.release(key)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            "entries": len(self.cache),
+            "persistent": self.store is not None
+        }
@@ -1,8 +1,12 @@
 # infrastructure/config/database.py
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
 from dotenv import load_dotenv
 import logging
 from tenacity import retry, stop_after_attempt, wait_exponential, before_log
@@ -19,14 +23,18 @@ DATABASE_URL = (
     "&connect_timeout=10"  # Timeout de conexión de 10 segundos
 )
 
+# Tamaño del pool sync; también dimensiona el executor de REPOSITORY_BACKEND=threaded
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
 # Configuración mejorada del engine para Neon
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,          # Verifica conexiones antes de usarlas
     isolation_level="READ COMMITTED",  # Nivel de aislamiento más seguro
     pool_recycle=300,            # Recicla conexiones cada 5 minutos (Neon tiene timeout de 5 min)
-    pool_size=5,                 # Conexiones mantenidas en el pool
-    max_overflow=10,             # Conexiones adicionales permitidas
+    pool_size=DB_POOL_SIZE,      # Conexiones mantenidas en el pool
+    max_overflow=DB_MAX_OVERFLOW,  # Conexiones adicionales permitidas
     pool_timeout=30,             # Espera 30 segundos para obtener conexión
     echo_pool=os.getenv('DB_ECHO_POOL', '').lower() == 'true',  # Logs del pool
     echo=os.getenv('DB_ECHO', '').lower() == 'true'             # Logs de queries SQL
@@ -39,22 +47,135 @@ SessionLocal = sessionmaker(
     expire_on_commit=False  # Mejor para aplicaciones web/largo tiempo de vida
 )
 
+# Sesión por petición fuera de FastAPI (gRPC): el ContextVar identifica la petición
+# en curso y scoped_session entrega una Session distinta del pool a cada una
+_request_scope: ContextVar[Optional[object]] = ContextVar("db_request_scope", default=None)
+
+def _current_request_scope() -> object:
+    scope = _request_scope.get()
+    if scope is None:
+        raise RuntimeError("Sesión de DB usada fuera de request_session_scope()")
+    return scope
+
+ScopedSession = scoped_session(SessionLocal, scopefunc=_current_request_scope)
+
 Base = declarative_base()
 
+# Repositorios: "async" (asyncpg, no bloquea el event loop), "threaded" (psycopg2
+# en un pool de hilos) o "sync" (psycopg2 en el event loop)
+REPOSITORY_BACKEND = os.getenv("REPOSITORY_BACKEND", "async").lower()
+
+# Misma base de datos con driver asyncpg (sslmode se pasa como connect_arg `ssl`)
+ASYNC_DATABASE_URL = (
+    f"postgresql+asyncpg://{os.getenv('PGUSER')}:{os.getenv('PGPASSWORD')}"
+    f"@{os.getenv('PGHOST')}:{os.getenv('PGPORT')}/{os.getenv('PGDATABASE')}"
+)
+
+_async_engine: AsyncEngine | None = None
+_async_session_factory: async_sessionmaker | None = None
+
+def get_async_engine() -> AsyncEngine:
+    """Engine asyncio del proceso; se crea en el primer uso"""
+    global _async_engine
+    if _async_engine is None:
+        connect_args = {
+            "timeout": 10,
+            # Con un pooler en modo transacción (pgbouncer) hay que usar 0
+            "statement_cache_size": int(os.getenv("ASYNC_DB_STATEMENT_CACHE_SIZE", "100"))
+        }
+        if os.getenv("SSLMODE"):
+            connect_args["ssl"] = os.getenv("SSLMODE")
+        _async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            connect_args=connect_args,
+            pool_pre_ping=True,
+            isolation_level="READ COMMITTED",
+            pool_recycle=300,
+            pool_size=int(os.getenv("ASYNC_DB_POOL_SIZE", "5")),
+            max_overflow=int(os.getenv("ASYNC_DB_MAX_OVERFLOW", "10")),
+            pool_timeout=30,
+            echo_pool=os.getenv('DB_ECHO_POOL', '').lower() == 'true',
+            echo=os.getenv('DB_ECHO', '').lower() == 'true'
+        )
+    return _async_engine
+
+def get_async_session_factory() -> async_sessionmaker:
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(),
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False
+        )
+    return _async_session_factory
+
+async def dispose_async_engine() -> None:
+    """Cierra las conexiones del engine asyncio (shutdown)"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+        logger.info("Engine asyncio de base de datos cerrado")
+
+# alembic.ini en la raíz del proyecto
+ALEMBIC_CONFIG = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "alembic.ini"
+)
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=4, max=10),
     before=before_log(logger, logging.INFO)
 )
 def init_db():
-    """Crea todas las tablas en la base de datos con reintentos automáticos"""
+    """
+    Verifica la conexión con reintentos automáticos y que el esquema esté en la
+    última migración. Las tablas ya no se crean aquí: `alembic upgrade head`
+    """
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
     try:
-        from infrastructure.persistence.models import Base  # Importar tus modelos aquí
-        Base.metadata.create_all(bind=engine)
-        logger.info("Tablas de la base de datos creadas exitosamente")
+        with engine.connect() as connection:
+            current = MigrationContext.configure(connection).get_current_revision()
+        head = ScriptDirectory.from_config(Config(ALEMBIC_CONFIG)).get_current_head()
     except Exception as e:
-        logger.error(f"Error al crear tablas: {str(e)}")
+        logger.error(f"Error al conectar con la base de datos: {str(e)}")
+        raise
+
+    if current != head:
+        logger.warning(
+            f"Esquema de base de datos en la revisión {current}, la última es {head}: "
+            "ejecute `alembic upgrade head`"
+        )
+    else:
+        logger.info(f"Esquema de base de datos en la revisión {current}")
+
+@contextmanager
+def request_session_scope() -> Iterator[None]:
+    """
+    Equivalente a get_db() para una petición gRPC: mientras dura el bloque,
+    ScopedSession (inyectada en los repositorios sync) resuelve a una Session propia
+    de esta petición y de las tareas que cree; al salir se hace commit o rollback y
+    se devuelve la conexión al pool. Si la petición no usó la sesión no se crea.
+    """
+    token = _request_scope.set(object())
+    try:
+        yield
+        if ScopedSession.registry.has():
+            ScopedSession.commit()
+    except BaseException as e:
+        if ScopedSession.registry.has():
+            ScopedSession.rollback()
+        logger.error(f"Error en la sesión de DB: {str(e)}")
         raise
+    finally:
+        ScopedSession.remove()
+        _request_scope.reset(token)
 
 def get_db():
     """
@@ -1,21 +1,73 @@
 #infrastructure/config/di.py
-from typing import Annotated
+from typing import Annotated, AsyncIterator, Dict, Optional
 from fastapi import Depends
 from sqlalchemy.orm import Session
-from infrastructure.config.database import SessionLocal
-from infrastructure.config.database import get_db
+from infrastructure.config.database import SessionLocal, ScopedSession, request_session_scope
+from infrastructure.config.database import (
+    REPOSITORY_BACKEND,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    get_async_session_factory
+)
+from infrastructure.config.http_pool import HTTPClientPool, build_default_pool
 from infrastructure.adapters.outbound  import (
     DjangoConfigAdapter,
     FastAPIEmbeddingAdapter,
     FastAPIContextRetrieverAdapter,
-    OpenAIClientAdapter
+    OpenAIClientAdapter,
+    CachedConfigLoaderAdapter,
+    CachedEmbeddingAdapter,
+    BatchingEmbeddingAdapter,
+    ResilientEmbeddingAdapter,
+    ResilientContextRetrieverAdapter,
+    ResilientConfigLoaderAdapter,
+    TelegramSender,
+    TwilioWhatsAppSender
 )
+from infrastructure.adapters.outbound.resilient import is_upstream_failure
+from infrastructure.runtime import CircuitBreaker, ResilientCall, KeyedLimiter
+from infrastructure.cache import EmbeddingCache
+from infrastructure.cache.semantic_cache import SemanticAnswerCache
+from infrastructure.cache.webhook_dedup import WebhookDeduplicator
+from infrastructure.adapters.outbound.cached_config import parse_ttl_overrides
 from infrastructure.persistence.repositories import (
     DatabaseEndUserRepository,
     DatabaseConversationRepository,
     DatabaseMessageRepository
 )
+from infrastructure.persistence.async_repositories import (
+    AsyncDatabaseEndUserRepository,
+    AsyncDatabaseConversationRepository,
+    AsyncDatabaseMessageRepository
+)
+from infrastructure.persistence.threaded_repositories import (
+    DatabaseExecutor,
+    ThreadedEndUserRepository,
+    ThreadedConversationRepository,
+    ThreadedMessageRepository
+)
+from infrastructure.persistence.cached_repositories import (
+    IdentityCache,
+    CachedEndUserRepository,
+    CachedConversationRepository
+)
+from infrastructure.persistence.write_behind import WriteBehindMessageRepository
+from infrastructure.persistence.webhook_deliveries import PostgresDeliveryStore
+from infrastructure.queue import (
+    InProcessMessageQueue,
+    MessageJobProcessor,
+    MessageQueue,
+    PostgresMessageQueue,
+    PostgresQueueWorker
+)
+from infrastructure.persistence.unit_of_work import (
+    SyncUnitOfWork,
+    ThreadedUnitOfWork,
+    AsyncUnitOfWork
+)
 from core.use_cases.receive_message import ReceiveMessageUseCase
+from core.use_cases.conversation_history import ConversationHistoryUseCase
+from core.use_cases.burst_coalescer import BurstCoalescer
 from core.ports.outbound import (
     IConfigLoaderPort,
     IEmbeddingClientPort,
@@ -23,9 +75,11 @@ from core.ports.outbound import (
     ILLMClientPort,
     IEndUserRepository,
     IConversationRepository,
-    IMessageRepository
+    IMessageRepository,
+    IAnswerCachePort,
+    IUnitOfWork
 )
-from core.ports.inbound import ( IMessageReceiverPort )
+from core.ports.inbound import ( IMessageReceiverPort, IConversationHistoryPort )
 from infrastructure.adapters.inbound import (
     TwilioWhatsAppAdapter,
     TelegramAdapter,
@@ -39,106 +93,578 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Pool HTTP compartido por todos los adapters outbound (se crea en el startup)
+_http_pool: HTTPClientPool | None = None
+# Config loader con caché: debe ser único por proceso para compartir la caché
+_config_loader: CachedConfigLoaderAdapter | None = None
+# Adapter de Django debajo de la caché y del circuit breaker (para sus métricas)
+_django_config: DjangoConfigAdapter | None = None
+# Cliente de embeddings con caché por contenido (único por proceso)
+_embedding_client: IEmbeddingClientPort | None = None
+_embedding_batcher: BatchingEmbeddingAdapter | None = None
+# Caché semántica de respuestas (única por proceso)
+_answer_cache: SemanticAnswerCache | None = None
+# Circuit breaker y métricas de hedging por servicio externo (django, embedding, context)
+_resilience: Dict[str, ResilientCall] = {}
+# Pool de hilos para los repositorios sync (REPOSITORY_BACKEND=threaded)
+_db_executor: DatabaseExecutor | None = None
+# Caché de usuarios y conversaciones activas (única por proceso)
+_identity_cache: IdentityCache | None = None
+# Escritura diferida de mensajes en lotes (única por proceso para compartir el buffer)
+_message_writer: WriteBehindMessageRepository | None = None
+# Envío de respuestas por canal (únicos por proceso para compartir los límites por destinatario)
+_telegram_sender: TelegramSender | None = None
+_whatsapp_sender: TwilioWhatsAppSender | None = None
+# Cola de mensajes de los webhooks: "sync" (sin cola), "async" (cola en memoria con
+# workers en este proceso) o "durable" (tabla chat_inbound_jobs consumida por worker.py)
+WEBHOOK_PROCESSING_MODE = os.getenv("WEBHOOK_PROCESSING_MODE", "sync").lower()
+_message_queue: MessageQueue | None = None
+# Entregas de webhooks ya procesadas (única por proceso para compartir la memoria)
+_webhook_deduplicator: WebhookDeduplicator | None = None
+# Ráfagas abiertas por conversación (única por proceso para que los mensajes se encuentren)
+_burst_coalescer: BurstCoalescer | None = None
+# Grafo de objetos del proceso: adapters sin estado por petición y caso de uso se
+# crean una vez (init_container); solo la Session de la DB es por petición
+_context_retriever: IContextRetrieverPort | None = None
+_llm_client: ILLMClientPort | None = None
+_message_use_case: ReceiveMessageUseCase | None = None
+_history_use_case: ConversationHistoryUseCase | None = None
+_twilio_adapter: TwilioWhatsAppAdapter | None = None
+_telegram_adapter: TelegramAdapter | None = None
+_websocket_adapter: WebSocketAdapter | None = None
+
+def init_http_pool() -> HTTPClientPool:
+    """Crea el pool HTTP del proceso. Se llama desde el startup de main.py"""
+    global _http_pool
+    if _http_pool is None:
+        _http_pool = build_default_pool()
+        logger.info("Pool HTTP inicializado")
+    return _http_pool
+
+async def close_http_pool() -> None:
+    """Cierra el pool HTTP del proceso. Se llama desde el shutdown de main.py"""
+    global _http_pool, _config_loader, _django_config, _embedding_client, _embedding_batcher
+    await close_channel_senders()
+    _config_loader = None
+    _django_config = None
+    if _embedding_batcher is not None:
+        await _embedding_batcher.aclose()
+        _embedding_batcher = None
+    if isinstance(_embedding_client, CachedEmbeddingAdapter):
+        _embedding_client.cache.close()
+    _embedding_client = None
+    if _http_pool is not None:
+        await _http_pool.aclose()
+        _http_pool = None
+        logger.info("Pool HTTP cerrado")
+
+def get_http_pool() -> HTTPClientPool:
+    if _http_pool is None:
+        raise RuntimeError("Pool HTTP no inicializado: llame a init_http_pool() en el startup")
+    return _http_pool
+
+def get_resilience(name: str) -> ResilientCall:
+    """
+    Circuit breaker (y hedging opcional) de un servicio externo, configurable con
+    CIRCUIT_<NAME>_FAILURE_THRESHOLD, CIRCUIT_<NAME>_RECOVERY_SECONDS y HEDGE_<NAME>_ENABLED
+    """
+    guard = _resilience.get(name)
+    if guard is None:
+        prefix = name.upper()
+        guard = ResilientCall(
+            CircuitBreaker(
+                name,
+                failure_threshold=int(os.getenv(f"CIRCUIT_{prefix}_FAILURE_THRESHOLD", "5")),
+                recovery_timeout=float(os.getenv(f"CIRCUIT_{prefix}_RECOVERY_SECONDS", "30"))
+            ),
+            hedge=os.getenv(f"HEDGE_{prefix}_ENABLED", "false").lower() == "true",
+            hedge_percentile=float(os.getenv("HEDGE_PERCENTILE", "95")),
+            hedge_min_delay=float(os.getenv("HEDGE_MIN_DELAY_MS", "50")) / 1000,
+            is_failure=is_upstream_failure
+        )
+        _resilience[name] = guard
+    return guard
+
+def get_resilience_stats() -> Dict[str, Dict]:
+    return {name: guard.stats() for name, guard in _resilience.items()}
+
+def get_db_executor() -> DatabaseExecutor:
+    global _db_executor
+    if _db_executor is None:
+        _db_executor = DatabaseExecutor(
+            SessionLocal,
+            max_workers=int(os.getenv("DB_EXECUTOR_MAX_WORKERS", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+        )
+    return _db_executor
+
+def close_db_executor() -> None:
+    """Espera a que terminen las operaciones en curso del pool de hilos (shutdown)"""
+    global _db_executor
+    if _db_executor is not None:
+        _db_executor.shutdown()
+        _db_executor = None
+
+def get_db_executor_stats() -> Optional[Dict]:
+    return _db_executor.stats() if _db_executor else None
+
+def get_identity_cache() -> Optional[IdentityCache]:
+    """Caché de identidad; None si IDENTITY_CACHE_ENABLED=false"""
+    global _identity_cache
+    if os.getenv("IDENTITY_CACHE_ENABLED", "true").lower() != "true":
+        return None
+    if _identity_cache is None:
+        _identity_cache = IdentityCache(
+            max_entries=int(os.getenv("IDENTITY_CACHE_MAX_ENTRIES", "10000")),
+            user_ttl=float(os.getenv("IDENTITY_CACHE_USER_TTL_SECONDS", "600")),
+            conversation_ttl=float(os.getenv("IDENTITY_CACHE_CONVERSATION_TTL_SECONDS", "300")),
+            negative_ttl=float(os.getenv("IDENTITY_CACHE_NEGATIVE_TTL_SECONDS", "5"))
+        )
+    return _identity_cache
+
+def get_message_writer() -> Optional[WriteBehindMessageRepository]:
+    """Buffer de escritura diferida de mensajes; None si MESSAGE_WRITE_BEHIND_ENABLED=false"""
+    global _message_writer
+    if os.getenv("MESSAGE_WRITE_BEHIND_ENABLED", "false").lower() != "true":
+        return None
+    if _message_writer is None:
+        # Los lotes se escriben desde una tarea de fondo: nunca con la Session de una
+        # petición, y con el backend sync también vía pool de hilos para no bloquear el loop
+        if REPOSITORY_BACKEND == "async":
+            inner: IMessageRepository = AsyncDatabaseMessageRepository(get_async_session_factory())
+        else:
+            inner = ThreadedMessageRepository(get_db_executor())
+        _message_writer = WriteBehindMessageRepository(
+            inner,
+            max_buffer=int(os.getenv("MESSAGE_WRITE_BEHIND_MAX_BUFFER", "10000")),
+            batch_size=int(os.getenv("MESSAGE_WRITE_BEHIND_BATCH_SIZE", "500")),
+            flush_interval=float(os.getenv("MESSAGE_WRITE_BEHIND_FLUSH_INTERVAL_MS", "200")) / 1000,
+            retry_delay=float(os.getenv("MESSAGE_WRITE_BEHIND_RETRY_SECONDS", "1"))
+        )
+    return _message_writer
+
+async def close_message_writer() -> None:
+    """Escribe los mensajes pendientes del buffer. Se llama en el shutdown antes de cerrar la base de datos"""
+    global _message_writer
+    if _message_writer is not None:
+        await _message_writer.aclose(
+            timeout=float(os.getenv("MESSAGE_WRITE_BEHIND_DRAIN_SECONDS", "30"))
+        )
+        _message_writer = None
+
+def get_message_writer_stats() -> Optional[Dict]:
+    return _message_writer.stats() if _message_writer else None
+
+def _sender_options(prefix: str) -> Dict:
+    return {
+        "max_retries": int(os.getenv(f"{prefix}_MAX_RETRIES", os.getenv("CHANNEL_SEND_MAX_RETRIES", "3"))),
+        "backoff_base": float(os.getenv("CHANNEL_SEND_BACKOFF_SECONDS", "0.5")),
+        "max_retry_after": float(os.getenv("CHANNEL_SEND_MAX_RETRY_AFTER_SECONDS", "60")),
+        "max_pending": int(os.getenv("CHANNEL_SEND_MAX_PENDING", "1000"))
+    }
+
+def get_telegram_sender() -> TelegramSender:
+    """
+    Envío por la Bot API de Telegram: ~1 mensaje/s por chat y 30/s por bot por defecto
+    """
+    global _telegram_sender
+    if _telegram_sender is None:
+        _telegram_sender = TelegramSender(
+            get_http_pool().client("telegram"),
+            KeyedLimiter(
+                per_key_interval=float(os.getenv("TELEGRAM_SEND_PER_CHAT_INTERVAL_SECONDS", "1.0")),
+                group_rate=float(os.getenv("TELEGRAM_SEND_PER_BOT_RATE", "30")),
+                group_burst=float(os.getenv("TELEGRAM_SEND_PER_BOT_RATE", "30")),
+                max_concurrency=int(os.getenv("TELEGRAM_SEND_MAX_CONCURRENCY", "30"))
+            ),
+            base_url=os.getenv("TELEGRAM_API_BASE_URL", "https://api.telegram.org"),
+            **_sender_options("TELEGRAM_SEND")
+        )
+    return _telegram_sender
+
+def get_whatsapp_sender() -> TwilioWhatsAppSender:
+    """
+    Envío de WhatsApp por la API REST de Twilio: mensajes en orden por destinatario
+    y tasa limitada por número emisor
+    """
+    global _whatsapp_sender
+    if _whatsapp_sender is None:
+        _whatsapp_sender = TwilioWhatsAppSender(
+            get_http_pool().client("twilio"),
+            KeyedLimiter(
+                per_key_interval=float(os.getenv("TWILIO_SEND_PER_RECIPIENT_INTERVAL_SECONDS", "0")),
+                group_rate=float(os.getenv("TWILIO_SEND_PER_SENDER_RATE", "80")),
+                group_burst=float(os.getenv("TWILIO_SEND_PER_SENDER_RATE", "80")),
+                max_concurrency=int(os.getenv("TWILIO_SEND_MAX_CONCURRENCY", "20"))
+            ),
+            account_sid=os.getenv("TWILIO_ACCOUNT_SID"),
+            auth_token=os.getenv("TWILIO_AUTH_TOKEN"),
+            default_from=os.getenv("TWILIO_WHATSAPP_FROM", "whatsapp:+14155238886"),
+            base_url=os.getenv("TWILIO_API_BASE_URL", "https://api.twilio.com"),
+            **_sender_options("TWILIO_SEND")
+        )
+    return _whatsapp_sender
+
+async def close_channel_senders() -> None:
+    """Espera los envíos en curso (shutdown), antes de cerrar el pool HTTP"""
+    global _telegram_sender, _whatsapp_sender
+    timeout = float(os.getenv("CHANNEL_SEND_DRAIN_SECONDS", "10"))
+    for sender in (_telegram_sender, _whatsapp_sender):
+        if sender is not None:
+            await sender.aclose(timeout)
+    _telegram_sender = None
+    _whatsapp_sender = None
+
+def get_channel_sender_stats() -> Dict:
+    return {
+        "telegram": _telegram_sender.stats() if _telegram_sender else None,
+        "whatsapp": _whatsapp_sender.stats() if _whatsapp_sender else None
+    }
+
+def build_message_processor() -> MessageJobProcessor:
+    init_container()
+    return MessageJobProcessor(
+        _message_use_case,
+        senders={"whatsapp": get_whatsapp_sender(), "telegram": get_telegram_sender()},
+        budget_seconds=float(os.getenv("MESSAGE_WORKER_BUDGET_SECONDS", "60"))
+    )
+
+def build_durable_queue() -> PostgresMessageQueue:
+    """
+    Cola en Postgres. La visibilidad debe superar el presupuesto del worker más el
+    envío de la respuesta, o los trabajos lentos se entregarían dos veces
+    """
+    return PostgresMessageQueue(
+        get_async_session_factory(),
+        visibility_timeout=float(os.getenv("MESSAGE_QUEUE_VISIBILITY_SECONDS", "120")),
+        max_attempts=int(os.getenv("MESSAGE_QUEUE_MAX_ATTEMPTS", "5")),
+        retry_backoff=float(os.getenv("MESSAGE_QUEUE_RETRY_SECONDS", "5"))
+    )
+
+def build_queue_worker() -> PostgresQueueWorker:
+    """Consumidor de la cola durable para worker.py (después de init_http_pool)"""
+    return PostgresQueueWorker(
+        build_durable_queue(),
+        build_message_processor(),
+        concurrency=int(os.getenv("MESSAGE_WORKERS", "8")),
+        poll_interval=float(os.getenv("MESSAGE_QUEUE_POLL_SECONDS", "1.0"))
+    )
+
+def init_message_queue() -> Optional[MessageQueue]:
+    """
+    Cola de los webhooks según WEBHOOK_PROCESSING_MODE; en modo async arranca los
+    workers en este proceso. Se llama desde el startup de main.py, después de init_container()
+    """
+    global _message_queue
+    if _message_queue is not None:
+        return _message_queue
+    if WEBHOOK_PROCESSING_MODE == "durable":
+        _message_queue = build_durable_queue()
+        logger.info("Webhooks encolados en la cola durable (chat_inbound_jobs)")
+    elif WEBHOOK_PROCESSING_MODE == "async":
+        _message_queue = InProcessMessageQueue(
+            build_message_processor(),
+            workers=int(os.getenv("MESSAGE_WORKERS", "8")),
+            max_size=int(os.getenv("MESSAGE_QUEUE_MAX_SIZE", "1000"))
+        )
+        _message_queue.start()
+    return _message_queue
+
+async def close_message_queue() -> None:
+    """Procesa lo encolado y detiene los workers (shutdown), antes de cerrar el contenedor"""
+    global _message_queue
+    if isinstance(_message_queue, InProcessMessageQueue):
+        await _message_queue.aclose(float(os.getenv("MESSAGE_QUEUE_DRAIN_SECONDS", "30")))
+        logger.info("Cola de mensajes cerrada")
+    _message_queue = None
+
+async def get_message_queue_stats() -> Optional[Dict]:
+    if _message_queue is None:
+        return None
+    return {"mode": WEBHOOK_PROCESSING_MODE, **await _message_queue.stats()}
+
+def get_webhook_deduplicator() -> Optional[WebhookDeduplicator]:
+    """
+    Idempotencia de los webhooks (WEBHOOK_DEDUP_ENABLED). En memoria por defecto;
+    con WEBHOOK_DEDUP_PERSISTENT=true también en Postgres para varias réplicas
+    """
+    global _webhook_deduplicator
+    if os.getenv("WEBHOOK_DEDUP_ENABLED", "true").lower() != "true":
+        return None
+    if _webhook_deduplicator is None:
+        store = None
+        if os.getenv("WEBHOOK_DEDUP_PERSISTENT", "false").lower() == "true":
+            store = PostgresDeliveryStore(get_async_session_factory())
+        _webhook_deduplicator = WebhookDeduplicator(
+            ttl=float(os.getenv("WEBHOOK_DEDUP_TTL_SECONDS", "86400")),
+            max_entries=int(os.getenv("WEBHOOK_DEDUP_MAX_ENTRIES", "100000")),
+            processing_timeout=float(os.getenv("WEBHOOK_DEDUP_PROCESSING_SECONDS", "120")),
+            store=store
+        )
+    return _webhook_deduplicator
+
+def get_webhook_dedup_stats() -> Optional[Dict]:
+    return _webhook_deduplicator.stats() if _webhook_deduplicator else None
+
+def get_burst_coalescer() -> BurstCoalescer:
+    """
+    Agrupación de ráfagas de los webhooks. La ventana es MESSAGE_DEBOUNCE_SECONDS
+    (0 = desactivada) salvo que el negocio defina message_debounce_seconds en su configuración
+    """
+    global _burst_coalescer
+    if _burst_coalescer is None:
+        _burst_coalescer = BurstCoalescer(
+            max_wait=float(os.getenv("MESSAGE_DEBOUNCE_MAX_WAIT_SECONDS", "6"))
+        )
+    return _burst_coalescer
+
+def get_burst_stats() -> Optional[Dict]:
+    return _burst_coalescer.stats() if _burst_coalescer else None
+
+def get_config_cache() -> CachedConfigLoaderAdapter:
+    """Caché de configuración del proceso (usada por el endpoint de invalidación)"""
+    global _config_loader, _django_config
+    if _config_loader is None:
+        _django_config = DjangoConfigAdapter(
+            os.getenv("DJANGO_API_URL"),
+            get_http_pool().client("django")
+        )
+        _config_loader = CachedConfigLoaderAdapter(
+            ResilientConfigLoaderAdapter(_django_config, get_resilience("django")),
+            default_ttl=float(os.getenv("CONFIG_CACHE_TTL_SECONDS", "300")),
+            stale_ttl=float(os.getenv("CONFIG_CACHE_STALE_SECONDS", "3600")),
+            max_entries=int(os.getenv("CONFIG_CACHE_MAX_ENTRIES", "2048")),
+            ttl_overrides=parse_ttl_overrides(os.getenv("CONFIG_CACHE_TTL_OVERRIDES"))
+        )
+    return _config_loader
+
 def get_config_loader() -> IConfigLoaderPort:
-    return DjangoConfigAdapter(os.getenv("DJANGO_API_URL"))
+    return get_config_cache()
+
+def get_django_config_stats() -> Dict:
+    return _django_config.stats() if _django_config else {"not_modified": 0, "validators": 0}
 
 def get_embedding_client() -> IEmbeddingClientPort:
-    return FastAPIEmbeddingAdapter(os.getenv("FASTAPI_EMBEDDING_URL"))
+    global _embedding_client, _embedding_batcher
+    if _embedding_client is None:
+        client: IEmbeddingClientPort = ResilientEmbeddingAdapter(
+            FastAPIEmbeddingAdapter(
+                os.getenv("FASTAPI_EMBEDDING_URL"),
+                get_http_pool().client("embedding")
+            ),
+            get_resilience("embedding")
+        )
+        if os.getenv("EMBEDDING_BATCH_ENABLED", "true").lower() == "true":
+            _embedding_batcher = BatchingEmbeddingAdapter(
+                client,
+                max_batch_size=int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32")),
+                max_delay=float(os.getenv("EMBEDDING_BATCH_MAX_DELAY_MS", "5")) / 1000
+            )
+            client = _embedding_batcher
+        if os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true":
+            client = CachedEmbeddingAdapter(
+                client,
+                EmbeddingCache(
+                    max_memory_bytes=int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+                    # Directorio compartido por los workers del nodo; vacío = solo memoria
+                    disk_directory=os.getenv("EMBEDDING_CACHE_DIR") or None,
+                    disk_slots=int(os.getenv("EMBEDDING_CACHE_DISK_SLOTS", "65536"))
+                )
+            )
+        _embedding_client = client
+    return _embedding_client
+
+def get_answer_cache() -> Optional[IAnswerCachePort]:
+    """Caché semántica de respuestas; None si ANSWER_CACHE_ENABLED no está activo"""
+    global _answer_cache
+    if os.getenv("ANSWER_CACHE_ENABLED", "false").lower() != "true":
+        return None
+    if _answer_cache is None:
+        _answer_cache = SemanticAnswerCache(
+            min_similarity=float(os.getenv("ANSWER_CACHE_MIN_SIMILARITY", "0.95")),
+            ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600")),
+            max_entries_per_business=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES_PER_BUSINESS", "1024")),
+            max_businesses=int(os.getenv("ANSWER_CACHE_MAX_BUSINESSES", "256"))
+        )
+    return _answer_cache
 
 def get_context_retriever() -> IContextRetrieverPort:
-    return FastAPIContextRetrieverAdapter(os.getenv("FASTAPI_CONTEXT_URL"))
+    global _context_retriever
+    if _context_retriever is None:
+        _context_retriever = ResilientContextRetrieverAdapter(
+            FastAPIContextRetrieverAdapter(
+                os.getenv("FASTAPI_CONTEXT_URL"),
+                get_http_pool().client("context")
+            ),
+            get_resilience("context")
+        )
+    return _context_retriever
 
 def get_llm_client() -> ILLMClientPort:
-    return OpenAIClientAdapter(os.getenv("OPENAI_API_KEY"))
-
-def get_end_user_repository(db: Session = Depends(get_db)) -> IEndUserRepository:
-    return DatabaseEndUserRepository(db)
-
-def get_conversation_repository(db: Session = Depends(get_db)) -> IConversationRepository:
-    return DatabaseConversationRepository(db)
-
-def get_message_repository(db: Session = Depends(get_db)) -> IMessageRepository:
-    return DatabaseMessageRepository(db)
-
-def get_message_use_case(
-    config_loader: IConfigLoaderPort = Depends(get_config_loader),
-    embedding_client: IEmbeddingClientPort = Depends(get_embedding_client),
-    context_retriever: IContextRetrieverPort = Depends(get_context_retriever),
-    llm_client: ILLMClientPort = Depends(get_llm_client),
-    end_user_repo: IEndUserRepository = Depends(get_end_user_repository),
-    conversation_repo: IConversationRepository = Depends(get_conversation_repository),
-    message_repo: IMessageRepository = Depends(get_message_repository)
-) -> ReceiveMessageUseCase:
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = OpenAIClientAdapter(os.getenv("OPENAI_API_KEY"))
+    return _llm_client
+
+async def db_request_scope() -> AsyncIterator[None]:
+    """
+    Dependencia FastAPI: lo único por petición es la Session de los repositorios
+    sync (ScopedSession). Es async para que el ContextVar del scope quede fijado en
+    la tarea de la petición y no en un hilo del threadpool.
+    """
+    with request_session_scope():
+        yield
+
+# Los repositorios se crean una vez junto con el caso de uso. Con REPOSITORY_BACKEND=sync
+# usan ScopedSession, que resuelve a la Session de la petición en curso; con async|threaded
+# abren su propia sesión por operación
+def get_end_user_repository(db: Optional[Session] = None) -> IEndUserRepository:
+    if REPOSITORY_BACKEND == "async":
+        repo = AsyncDatabaseEndUserRepository(get_async_session_factory())
+    elif REPOSITORY_BACKEND == "threaded":
+        repo = ThreadedEndUserRepository(get_db_executor())
+    else:
+        repo = DatabaseEndUserRepository(db or ScopedSession)
+    cache = get_identity_cache()
+    return CachedEndUserRepository(repo, cache) if cache else repo
+
+def get_conversation_repository(db: Optional[Session] = None) -> IConversationRepository:
+    if REPOSITORY_BACKEND == "async":
+        repo = AsyncDatabaseConversationRepository(get_async_session_factory())
+    elif REPOSITORY_BACKEND == "threaded":
+        repo = ThreadedConversationRepository(get_db_executor())
+    else:
+        repo = DatabaseConversationRepository(db or ScopedSession)
+    cache = get_identity_cache()
+    return CachedConversationRepository(repo, cache) if cache else repo
+
+def get_message_repository(db: Optional[Session] = None) -> IMessageRepository:
+    writer = get_message_writer()
+    if writer is not None:
+        return writer
+    if REPOSITORY_BACKEND == "async":
+        return AsyncDatabaseMessageRepository(get_async_session_factory())
+    if REPOSITORY_BACKEND == "threaded":
+        return ThreadedMessageRepository(get_db_executor())
+    return DatabaseMessageRepository(db or ScopedSession)
+
+def get_unit_of_work(db: Optional[Session] = None) -> IUnitOfWork:
+    """Transacción compartida por los repositorios del mismo backend"""
+    if REPOSITORY_BACKEND == "async":
+        return AsyncUnitOfWork(get_async_session_factory())
+    if REPOSITORY_BACKEND == "threaded":
+        return ThreadedUnitOfWork(get_db_executor())
+    return SyncUnitOfWork(db or ScopedSession)
+
+def build_message_use_case(db: Optional[Session] = None) -> ReceiveMessageUseCase:
     return ReceiveMessageUseCase(
-        config_loader=config_loader,
-        embedding_client=embedding_client,
-        context_retriever=context_retriever,
-        llm_client=llm_client,
-        end_user_repo=end_user_repo,
-        conversation_repo=conversation_repo,
-        message_repo=message_repo
+        config_loader=get_config_loader(),
+        embedding_client=get_embedding_client(),
+        context_retriever=get_context_retriever(),
+        llm_client=get_llm_client(),
+        end_user_repo=get_end_user_repository(db),
+        conversation_repo=get_conversation_repository(db),
+        message_repo=get_message_repository(db),
+        answer_cache=get_answer_cache(),
+        unit_of_work=get_unit_of_work(db),
+        burst_coalescer=get_burst_coalescer(),
+        debounce_seconds=float(os.getenv("MESSAGE_DEBOUNCE_SECONDS", "0"))
     )
 
-def get_twilio_adapter(
-    message_receiver: IMessageReceiverPort = Depends(get_message_use_case)
-) -> TwilioWhatsAppAdapter:
+def init_container() -> None:
     """
-    Crea una instancia del adaptador de Twilio con validación de configuración
+    Construye el grafo de adapters y el caso de uso del proceso. Se llama desde el
+    startup de main.py, después de init_http_pool()
     """
-    # Validar que las variables de entorno estén configuradas
-    required_vars = ["TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN"]
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
-    if missing_vars:
-        raise ValueError(f"Variables de entorno faltantes para Twilio: {missing_vars}")
-    logger.info("Inicializando TwilioWhatsAppAdapter")
-    return TwilioWhatsAppAdapter(message_receiver)
+    global _message_use_case
+    if _message_use_case is None:
+        _message_use_case = build_message_use_case()
+        logger.info("Contenedor de la aplicación inicializado")
 
-def get_telegram_adapter(
-    message_receiver: IMessageReceiverPort = Depends(get_message_use_case)
-) -> TelegramAdapter:
+def close_container() -> None:
+    """Descarta el grafo del proceso (shutdown), antes de cerrar el pool HTTP"""
+    global _message_use_case, _history_use_case, _context_retriever, _llm_client
+    global _twilio_adapter, _telegram_adapter, _websocket_adapter
+    _message_use_case = None
+    _history_use_case = None
+    _context_retriever = None
+    _llm_client = None
+    _twilio_adapter = None
+    _telegram_adapter = None
+    _websocket_adapter = None
+
+def get_message_use_case(_: None = Depends(db_request_scope)) -> ReceiveMessageUseCase:
+    init_container()
+    return _message_use_case
+
+def get_history_use_case(_: None = Depends(db_request_scope)) -> IConversationHistoryPort:
+    global _history_use_case
+    if _history_use_case is None:
+        _history_use_case = ConversationHistoryUseCase(
+            get_message_repository(),
+            max_page_size=int(os.getenv("HISTORY_MAX_PAGE_SIZE", "200")),
+            export_batch_size=int(os.getenv("HISTORY_EXPORT_BATCH_SIZE", "500"))
+        )
+    return _history_use_case
+
+def get_twilio_adapter(_: None = Depends(db_request_scope)) -> TwilioWhatsAppAdapter:
+    """
+    Adaptador de Twilio del proceso con validación de configuración
+    """
+    global _twilio_adapter
+    if _twilio_adapter is None:
+        # Validar que las variables de entorno estén configuradas
+        required_vars = ["TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN"]
+        missing_vars = [var for var in required_vars if not os.getenv(var)]
+        if missing_vars:
+            raise ValueError(f"Variables de entorno faltantes para Twilio: {missing_vars}")
+        logger.info("Inicializando TwilioWhatsAppAdapter")
+        init_container()
+        _twilio_adapter = TwilioWhatsAppAdapter(
+            _message_use_case, get_whatsapp_sender(), _message_queue, get_webhook_deduplicator()
+        )
+    return _twilio_adapter
+
+def get_telegram_adapter(_: None = Depends(db_request_scope)) -> TelegramAdapter:
     """
     Valida que al menos un token de Telegram esté configurado
     """
-    # Buscar tokens de Telegram en variables de entorno
-    telegram_tokens = {
-        key: value for key, value in os.environ.items() 
-        if key.startswith("TELEGRAM_TOKEN_") and value
-    }
-    
-    if not telegram_tokens:
-        logger.warning("No se encontraron tokens de Telegram configurados")
-    else:
-        logger.info(f"Tokens de Telegram configurados para: {list(telegram_tokens.keys())}")
-    
-    return TelegramAdapter(message_receiver)
-
-def get_websocket_adapter(
-    message_receiver: ReceiveMessageUseCase = Depends(get_message_use_case)
-) -> WebSocketAdapter:
-    return WebSocketAdapter(
-        message_receiver=message_receiver,
-        webflux_url=os.getenv("WEBFLUX_WS_URL", "ws://webflux:8080/ws/chat")
-    )
+    global _telegram_adapter
+    if _telegram_adapter is None:
+        # Buscar tokens de Telegram en variables de entorno
+        telegram_tokens = {
+            key: value for key, value in os.environ.items() 
+            if key.startswith("TELEGRAM_TOKEN_") and value
+        }
+        
+        if not telegram_tokens:
+            logger.warning("No se encontraron tokens de Telegram configurados")
+        else:
+            logger.info(f"Tokens de Telegram configurados para: {list(telegram_tokens.keys())}")
+        
+        init_container()
+        _telegram_adapter = TelegramAdapter(
+            _message_use_case, get_telegram_sender(), _message_queue, get_webhook_deduplicator()
+        )
+    return _telegram_adapter
+
+def get_websocket_adapter(_: None = Depends(db_request_scope)) -> WebSocketAdapter:
+    global _websocket_adapter
+    if _websocket_adapter is None:
+        init_container()
+        _websocket_adapter = WebSocketAdapter(
+            message_receiver=_message_use_case,
+            webflux_url=os.getenv("WEBFLUX_WS_URL", "ws://webflux:8080/ws/chat")
+        )
+    return _websocket_adapter
 # --- NUEVA FUNCIÓN AGREGADA ---
 def get_message_receiver(db: Session = None) -> IMessageReceiverPort:
     """
     Obtiene el message receiver para uso con gRPC.
     Versión alternativa que no depende del sistema de inyección de FastAPI.
+    Sin `db` devuelve el caso de uso del proceso: sus repositorios sync usan
+    ScopedSession, que en cada RPC (request_session_scope) resuelve a su propia Session.
     """
-    """Versión modificada para gRPC que no depende de FastAPI."""
-    db = db or SessionLocal()
-    #if db is None:
-    #        db = SessionLocal()  # Crea una nueva sesión si no se proporciona
-    try:
-        return ReceiveMessageUseCase(
-            config_loader=get_config_loader(),
-            embedding_client=get_embedding_client(),
-            context_retriever=get_context_retriever(),
-            llm_client=get_llm_client(),
-            end_user_repo=get_end_user_repository(db),
-            conversation_repo=get_conversation_repository(db),
-            message_repo=get_message_repository(db)
-        )
-    except Exception:
-        if db: db.close()  # Limpieza segura
-        raise
\ No newline at end of file
+    if db is not None:
+        return build_message_use_case(db)
+    init_container()
+    return _message_use_case
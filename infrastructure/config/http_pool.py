@@ -0,0 +1,166 @@
+# infrastructure/config/http_pool.py
+import os
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+import httpx
+from infrastructure.runtime import current_deadline
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(key: str, default: float) -> float:
+    value = os.getenv(key)
+    return float(value) if value else default
+
+
+def _env_int(key: str, default: int) -> int:
+    value = os.getenv(key)
+    return int(value) if value else default
+
+
+def _env_bool(key: str, default: bool) -> bool:
+    value = os.getenv(key)
+    return value.lower() == "true" if value else default
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+@dataclass(frozen=True)
+class UpstreamSettings:
+    """Límites de conexión y timeouts de un servicio externo"""
+    name: str
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    write_timeout: float = 10.0
+    pool_timeout: float = 5.0
+    http2: bool = False
+
+    @classmethod
+    def from_env(cls, name: str, **defaults) -> "UpstreamSettings":
+        """
+        Lee la configuración desde variables HTTP_POOL_<NAME>_*, por ejemplo
+        HTTP_POOL_DJANGO_MAX_CONNECTIONS o HTTP_POOL_EMBEDDING_READ_TIMEOUT
+        """
+        base = cls(name=name, **defaults)
+        prefix = f"HTTP_POOL_{name.upper()}_"
+        return cls(
+            name=name,
+            max_connections=_env_int(f"{prefix}MAX_CONNECTIONS", base.max_connections),
+            max_keepalive_connections=_env_int(
+                f"{prefix}MAX_KEEPALIVE", base.max_keepalive_connections
+            ),
+            keepalive_expiry=_env_float(f"{prefix}KEEPALIVE_EXPIRY", base.keepalive_expiry),
+            connect_timeout=_env_float(f"{prefix}CONNECT_TIMEOUT", base.connect_timeout),
+            read_timeout=_env_float(f"{prefix}READ_TIMEOUT", base.read_timeout),
+            write_timeout=_env_float(f"{prefix}WRITE_TIMEOUT", base.write_timeout),
+            pool_timeout=_env_float(f"{prefix}POOL_TIMEOUT", base.pool_timeout),
+            http2=_env_bool(f"{prefix}HTTP2", _env_bool("HTTP_POOL_HTTP2", base.http2)),
+        )
+
+
+class HTTPClientPool:
+    """
+    Pool de clientes httpx compartido por todo el proceso.
+    Mantiene un AsyncClient con keep-alive por servicio externo para reutilizar
+    conexiones TCP/TLS entre mensajes. Se crea en el startup y se cierra en el shutdown.
+    """
+
+    def __init__(self, upstreams: Dict[str, UpstreamSettings]):
+        self._settings = upstreams
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._closed = False
+
+    def _build_client(self, settings: UpstreamSettings) -> httpx.AsyncClient:
+        http2 = settings.http2
+        if http2 and not _http2_available():
+            logger.warning(
+                f"HTTP/2 solicitado para '{settings.name}' pero el paquete h2 no está instalado; usando HTTP/1.1"
+            )
+            http2 = False
+
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.max_connections,
+                max_keepalive_connections=settings.max_keepalive_connections,
+                keepalive_expiry=settings.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.connect_timeout,
+                read=settings.read_timeout,
+                write=settings.write_timeout,
+                pool=settings.pool_timeout,
+            ),
+        )
+
+    def client(self, name: str) -> httpx.AsyncClient:
+        """Devuelve el cliente del servicio indicado, creándolo en el primer uso"""
+        if self._closed:
+            raise RuntimeError("El pool HTTP ya fue cerrado")
+        if name not in self._settings:
+            raise KeyError(f"Servicio externo no configurado en el pool HTTP: {name}")
+
+        client = self._clients.get(name)
+        if client is None:
+            client = self._build_client(self._settings[name])
+            self._clients[name] = client
+            logger.info(f"Cliente HTTP creado para '{name}'")
+        return client
+
+    def settings(self, name: str) -> Optional[UpstreamSettings]:
+        return self._settings.get(name)
+
+    async def aclose(self) -> None:
+        """Cierra todas las conexiones abiertas del pool"""
+        self._closed = True
+        clients, self._clients = self._clients, {}
+        for name, client in clients.items():
+            try:
+                await client.aclose()
+                logger.info(f"Cliente HTTP cerrado para '{name}'")
+            except Exception as e:
+                logger.error(f"Error cerrando cliente HTTP '{name}': {str(e)}")
+
+
+def build_default_pool() -> HTTPClientPool:
+    """Crea el pool con los servicios que usan los adapters outbound"""
+    return HTTPClientPool({
+        "django": UpstreamSettings.from_env("django", read_timeout=10.0),
+        "embedding": UpstreamSettings.from_env("embedding", read_timeout=30.0),
+        "context": UpstreamSettings.from_env("context", read_timeout=30.0),
+        "telegram": UpstreamSettings.from_env("telegram", read_timeout=10.0),
+        "twilio": UpstreamSettings.from_env("twilio", read_timeout=15.0),
+    })
+
+
+def request_timeout(client: httpx.AsyncClient) -> Union[httpx.Timeout, object]:
+    """
+    Timeout de una llamada: los timeouts del upstream acotados por lo que queda del
+    deadline de la petición actual. Lanza DeadlineExceeded si ya no queda presupuesto.
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return httpx.USE_CLIENT_DEFAULT
+
+    remaining = deadline.timeout()
+    base = client.timeout
+
+    def cap(value: Optional[float]) -> float:
+        return remaining if value is None else min(value, remaining)
+
+    return httpx.Timeout(
+        connect=cap(base.connect),
+        read=cap(base.read),
+        write=cap(base.write),
+        pool=cap(base.pool)
+    )
@@ -0,0 +1,255 @@
+# infrastructure/persistence/async_repositories.py
+import logging
+from uuid import UUID
+from datetime import datetime, timedelta
+from typing import Optional, List, AsyncIterator, Tuple
+from contextlib import asynccontextmanager
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from core.domain.entities import EndUser, Conversation, Message
+from core.ports.outbound.repositories import (
+    IEndUserRepository,
+    IConversationRepository,
+    IMessageRepository
+)
+from infrastructure.persistence.session_context import active_session
+from infrastructure.persistence.mappers import (
+    end_user_to_entity,
+    conversation_to_entity,
+    message_to_entity
+)
+from infrastructure.persistence.statements import (
+    upsert_end_user,
+    upsert_active_conversation,
+    close_stale_conversations,
+    insert_messages,
+    messages_in_order,
+    message_page
+)
+from infrastructure.persistence.models import (
+    EndUser as EndUserModel,
+    Conversation as ConversationModel
+)
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def async_session_scope(session_factory: async_sessionmaker) -> AsyncIterator[AsyncSession]:
+    """
+    Scope transaccional sobre una sesión propia. Cada operación usa su propia
+    sesión porque el caso de uso ejecuta varias etapas en paralelo y una
+    AsyncSession no admite uso concurrente. Dentro de una unidad de trabajo se
+    reutiliza su sesión y solo se hace flush.
+    """
+    session = active_session()
+    if isinstance(session, AsyncSession):
+        yield session
+        await session.flush()
+        return
+
+    async with session_factory() as session:
+        try:
+            yield session
+            await session.commit()
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Error en transacción de base de datos: {str(e)}")
+            raise
+        except BaseException:
+            await session.rollback()
+            raise
+
+class AsyncDatabaseEndUserRepository(IEndUserRepository):
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def get_by_external_id(
+        self,
+        external_id: str,
+        channel: str,
+        business_id: str
+    ) -> Optional[EndUser]:
+        try:
+            async with async_session_scope(self.session_factory) as session:
+                user = (await session.execute(
+                    select(EndUserModel).where(
+                        EndUserModel.external_id == external_id,
+                        EndUserModel.channel == channel,
+                        EndUserModel.business_id == business_id
+                    ).limit(1)
+                )).scalar_one_or_none()
+                return end_user_to_entity(user) if user else None
+        except SQLAlchemyError as e:
+            logger.error(f"Error al obtener usuario por external_id: {str(e)}")
+            raise
+
+    async def create(self, end_user: EndUser) -> EndUser:
+        try:
+            async with async_session_scope(self.session_factory) as session:
+                session.add(EndUserModel(
+                    id=end_user.id,
+                    business_id=end_user.business_id,
+                    external_id=end_user.external_id,
+                    channel=end_user.channel,
+                    name=end_user.name,
+                    phone_number=end_user.phone_number,
+                    custommetadata=end_user.metadata or {}
+                ))
+                return end_user
+        except SQLAlchemyError as e:
+            logger.error(f"Error al crear usuario: {str(e)}")
+            raise
+
+    async def get_or_create(self, end_user: EndUser) -> EndUser:
+        try:
+            async with async_session_scope(self.session_factory) as session:
+                user = (await session.execute(upsert_end_user(end_user))).scalar_one()
+                return end_user_to_entity(user)
+        except SQLAlchemyError as e:
+            logger.error(f"Error en get_or_create de usuario: {str(e)}")
+            raise
+
+class AsyncDatabaseConversationRepository(IConversationRepository):
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def get_active_by_user(
+        self,
+        end_user_id: UUID,
+        business_id: str,
+        threshold_minutes: int = 30
+    ) -> Optional[Conversation]:
+        try:
+            async with async_session_scope(self.session_factory) as session:
+                threshold_time = datetime.utcnow() - timedelta(minutes=threshold_minutes)
+                conversation = (await session.execute(
+                    select(ConversationModel).where(
+                        ConversationModel.end_user_id == end_user_id,
+                        ConversationModel.business_id == business_id,
+                        ConversationModel.is_active == True,
+                        ConversationModel.started_at >= threshold_time
+                    ).order_by(ConversationModel.started_at.desc()).limit(1)
+                )).scalar_one_or_none()
+                return conversation_to_entity(conversation) if conversation else None
+        except SQLAlchemyError as e:
+            logger.error(f"Error al obtener conversación activa: {str(e)}")
+            raise
+
+    async def create(self, conversation: Conversation) -> Conversation:
+        try:
+            async with async_session_scope(self.session_factory) as session:
+                session.add(ConversationModel(
+                    id=conversation.id,
+                    end_user_id=conversation.end_user_id,
+                    business_id=conversation.business_id,
+                    channel=conversation.channel,
+                    started_at=conversation.started_at,
+                    is_active=conversation.is_active,
+                    custommetadata=conversation.metadata or {}
+                ))
+                return conversation
+        except SQLAlchemyError as e:
+            logger.error(f"Error al crear conversación: {str(e)}")
+            raise
+
+    async def get_or_create_active(
+        self,
+        conversation: Conversation,
+        threshold_minutes: int = 30
+    ) -> Conversation:
+        try:
+            async with async_session_scope(self.session_factory) as session:
+                threshold_time = datetime.utcnow() - timedelta(minutes=threshold_minutes)
+                row = (await session.execute(
+                    upsert_active_conversation(conversation, threshold_time)
+                )).scalar_one_or_none()
+                if row is None:
+                    # La activa quedó fuera de la ventana: se cierra y se crea la nueva
+                    await session.execute(close_stale_conversations(
+                        conversation.end_user_id, conversation.business_id, threshold_time
+                    ))
+                    row = (await session.execute(
+                        upsert_active_conversation(conversation, threshold_time)
+                    )).scalar_one()
+                return conversation_to_entity(row)
+        except SQLAlchemyError as e:
+            logger.error(f"Error en get_or_create_active de conversación: {str(e)}")
+            raise
+
+    async def close_conversation(self, conversation_id: UUID) -> None:
+        try:
+            async with async_session_scope(self.session_factory) as session:
+                await session.execute(
+                    update(ConversationModel)
+                    .where(ConversationModel.id == conversation_id)
+                    .values(is_active=False, ended_at=datetime.utcnow())
+                )
+        except SQLAlchemyError as e:
+            logger.error(f"Error al cerrar conversación: {str(e)}")
+            raise
+
+class AsyncDatabaseMessageRepository(IMessageRepository):
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def create(self, message: Message) -> Message:
+        try:
+            async with async_session_scope(self.session_factory) as session:
+                # ON CONFLICT (id) DO NOTHING: reintentar un mismo mensaje no lo duplica
+                await session.execute(insert_messages([message]))
+                return message
+        except SQLAlchemyError as e:
+            logger.error(f"Error al crear mensaje: {str(e)}")
+            raise
+
+    async def create_many(self, messages: List[Message]) -> List[Message]:
+        if not messages:
+            return messages
+        try:
+            async with async_session_scope(self.session_factory) as session:
+                await session.execute(insert_messages(messages))
+                return messages
+        except SQLAlchemyError as e:
+            logger.error(f"Error al crear lote de {len(messages)} mensajes: {str(e)}")
+            raise
+
+    async def get_by_conversation(self, conversation_id: UUID) -> List[Message]:
+        try:
+            async with async_session_scope(self.session_factory) as session:
+                messages = await session.execute(messages_in_order(conversation_id))
+                return [message_to_entity(message) for message in messages.scalars()]
+        except SQLAlchemyError as e:
+            logger.error(f"Error al obtener mensajes: {str(e)}")
+            raise
+
+    async def get_page(
+        self,
+        conversation_id: UUID,
+        limit: int = 50,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[Message]:
+        try:
+            async with async_session_scope(self.session_factory) as session:
+                messages = await session.execute(message_page(conversation_id, limit, after))
+                return [message_to_entity(message) for message in messages.scalars()]
+        except SQLAlchemyError as e:
+            logger.error(f"Error al obtener página de mensajes: {str(e)}")
+            raise
+
+    async def stream_by_conversation(
+        self,
+        conversation_id: UUID,
+        batch_size: int = 500
+    ) -> AsyncIterator[Message]:
+        """Cursor del lado del servidor (asyncpg): `batch_size` filas por viaje"""
+        try:
+            async with async_session_scope(self.session_factory) as session:
+                messages = await session.stream(
+                    messages_in_order(conversation_id).execution_options(yield_per=batch_size)
+                )
+                async for message in messages.scalars():
+                    yield message_to_entity(message)
+        except SQLAlchemyError as e:
+            logger.error(f"Error al exportar mensajes: {str(e)}")
+            raise
@@ -0,0 +1,189 @@
+# infrastructure/persistence/cached_repositories.py
+import logging
+from datetime import datetime, timedelta
+from uuid import UUID
+from typing import Any, Dict, Hashable, Optional
+from core.domain.entities import EndUser, Conversation
+from core.ports.outbound.repositories import (
+    IEndUserRepository,
+    IConversationRepository
+)
+from infrastructure.cache import AsyncTTLCache
+from infrastructure.persistence.session_context import after_commit
+
+logger = logging.getLogger(__name__)
+
+# Resultado negativo cacheado ("no existe"), distinto de una clave ausente (None)
+NOT_FOUND = object()
+
+def _channel(channel: Any) -> str:
+    return getattr(channel, "value", channel)
+
+class IdentityCache:
+    """
+    Caché del proceso para resolver (external_id, channel, business_id) -> EndUser y
+    (end_user_id, business_id) -> Conversation activa. LRU acotada en entradas, con
+    TTL corto para los resultados negativos. Las entradas se publican después del
+    commit de la unidad de trabajo, nunca con datos que luego hagan rollback.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        user_ttl: float = 600.0,
+        conversation_ttl: float = 300.0,
+        negative_ttl: float = 5.0
+    ):
+        self.users = AsyncTTLCache(max_entries=max_entries)
+        self.conversations = AsyncTTLCache(max_entries=max_entries)
+        self.user_ttl = user_ttl
+        self.conversation_ttl = conversation_ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def user_key(external_id: str, channel: Any, business_id: Any) -> Hashable:
+        return (str(business_id), _channel(channel), external_id)
+
+    @staticmethod
+    def conversation_key(end_user_id: Any, business_id: Any) -> Hashable:
+        return (str(end_user_id), str(business_id))
+
+    def lookup(self, cache: AsyncTTLCache, key: Hashable) -> Optional[Any]:
+        value = cache.get(key)
+        if value is None:
+            self.misses += 1
+        elif value is NOT_FOUND:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        return value
+
+    def remember_user(self, end_user: Optional[EndUser], key: Hashable) -> None:
+        if end_user is None:
+            self.users.set(key, NOT_FOUND, self.negative_ttl)
+        else:
+            self.users.set(key, end_user, self.user_ttl)
+
+    def remember_conversation(self, conversation: Optional[Conversation], key: Hashable) -> None:
+        if conversation is None:
+            self.conversations.set(key, NOT_FOUND, self.negative_ttl)
+        else:
+            self.conversations.set(key, conversation, self.conversation_ttl)
+
+    def forget_conversation(self, conversation_id: UUID) -> int:
+        """Elimina la conversación cacheada con ese id (búsqueda lineal: cerrar es poco frecuente)"""
+        keys = {
+            key for key in self.conversations.keys()
+            if getattr(self.conversations.get(key), "id", None) == conversation_id
+        }
+        return self.conversations.invalidate_where(lambda key: key in keys)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "users": len(self.users),
+            "conversations": len(self.conversations),
+            "max_entries": self.users.max_entries,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+            "evictions": self.users.evictions + self.conversations.evictions
+        }
+
+class CachedEndUserRepository(IEndUserRepository):
+    def __init__(self, inner: IEndUserRepository, cache: IdentityCache):
+        self.inner = inner
+        self.cache = cache
+
+    async def get_by_external_id(
+        self,
+        external_id: str,
+        channel: str,
+        business_id: str
+    ) -> Optional[EndUser]:
+        key = self.cache.user_key(external_id, channel, business_id)
+        cached = self.cache.lookup(self.cache.users, key)
+        if cached is not None:
+            return None if cached is NOT_FOUND else cached
+
+        end_user = await self.inner.get_by_external_id(external_id, channel, business_id)
+        after_commit(lambda: self.cache.remember_user(end_user, key))
+        return end_user
+
+    async def create(self, end_user: EndUser) -> EndUser:
+        key = self.cache.user_key(end_user.external_id, end_user.channel, end_user.business_id)
+        self.cache.users.invalidate(key)
+        created = await self.inner.create(end_user)
+        after_commit(lambda: self.cache.remember_user(created, key))
+        return created
+
+    async def get_or_create(self, end_user: EndUser) -> EndUser:
+        key = self.cache.user_key(end_user.external_id, end_user.channel, end_user.business_id)
+        cached = self.cache.lookup(self.cache.users, key)
+        if cached is not None and cached is not NOT_FOUND:
+            return cached
+
+        resolved = await self.inner.get_or_create(end_user)
+        after_commit(lambda: self.cache.remember_user(resolved, key))
+        return resolved
+
+class CachedConversationRepository(IConversationRepository):
+    def __init__(self, inner: IConversationRepository, cache: IdentityCache):
+        self.inner = inner
+        self.cache = cache
+
+    def _cached_active(self, key: Hashable, threshold_minutes: int) -> Optional[Any]:
+        cached = self.cache.lookup(self.cache.conversations, key)
+        if cached is None or cached is NOT_FOUND:
+            return cached
+        # Solo sirve mientras siga dentro de la ventana de la conversación activa
+        if cached.started_at < datetime.utcnow() - timedelta(minutes=threshold_minutes):
+            self.cache.conversations.invalidate(key)
+            return None
+        return cached
+
+    async def get_active_by_user(
+        self,
+        end_user_id: UUID,
+        business_id: str,
+        threshold_minutes: int = 30
+    ) -> Optional[Conversation]:
+        key = self.cache.conversation_key(end_user_id, business_id)
+        cached = self._cached_active(key, threshold_minutes)
+        if cached is not None:
+            return None if cached is NOT_FOUND else cached
+
+        conversation = await self.inner.get_active_by_user(end_user_id, business_id, threshold_minutes)
+        after_commit(lambda: self.cache.remember_conversation(conversation, key))
+        return conversation
+
+    async def create(self, conversation: Conversation) -> Conversation:
+        key = self.cache.conversation_key(conversation.end_user_id, conversation.business_id)
+        self.cache.conversations.invalidate(key)
+        created = await self.inner.create(conversation)
+        after_commit(lambda: self.cache.remember_conversation(created, key))
+        return created
+
+    async def get_or_create_active(
+        self,
+        conversation: Conversation,
+        threshold_minutes: int = 30
+    ) -> Conversation:
+        key = self.cache.conversation_key(conversation.end_user_id, conversation.business_id)
+        cached = self._cached_active(key, threshold_minutes)
+        if cached is not None and cached is not NOT_FOUND:
+            return cached
+
+        resolved = await self.inner.get_or_create_active(conversation, threshold_minutes)
+        after_commit(lambda: self.cache.remember_conversation(resolved, key))
+        return resolved
+
+    async def close_conversation(self, conversation_id: UUID) -> None:
+        self.cache.forget_conversation(conversation_id)
+        await self.inner.close_conversation(conversation_id)
+        # Una lectura concurrente pudo volver a cachearla antes del cierre
+        after_commit(lambda: self.cache.forget_conversation(conversation_id))
@@ -0,0 +1,40 @@
+# infrastructure/persistence/mappers.py
+from core.domain.entities import EndUser, Conversation, Message
+from infrastructure.persistence.models import (
+    EndUser as EndUserModel,
+    Conversation as ConversationModel,
+    Message as MessageModel
+)
+
+def end_user_to_entity(user: EndUserModel) -> EndUser:
+    return EndUser(
+        id=user.id,
+        business_id=user.business_id,
+        external_id=user.external_id,
+        channel=user.channel,
+        name=user.name,
+        phone_number=user.phone_number,
+        metadata=user.custommetadata
+    )
+
+def conversation_to_entity(conversation: ConversationModel) -> Conversation:
+    return Conversation(
+        id=conversation.id,
+        end_user_id=conversation.end_user_id,
+        business_id=conversation.business_id,
+        channel=conversation.channel,
+        started_at=conversation.started_at,
+        ended_at=conversation.ended_at,
+        is_active=conversation.is_active,
+        metadata=conversation.custommetadata
+    )
+
+def message_to_entity(message: MessageModel) -> Message:
+    return Message(
+        id=message.id,
+        conversation_id=message.conversation_id,
+        sender_type=message.sender_type,
+        content=message.content,
+        timestamp=message.timestamp,
+        metadata=message.custommetadata
+    )
@@ -0,0 +1,72 @@
+# infrastructure/persistence/migrations/versions/0001_baseline_chat_tables.py
+"""Tablas de chat tal como las creaba init_db (create_all)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+Las bases creadas antes de Alembic ya tienen estas tablas: solo se crean las que
+falten, así `alembic upgrade head` sirve tanto para bases nuevas como existentes.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "chat_end_users" not in existing:
+        op.create_table(
+            "chat_end_users",
+            sa.Column("id", UUID(as_uuid=True), primary_key=True),
+            sa.Column("business_id", UUID(as_uuid=True), nullable=False),
+            sa.Column("external_id", sa.String(255), nullable=False),
+            sa.Column("channel", sa.String(20), nullable=False),
+            sa.Column("name", sa.String(100), nullable=True),
+            sa.Column("phone_number", sa.String(20), nullable=True),
+            sa.Column("custommetadata", sa.JSON, nullable=False),
+            sa.Column("created_at", sa.DateTime),
+            sa.Column("updated_at", sa.DateTime),
+            comment="Store end users information from different channels"
+        )
+
+    if "chat_conversations" not in existing:
+        op.create_table(
+            "chat_conversations",
+            sa.Column("id", UUID(as_uuid=True), primary_key=True),
+            sa.Column("end_user_id", UUID(as_uuid=True), sa.ForeignKey("chat_end_users.id"), nullable=False),
+            sa.Column("business_id", UUID(as_uuid=True), nullable=False),
+            sa.Column("channel", sa.String(20), nullable=False),
+            sa.Column("started_at", sa.DateTime),
+            sa.Column("ended_at", sa.DateTime, nullable=True),
+            sa.Column("is_active", sa.Boolean),
+            sa.Column("custommetadata", sa.JSON, nullable=False),
+            sa.Column("created_at", sa.DateTime),
+            sa.Column("updated_at", sa.DateTime),
+            comment="Store conversations between end users and the system"
+        )
+
+    if "chat_messages" not in existing:
+        op.create_table(
+            "chat_messages",
+            sa.Column("id", UUID(as_uuid=True), primary_key=True),
+            sa.Column("conversation_id", UUID(as_uuid=True), sa.ForeignKey("chat_conversations.id"), nullable=False),
+            sa.Column("sender_type", sa.String(10), nullable=False),
+            sa.Column("content", sa.String(4000), nullable=False),
+            sa.Column("timestamp", sa.DateTime),
+            sa.Column("custommetadata", sa.JSON, nullable=False),
+            sa.Column("created_at", sa.DateTime),
+            comment="Store all messages in conversations"
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("chat_messages")
+    op.drop_table("chat_conversations")
+    op.drop_table("chat_end_users")
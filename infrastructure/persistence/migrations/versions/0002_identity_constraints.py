@@ -0,0 +1,89 @@
+# infrastructure/persistence/migrations/versions/0002_identity_constraints.py
+"""Restricciones de identidad usadas por los upserts de usuarios y conversaciones
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+Antes de crearlas fusiona los duplicados que pudieron crear mensajes simultáneos.
+Si ya se aplicaron a mano (antiguo scripts/sql/add_identity_constraints.sql) no
+hace nada.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    constraints = {c["name"] for c in inspector.get_unique_constraints("chat_end_users")}
+    indexes = {i["name"] for i in inspector.get_indexes("chat_conversations")}
+
+    if "uq_chat_end_users_identity" not in constraints:
+        # Usuarios duplicados: sus conversaciones pasan al usuario más antiguo
+        op.execute("""
+            WITH ranked AS (
+                SELECT id,
+                       first_value(id) OVER (
+                           PARTITION BY business_id, channel, external_id
+                           ORDER BY created_at, id
+                       ) AS keep_id
+                FROM chat_end_users
+            )
+            UPDATE chat_conversations c
+            SET end_user_id = r.keep_id
+            FROM ranked r
+            WHERE c.end_user_id = r.id AND r.id <> r.keep_id
+        """)
+        op.execute("""
+            WITH ranked AS (
+                SELECT id,
+                       first_value(id) OVER (
+                           PARTITION BY business_id, channel, external_id
+                           ORDER BY created_at, id
+                       ) AS keep_id
+                FROM chat_end_users
+            )
+            DELETE FROM chat_end_users u
+            USING ranked r
+            WHERE u.id = r.id AND r.id <> r.keep_id
+        """)
+        op.create_unique_constraint(
+            "uq_chat_end_users_identity",
+            "chat_end_users",
+            ["business_id", "channel", "external_id"]
+        )
+
+    if "uq_chat_conversations_active_user" not in indexes:
+        # Varias conversaciones activas por usuario: queda activa solo la más reciente
+        op.execute("""
+            WITH ranked AS (
+                SELECT id,
+                       row_number() OVER (
+                           PARTITION BY end_user_id, business_id
+                           ORDER BY started_at DESC, id DESC
+                       ) AS rn
+                FROM chat_conversations
+                WHERE is_active
+            )
+            UPDATE chat_conversations c
+            SET is_active = false, ended_at = now() AT TIME ZONE 'utc'
+            FROM ranked r
+            WHERE c.id = r.id AND r.rn > 1
+        """)
+        op.create_index(
+            "uq_chat_conversations_active_user",
+            "chat_conversations",
+            ["end_user_id", "business_id"],
+            unique=True,
+            postgresql_where=sa.text("is_active")
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_chat_conversations_active_user", table_name="chat_conversations")
+    op.drop_constraint("uq_chat_end_users_identity", "chat_end_users", type_="unique")
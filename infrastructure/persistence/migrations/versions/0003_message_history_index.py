@@ -0,0 +1,46 @@
+# infrastructure/persistence/migrations/versions/0003_message_history_index.py
+"""Índice compuesto para leer el historial de una conversación
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+chat_messages se lee por conversation_id ordenado por (timestamp, id). El índice
+(conversation_id, timestamp, id) sirve ese orden sin sort y permite paginar por
+keyset. Se crea CONCURRENTLY (fuera de transacción) para no bloquear escrituras en
+una tabla grande.
+
+Las otras consultas calientes ya tienen índice desde 0002:
+- chat_end_users por (external_id, channel, business_id): uq_chat_end_users_identity
+- chat_conversations activa por (end_user_id, business_id): uq_chat_conversations_active_user,
+  parcial WHERE is_active (como mucho una fila, el ORDER BY started_at no necesita índice)
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_chat_messages_conversation_timestamp"
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # Un CREATE INDEX CONCURRENTLY interrumpido deja un índice inválido
+        invalid = op.get_bind().execute(sa.text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ), {"name": INDEX_NAME}).first()
+        if invalid:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+        op.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} "
+            "ON chat_messages (conversation_id, timestamp, id)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
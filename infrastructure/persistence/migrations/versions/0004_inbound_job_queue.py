@@ -0,0 +1,54 @@
+# infrastructure/persistence/migrations/versions/0004_inbound_job_queue.py
+"""Cola durable de mensajes entrantes de los webhooks
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+Los workers (worker.py) reclaman filas con SELECT ... FOR UPDATE SKIP LOCKED sobre
+el índice parcial de available_at; los trabajos terminados se borran, así que la
+tabla y el índice se mantienen pequeños.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chat_inbound_jobs",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("channel", sa.String(20), nullable=False),
+        sa.Column("business_id", sa.String(255), nullable=False),
+        sa.Column("external_id", sa.String(255), nullable=False),
+        sa.Column("content", sa.Text, nullable=False),
+        sa.Column("custommetadata", sa.JSON, nullable=False),
+        sa.Column("recipient", sa.String(255), nullable=False),
+        sa.Column("reply_from", sa.String(255), nullable=True),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("attempts", sa.Integer, nullable=False),
+        sa.Column("max_attempts", sa.Integer, nullable=False),
+        sa.Column("available_at", sa.DateTime, nullable=False),
+        sa.Column("locked_by", sa.String(100), nullable=True),
+        sa.Column("last_error", sa.Text, nullable=True),
+        sa.Column("enqueued_at", sa.DateTime, nullable=False),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("updated_at", sa.DateTime),
+        comment="Durable queue of inbound webhook messages pending processing"
+    )
+    op.create_index(
+        "ix_chat_inbound_jobs_available",
+        "chat_inbound_jobs",
+        ["available_at"],
+        postgresql_where=sa.text("status IN ('pending', 'processing')")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_inbound_jobs_available", table_name="chat_inbound_jobs")
+    op.drop_table("chat_inbound_jobs")
@@ -0,0 +1,35 @@
+# infrastructure/persistence/migrations/versions/0005_webhook_deliveries.py
+"""Entregas de webhooks ya procesadas (idempotencia entre réplicas)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+Una fila por MessageSid de Twilio o update_id de Telegram con la respuesta dada;
+las vencidas se reutilizan o se borran por expires_at.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chat_webhook_deliveries",
+        sa.Column("key", sa.String(255), primary_key=True),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("result", sa.JSON, nullable=True),
+        sa.Column("expires_at", sa.DateTime, nullable=False),
+        sa.Column("created_at", sa.DateTime),
+        comment="Processed webhook deliveries used to answer platform retries idempotently"
+    )
+    op.create_index("ix_chat_webhook_deliveries_expires_at", "chat_webhook_deliveries", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_webhook_deliveries_expires_at", table_name="chat_webhook_deliveries")
+    op.drop_table("chat_webhook_deliveries")
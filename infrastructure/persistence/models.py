@@ -1,5 +1,7 @@
 #infrastructure/persistence/models.py
-from sqlalchemy import Column, String, Enum, JSON, DateTime, ForeignKey, Boolean
+# El esquema lo gestiona Alembic (infrastructure/persistence/migrations): cualquier
+# cambio aquí necesita su revisión (alembic revision --autogenerate -m "...")
+from sqlalchemy import Column, String, Enum, JSON, DateTime, ForeignKey, Boolean, Index, Integer, Text, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
@@ -10,6 +12,8 @@ Base = declarative_base()
 class EndUser(Base):
     __tablename__ = "chat_end_users"
     __table_args__ = (
+        # Un usuario por identidad de canal: permite el upsert INSERT ... ON CONFLICT
+        UniqueConstraint("business_id", "channel", "external_id", name="uq_chat_end_users_identity"),
         {"comment": "Store end users information from different channels"},
     )
     
@@ -26,6 +30,14 @@ class EndUser(Base):
 class Conversation(Base):
     __tablename__ = "chat_conversations"
     __table_args__ = (
+        # Como mucho una conversación activa por usuario y negocio
+        Index(
+            "uq_chat_conversations_active_user",
+            "end_user_id",
+            "business_id",
+            unique=True,
+            postgresql_where=text("is_active")
+        ),
         {"comment": "Store conversations between end users and the system"},
     )
     
@@ -43,6 +55,8 @@ class Conversation(Base):
 class Message(Base):
     __tablename__ = "chat_messages"
     __table_args__ = (
+        # Historial de una conversación en orden (timestamp, id) y paginación por keyset
+        Index("ix_chat_messages_conversation_timestamp", "conversation_id", "timestamp", "id"),
         {"comment": "Store all messages in conversations"},
     )
     
@@ -52,4 +66,51 @@ class Message(Base):
     content = Column(String(4000), nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
     custommetadata = Column(JSON, nullable=False, default={})
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class InboundJob(Base):
+    __tablename__ = "chat_inbound_jobs"
+    __table_args__ = (
+        # Trabajos que se pueden reclamar: los terminados se borran y los muertos no se leen
+        Index(
+            "ix_chat_inbound_jobs_available",
+            "available_at",
+            postgresql_where=text("status IN ('pending', 'processing')")
+        ),
+        {"comment": "Durable queue of inbound webhook messages pending processing"},
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    channel = Column(String(20), nullable=False)
+    business_id = Column(String(255), nullable=False)
+    external_id = Column(String(255), nullable=False)
+    content = Column(Text, nullable=False)
+    custommetadata = Column(JSON, nullable=False, default={})
+    recipient = Column(String(255), nullable=False)
+    reply_from = Column(String(255), nullable=True)
+    # pending -> processing (visible de nuevo en available_at si el worker no termina) -> borrado | dead
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = Column(String(100), nullable=True)
+    last_error = Column(Text, nullable=True)
+    enqueued_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class WebhookDelivery(Base):
+    __tablename__ = "chat_webhook_deliveries"
+    __table_args__ = (
+        # Limpieza de entregas vencidas
+        Index("ix_chat_webhook_deliveries_expires_at", "expires_at"),
+        {"comment": "Processed webhook deliveries used to answer platform retries idempotently"},
+    )
+
+    key = Column(String(255), primary_key=True)
+    # processing (hasta expires_at) -> done con la respuesta guardada hasta expires_at
+    status = Column(String(20), nullable=False)
+    result = Column(JSON, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -2,7 +2,7 @@
 import logging
 from uuid import UUID
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import AsyncIterator, Iterator, Optional, List, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from contextlib import contextmanager
@@ -13,10 +13,23 @@ from core.ports.outbound.repositories import (
     IConversationRepository,
     IMessageRepository
 )
+from infrastructure.persistence.session_context import active_session
+from infrastructure.persistence.mappers import (
+    end_user_to_entity,
+    conversation_to_entity,
+    message_to_entity
+)
+from infrastructure.persistence.statements import (
+    upsert_end_user,
+    upsert_active_conversation,
+    close_stale_conversations,
+    insert_messages,
+    messages_in_order,
+    message_page
+)
 from infrastructure.persistence.models import (
     EndUser as EndUserModel,
-    Conversation as ConversationModel,
-    Message as MessageModel
+    Conversation as ConversationModel
 )
 
 logger = logging.getLogger(__name__)
@@ -24,6 +37,11 @@ logger = logging.getLogger(__name__)
 @contextmanager
 def session_scope(db: Session):
     """Proporciona un scope transaccional alrededor de una serie de operaciones."""
+    if active_session() is db:
+        # Dentro de una unidad de trabajo: el commit y el cierre son de la unidad
+        yield db
+        db.flush()
+        return
     try:
         yield db
         db.commit()
@@ -48,6 +66,14 @@ class DatabaseEndUserRepository(IEndUserRepository):
         channel: str, 
         business_id: str
     ) -> Optional[EndUser]:
+        return self.get_by_external_id_sync(external_id, channel, business_id)
+
+    def get_by_external_id_sync(
+        self, 
+        external_id: str, 
+        channel: str, 
+        business_id: str
+    ) -> Optional[EndUser]:
         
         logger.info("get_by_external_id")
         
@@ -76,6 +102,9 @@ class DatabaseEndUserRepository(IEndUserRepository):
             raise
 
     async def create(self, end_user: EndUser) -> EndUser:
+        return self.create_sync(end_user)
+
+    def create_sync(self, end_user: EndUser) -> EndUser:
         try:
             with session_scope(self.db) as db:
                 db_user = EndUserModel(
@@ -93,6 +122,17 @@ class DatabaseEndUserRepository(IEndUserRepository):
             logger.error(f"Error al crear usuario: {str(e)}")
             raise
 
+    async def get_or_create(self, end_user: EndUser) -> EndUser:
+        return self.get_or_create_sync(end_user)
+
+    def get_or_create_sync(self, end_user: EndUser) -> EndUser:
+        try:
+            with session_scope(self.db) as db:
+                return end_user_to_entity(db.execute(upsert_end_user(end_user)).scalar_one())
+        except SQLAlchemyError as e:
+            logger.error(f"Error en get_or_create de usuario: {str(e)}")
+            raise
+
 class DatabaseConversationRepository(IConversationRepository):
     def __init__(self, db: Session):
         self.db = db
@@ -102,6 +142,14 @@ class DatabaseConversationRepository(IConversationRepository):
         end_user_id: UUID, 
         business_id: str,
         threshold_minutes: int = 30
+    ) -> Optional[Conversation]:
+        return self.get_active_by_user_sync(end_user_id, business_id, threshold_minutes)
+
+    def get_active_by_user_sync(
+        self, 
+        end_user_id: UUID, 
+        business_id: str,
+        threshold_minutes: int = 30
     ) -> Optional[Conversation]:
         try:
             with session_scope(self.db) as db:
@@ -132,6 +180,9 @@ class DatabaseConversationRepository(IConversationRepository):
             raise
 
     async def create(self, conversation: Conversation) -> Conversation:
+        return self.create_sync(conversation)
+
+    def create_sync(self, conversation: Conversation) -> Conversation:
         try:
             with session_scope(self.db) as db:
                 db_conv = ConversationModel(
@@ -149,7 +200,41 @@ class DatabaseConversationRepository(IConversationRepository):
             logger.error(f"Error al crear conversación: {str(e)}")
             raise
 
+    async def get_or_create_active(
+        self,
+        conversation: Conversation,
+        threshold_minutes: int = 30
+    ) -> Conversation:
+        return self.get_or_create_active_sync(conversation, threshold_minutes)
+
+    def get_or_create_active_sync(
+        self,
+        conversation: Conversation,
+        threshold_minutes: int = 30
+    ) -> Conversation:
+        try:
+            with session_scope(self.db) as db:
+                threshold_time = datetime.utcnow() - timedelta(minutes=threshold_minutes)
+                row = db.execute(
+                    upsert_active_conversation(conversation, threshold_time)
+                ).scalar_one_or_none()
+                if row is None:
+                    # La activa quedó fuera de la ventana: se cierra y se crea la nueva
+                    db.execute(close_stale_conversations(
+                        conversation.end_user_id, conversation.business_id, threshold_time
+                    ))
+                    row = db.execute(
+                        upsert_active_conversation(conversation, threshold_time)
+                    ).scalar_one()
+                return conversation_to_entity(row)
+        except SQLAlchemyError as e:
+            logger.error(f"Error en get_or_create_active de conversación: {str(e)}")
+            raise
+
     async def close_conversation(self, conversation_id: UUID) -> None:
+        return self.close_conversation_sync(conversation_id)
+
+    def close_conversation_sync(self, conversation_id: UUID) -> None:
         try:
             with session_scope(self.db) as db:
                 conversation = db.query(ConversationModel).filter(
@@ -168,31 +253,87 @@ class DatabaseMessageRepository(IMessageRepository):
         self.db = db
 
     async def create(self, message: Message) -> Message:
+        return self.create_sync(message)
+
+    def create_sync(self, message: Message) -> Message:
         try:
             with session_scope(self.db) as db:
-                db_msg = MessageModel(
-                    id=message.id,
-                    conversation_id=message.conversation_id,
-                    sender_type=message.sender_type,
-                    content=message.content,
-                    timestamp=message.timestamp,
-                    metadata=message.metadata
-                )
-                db.add(db_msg)
+                # ON CONFLICT (id) DO NOTHING: reintentar un mismo mensaje no lo duplica
+                db.execute(insert_messages([message]))
                 return message
         except SQLAlchemyError as e:
             logger.error(f"Error al crear mensaje: {str(e)}")
             raise
+
+    async def create_many(self, messages: List[Message]) -> List[Message]:
+        return self.create_many_sync(messages)
+
+    def create_many_sync(self, messages: List[Message]) -> List[Message]:
+        if not messages:
+            return messages
+        try:
+            with session_scope(self.db) as db:
+                db.execute(insert_messages(messages))
+                return messages
+        except SQLAlchemyError as e:
+            logger.error(f"Error al crear lote de {len(messages)} mensajes: {str(e)}")
+            raise
     
     async def get_by_conversation(self, conversation_id: UUID) -> List[Message]:
+        return self.get_by_conversation_sync(conversation_id)
+
+    def get_by_conversation_sync(self, conversation_id: UUID) -> List[Message]:
+        try:
+            with session_scope(self.db) as db:
+                messages = db.execute(messages_in_order(conversation_id))
+                return [message_to_entity(message) for message in messages.scalars()]
+        except SQLAlchemyError as e:
+            logger.error(f"Error al obtener mensajes: {str(e)}")
+            raise
+
+    async def get_page(
+        self,
+        conversation_id: UUID,
+        limit: int = 50,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[Message]:
+        return self.get_page_sync(conversation_id, limit, after)
+
+    def get_page_sync(
+        self,
+        conversation_id: UUID,
+        limit: int = 50,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[Message]:
+        try:
+            with session_scope(self.db) as db:
+                messages = db.execute(message_page(conversation_id, limit, after))
+                return [message_to_entity(message) for message in messages.scalars()]
+        except SQLAlchemyError as e:
+            logger.error(f"Error al obtener página de mensajes: {str(e)}")
+            raise
+
+    async def stream_by_conversation(
+        self,
+        conversation_id: UUID,
+        batch_size: int = 500
+    ) -> AsyncIterator[Message]:
+        for message in self.stream_by_conversation_sync(conversation_id, batch_size):
+            yield message
+
+    def stream_by_conversation_sync(
+        self,
+        conversation_id: UUID,
+        batch_size: int = 500
+    ) -> Iterator[Message]:
+        """Cursor del lado del servidor (psycopg2 named cursor): `batch_size` filas por viaje"""
         try:
             with session_scope(self.db) as db:
                 messages = db.execute(
-                    select(MessageModel)
-                    .where(MessageModel.conversation_id == conversation_id)
-                    .order_by(MessageModel.timestamp)
+                    messages_in_order(conversation_id).execution_options(yield_per=batch_size)
                 )
-                return [message.to_entity() for message in messages.scalars()]
+                for message in messages.scalars():
+                    yield message_to_entity(message)
         except SQLAlchemyError as e:
-            logger.error(f"Error al obtener mensajes: {str(e)}")
-            raise
\ No newline at end of file
+            logger.error(f"Error al exportar mensajes: {str(e)}")
+            raise
@@ -0,0 +1,38 @@
+# infrastructure/persistence/session_context.py
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional
+
+# Sesión (Session o AsyncSession) de la unidad de trabajo en curso. Mientras está
+# fijada, los repositorios la reutilizan y solo hacen flush: el commit es de la
+# unidad de trabajo.
+_active_session: ContextVar[Optional[Any]] = ContextVar("active_session", default=None)
+# Acciones a ejecutar cuando la unidad de trabajo en curso haga commit
+_after_commit: ContextVar[Optional[List[Callable[[], None]]]] = ContextVar("after_commit", default=None)
+# Acciones a ejecutar si la unidad de trabajo en curso hace rollback
+_after_rollback: ContextVar[Optional[List[Callable[[], None]]]] = ContextVar("after_rollback", default=None)
+
+
+def active_session() -> Optional[Any]:
+    return _active_session.get()
+
+
+def after_commit(callback: Callable[[], None]) -> None:
+    """
+    Ejecuta `callback` cuando se confirme la unidad de trabajo en curso (se descarta
+    si hace rollback). Fuera de una unidad de trabajo se ejecuta de inmediato.
+    """
+    callbacks = _after_commit.get()
+    if callbacks is None:
+        callback()
+    else:
+        callbacks.append(callback)
+
+
+def after_rollback(callback: Callable[[], None]) -> None:
+    """
+    Ejecuta `callback` si la unidad de trabajo en curso hace rollback (se descarta si
+    confirma). Fuera de una unidad de trabajo no hay rollback posible: no hace nada.
+    """
+    callbacks = _after_rollback.get()
+    if callbacks is not None:
+        callbacks.append(callback)
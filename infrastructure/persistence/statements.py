@@ -0,0 +1,111 @@
+# infrastructure/persistence/statements.py
+from datetime import datetime
+from uuid import UUID
+from typing import List, Optional, Tuple
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from core.domain.entities import EndUser, Conversation, Message
+from infrastructure.persistence.models import (
+    EndUser as EndUserModel,
+    Conversation as ConversationModel,
+    Message as MessageModel
+)
+
+# Sentencias de una sola ida y vuelta compartidas por los repositorios sync y async
+
+def upsert_end_user(end_user: EndUser):
+    """
+    INSERT ... ON CONFLICT (business_id, channel, external_id) DO UPDATE ... RETURNING:
+    devuelve el usuario existente o el recién creado, sin carreras entre mensajes simultáneos
+    """
+    now = datetime.utcnow()
+    stmt = insert(EndUserModel).values(
+        id=end_user.id,
+        business_id=end_user.business_id,
+        external_id=end_user.external_id,
+        channel=end_user.channel,
+        name=end_user.name,
+        phone_number=end_user.phone_number,
+        custommetadata=end_user.metadata or {},
+        created_at=now,
+        updated_at=now
+    )
+    # DO UPDATE (y no DO NOTHING) para que RETURNING devuelva también la fila existente
+    return stmt.on_conflict_do_update(
+        constraint="uq_chat_end_users_identity",
+        set_={"updated_at": stmt.excluded.updated_at}
+    ).returning(EndUserModel).execution_options(populate_existing=True)
+
+def upsert_active_conversation(conversation: Conversation, threshold_time: datetime):
+    """
+    Inserta la conversación salvo que el usuario ya tenga una activa (índice único
+    parcial). Si la activa empezó después de `threshold_time` se devuelve esa; si es
+    más antigua no se devuelve ninguna fila y hay que cerrarla y reintentar.
+    """
+    now = datetime.utcnow()
+    stmt = insert(ConversationModel).values(
+        id=conversation.id,
+        end_user_id=conversation.end_user_id,
+        business_id=conversation.business_id,
+        channel=conversation.channel,
+        started_at=conversation.started_at,
+        is_active=True,
+        custommetadata=conversation.metadata or {},
+        created_at=now,
+        updated_at=now
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[ConversationModel.end_user_id, ConversationModel.business_id],
+        index_where=ConversationModel.is_active == True,
+        set_={"updated_at": stmt.excluded.updated_at},
+        where=ConversationModel.started_at >= threshold_time
+    ).returning(ConversationModel).execution_options(populate_existing=True)
+
+def close_stale_conversations(end_user_id: UUID, business_id: str, threshold_time: datetime):
+    """Cierra la conversación activa que quedó fuera de la ventana de inactividad"""
+    return update(ConversationModel).where(
+        ConversationModel.end_user_id == end_user_id,
+        ConversationModel.business_id == business_id,
+        ConversationModel.is_active == True,
+        ConversationModel.started_at < threshold_time
+    ).values(is_active=False, ended_at=datetime.utcnow())
+
+def insert_messages(messages: List[Message]):
+    """
+    Un solo INSERT multi-fila para un lote de mensajes. ON CONFLICT (id) DO NOTHING
+    hace idempotente el reintento de un lote que ya llegó a escribirse.
+    """
+    now = datetime.utcnow()
+    return insert(MessageModel).values([
+        {
+            "id": message.id,
+            "conversation_id": message.conversation_id,
+            "sender_type": message.sender_type,
+            "content": message.content,
+            "timestamp": message.timestamp,
+            "custommetadata": message.metadata or {},
+            "created_at": now
+        }
+        for message in messages
+    ]).on_conflict_do_nothing(index_elements=[MessageModel.id])
+
+def messages_in_order(conversation_id: UUID):
+    """Mensajes de una conversación en orden estable (timestamp, id)"""
+    return select(MessageModel).where(
+        MessageModel.conversation_id == conversation_id
+    ).order_by(MessageModel.timestamp, MessageModel.id)
+
+def message_page(
+    conversation_id: UUID,
+    limit: int,
+    after: Optional[Tuple[datetime, UUID]] = None
+):
+    """
+    Página por keyset: los `limit` mensajes siguientes a `after` (timestamp, id).
+    Usa ix_chat_messages_conversation_timestamp y cuesta lo mismo en cualquier página,
+    a diferencia de OFFSET.
+    """
+    stmt = messages_in_order(conversation_id).limit(limit)
+    if after is not None:
+        stmt = stmt.where(tuple_(MessageModel.timestamp, MessageModel.id) > tuple_(*after))
+    return stmt
@@ -0,0 +1,221 @@
+# infrastructure/persistence/threaded_repositories.py
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from uuid import UUID
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, TypeVar
+from sqlalchemy.orm import Session, sessionmaker
+from core.domain.entities import EndUser, Conversation, Message
+from core.ports.outbound.repositories import (
+    IEndUserRepository,
+    IConversationRepository,
+    IMessageRepository
+)
+from infrastructure.persistence.repositories import (
+    DatabaseEndUserRepository,
+    DatabaseConversationRepository,
+    DatabaseMessageRepository
+)
+from infrastructure.persistence.session_context import active_session
+from infrastructure.runtime import LatencyTracker, current_deadline
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class DatabaseExecutor:
+    """
+    Pool de hilos acotado para las operaciones sync de SQLAlchemy. Con tantos
+    hilos como conexiones admite el engine (pool_size + max_overflow) ningún hilo
+    queda esperando conexión; el resto de operaciones espera en la cola del
+    executor sin bloquear el event loop.
+
+    Las operaciones de una unidad de trabajo van a un segundo pool del mismo tamaño
+    y como mucho hay `max_workers` transacciones abiertas: así una transacción que
+    retiene locks siempre tiene hilo para continuar, aunque otras esperen esos locks.
+    """
+
+    def __init__(self, session_factory: sessionmaker, max_workers: int):
+        self.session_factory = session_factory
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+        self._transaction_executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="db-tx"
+        )
+        self._transaction_slots = asyncio.Semaphore(max_workers)
+        self.transactions = 0
+        # Contadores actualizados desde el loop y desde los hilos
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.wait_times = LatencyTracker(window=1024)
+        self.run_times = LatencyTracker(window=1024)
+
+    async def run(self, operation: Callable[[Session], T]) -> T:
+        """
+        Ejecuta `operation` en un hilo con su propia Session (la cierra session_scope)
+        o con la de la unidad de trabajo en curso
+        """
+        loop = asyncio.get_running_loop()
+        # Los contextvars (deadline de la petición) no pasan solos al hilo
+        context = contextvars.copy_context()
+        # Dentro de una unidad de trabajo se reutiliza su sesión (y su pool de hilos)
+        session = active_session()
+        if not isinstance(session, Session):
+            session = None
+        executor = self._transaction_executor if session is not None else self._executor
+        submitted = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+
+        def job() -> T:
+            started = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.wait_times.record(started - submitted)
+            try:
+                # Si la petición ya agotó su presupuesto esperando en la cola, no va a la DB
+                deadline = context.run(current_deadline)
+                if deadline is not None:
+                    deadline.timeout()
+                return context.run(operation, session or self.session_factory())
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self.run_times.record(time.perf_counter() - started)
+
+        return await loop.run_in_executor(executor, job)
+
+    @asynccontextmanager
+    async def transaction_slot(self) -> AsyncIterator[None]:
+        """Reserva una de las `max_workers` transacciones que pueden estar abiertas"""
+        async with self._transaction_slots:
+            self.transactions += 1
+            try:
+                yield
+            finally:
+                self.transactions -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+        self._transaction_executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._stats()
+
+    def _stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "queue_depth": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "open_transactions": self.transactions,
+            "wait_p50_ms": (self.wait_times.percentile(50) or 0.0) * 1000,
+            "wait_p95_ms": (self.wait_times.percentile(95) or 0.0) * 1000,
+            "run_p50_ms": (self.run_times.percentile(50) or 0.0) * 1000,
+            "run_p95_ms": (self.run_times.percentile(95) or 0.0) * 1000
+        }
+
+class ThreadedEndUserRepository(IEndUserRepository):
+    def __init__(self, executor: DatabaseExecutor):
+        self.executor = executor
+
+    async def get_by_external_id(
+        self,
+        external_id: str,
+        channel: str,
+        business_id: str
+    ) -> Optional[EndUser]:
+        return await self.executor.run(
+            lambda db: DatabaseEndUserRepository(db).get_by_external_id_sync(
+                external_id, channel, business_id
+            )
+        )
+
+    async def create(self, end_user: EndUser) -> EndUser:
+        return await self.executor.run(
+            lambda db: DatabaseEndUserRepository(db).create_sync(end_user)
+        )
+
+    async def get_or_create(self, end_user: EndUser) -> EndUser:
+        return await self.executor.run(
+            lambda db: DatabaseEndUserRepository(db).get_or_create_sync(end_user)
+        )
+
+class ThreadedConversationRepository(IConversationRepository):
+    def __init__(self, executor: DatabaseExecutor):
+        self.executor = executor
+
+    async def get_active_by_user(
+        self,
+        end_user_id: UUID,
+        business_id: str,
+        threshold_minutes: int = 30
+    ) -> Optional[Conversation]:
+        return await self.executor.run(
+            lambda db: DatabaseConversationRepository(db).get_active_by_user_sync(
+                end_user_id, business_id, threshold_minutes
+            )
+        )
+
+    async def create(self, conversation: Conversation) -> Conversation:
+        return await self.executor.run(
+            lambda db: DatabaseConversationRepository(db).create_sync(conversation)
+        )
+
+    async def get_or_create_active(
+        self,
+        conversation: Conversation,
+        threshold_minutes: int = 30
+    ) -> Conversation:
+        return await self.executor.run(
+            lambda db: DatabaseConversationRepository(db).get_or_create_active_sync(
+                conversation, threshold_minutes
+            )
+        )
+
+    async def close_conversation(self, conversation_id: UUID) -> None:
+        return await self.executor.run(
+            lambda db: DatabaseConversationRepository(db).close_conversation_sync(conversation_id)
+        )
+
+class ThreadedMessageRepository(IMessageRepository):
+    def __init__(self, executor: DatabaseExecutor):
+        self.executor = executor
+
+    async def create(self, message: Message) -> Message:
+        return await self.executor.run(
+            lambda db: DatabaseMessageRepository(db).create_sync(message)
+        )
+
+    async def create_many(self, messages: List[Message]) -> List[Message]:
+        return await self.executor.run(
+            lambda db: DatabaseMessageRepository(db).create_many_sync(messages)
+        )
+
+    async def get_by_conversation(self, conversation_id: UUID) -> List[Message]:
+        return await self.executor.run(
+            lambda db: DatabaseMessageRepository(db).get_by_conversation_sync(conversation_id)
+        )
+
+    async def get_page(
+        self,
+        conversation_id: UUID,
+        limit: int = 50,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[Message]:
+        return await self.executor.run(
+            lambda db: DatabaseMessageRepository(db).get_page_sync(conversation_id, limit, after)
+        )
+
+    # stream_by_conversation: la versión por defecto por páginas de keyset. Un cursor
+    # del servidor retendría un hilo y una conexión mientras el consumidor espera
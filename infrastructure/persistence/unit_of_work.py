@@ -0,0 +1,142 @@
+# infrastructure/persistence/unit_of_work.py
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, List
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from core.ports.outbound.repositories import IUnitOfWork
+from infrastructure.persistence.session_context import (
+    _active_session,
+    _after_commit,
+    _after_rollback,
+    active_session
+)
+from infrastructure.persistence.threaded_repositories import DatabaseExecutor
+from infrastructure.runtime import deadline_scope
+
+logger = logging.getLogger(__name__)
+
+def _run_after_commit(callbacks: List[Callable[[], None]]) -> None:
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Error en acción posterior al commit: {str(e)}")
+
+def _run_after_rollback(callbacks: List[Callable[[], None]]) -> None:
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Error en acción posterior al rollback: {str(e)}")
+
+class SyncUnitOfWork(IUnitOfWork):
+    """Unidad de trabajo sobre la Session compartida por los repositorios sync"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        if active_session() is not None:
+            # Anidada: se une a la transacción en curso
+            yield
+            return
+
+        token = _active_session.set(self.db)
+        callbacks_token = _after_commit.set([])
+        rollback_token = _after_rollback.set([])
+        try:
+            yield
+            self.db.commit()
+            callbacks = _after_commit.get()
+        except BaseException as e:
+            try:
+                self.db.rollback()
+            finally:
+                logger.error(f"Rollback de la unidad de trabajo: {str(e)}")
+                _run_after_rollback(_after_rollback.get())
+            raise
+        finally:
+            _after_rollback.reset(rollback_token)
+            _after_commit.reset(callbacks_token)
+            _active_session.reset(token)
+            self.db.close()
+        _run_after_commit(callbacks)
+
+class ThreadedUnitOfWork(IUnitOfWork):
+    """
+    Unidad de trabajo para REPOSITORY_BACKEND=threaded: una Session usada por
+    varias operaciones sucesivas del pool de hilos; el commit también va al pool.
+    """
+
+    def __init__(self, executor: DatabaseExecutor):
+        self.executor = executor
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        if active_session() is not None:
+            yield
+            return
+
+        async with self.executor.transaction_slot():
+            session = self.executor.session_factory()
+            token = _active_session.set(session)
+            callbacks_token = _after_commit.set([])
+            rollback_token = _after_rollback.set([])
+            try:
+                yield
+                # Cerrar la transacción no depende del deadline de la petición
+                with deadline_scope(None):
+                    await self.executor.run(lambda db: db.commit())
+                callbacks = _after_commit.get()
+            except BaseException as e:
+                try:
+                    with deadline_scope(None):
+                        await self.executor.run(lambda db: db.rollback())
+                finally:
+                    logger.error(f"Rollback de la unidad de trabajo: {str(e)}")
+                    _run_after_rollback(_after_rollback.get())
+                raise
+            finally:
+                try:
+                    with deadline_scope(None):
+                        await self.executor.run(lambda db: db.close())
+                finally:
+                    _after_rollback.reset(rollback_token)
+                    _after_commit.reset(callbacks_token)
+                    _active_session.reset(token)
+        _run_after_commit(callbacks)
+
+class AsyncUnitOfWork(IUnitOfWork):
+    """Unidad de trabajo sobre una AsyncSession (REPOSITORY_BACKEND=async)"""
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        if active_session() is not None:
+            yield
+            return
+
+        async with self.session_factory() as session:
+            token = _active_session.set(session)
+            callbacks_token = _after_commit.set([])
+            rollback_token = _after_rollback.set([])
+            try:
+                yield
+                await session.commit()
+                callbacks = _after_commit.get()
+            except BaseException as e:
+                try:
+                    await session.rollback()
+                finally:
+                    logger.error(f"Rollback de la unidad de trabajo: {str(e)}")
+                    _run_after_rollback(_after_rollback.get())
+                raise
+            finally:
+                _after_rollback.reset(rollback_token)
+                _after_commit.reset(callbacks_token)
+                _active_session.reset(token)
+        _run_after_commit(callbacks)
@@ -0,0 +1,103 @@
+# infrastructure/persistence/webhook_deliveries.py
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from infrastructure.cache.webhook_dedup import DeliveryClaim
+from infrastructure.persistence.async_repositories import async_session_scope
+from infrastructure.persistence.models import WebhookDelivery as WebhookDeliveryModel
+
+logger = logging.getLogger(__name__)
+
+
+class PostgresDeliveryStore:
+    """
+    Entregas de webhooks en chat_webhook_deliveries, compartidas por todas las réplicas.
+    INSERT ... ON CONFLICT registra la entrega de forma atómica: solo una réplica la
+    procesa. Una entrega en curso que no termina antes de su expires_at (caída del
+    proceso) se puede volver a reclamar.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, cleanup_interval: float = 300.0, cleanup_batch: int = 1000):
+        self.session_factory = session_factory
+        self.cleanup_interval = cleanup_interval
+        self.cleanup_batch = cleanup_batch
+        self._last_cleanup = time.monotonic()
+
+    async def begin(self, key: str, processing_timeout: float) -> DeliveryClaim:
+        now = datetime.utcnow()
+        stmt = insert(WebhookDeliveryModel).values(
+            key=key,
+            status="processing",
+            result=None,
+            expires_at=now + timedelta(seconds=processing_timeout),
+            created_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[WebhookDeliveryModel.key],
+            set_={
+                "status": stmt.excluded.status,
+                "result": None,
+                "expires_at": stmt.excluded.expires_at,
+                "created_at": stmt.excluded.created_at
+            },
+            # Solo se reutiliza una entrega vencida
+            where=WebhookDeliveryModel.expires_at < now
+        ).returning(WebhookDeliveryModel.key)
+
+        async with async_session_scope(self.session_factory) as session:
+            claimed = (await session.execute(stmt)).first()
+            if claimed is None:
+                row = (await session.execute(
+                    select(WebhookDeliveryModel.status, WebhookDeliveryModel.result)
+                    .where(WebhookDeliveryModel.key == key)
+                )).first()
+        await self._maybe_cleanup()
+        if claimed is not None:
+            return DeliveryClaim(is_new=True)
+        done = row is not None and row.status == "done"
+        return DeliveryClaim(is_new=False, result=row.result if done else None)
+
+    async def complete(self, key: str, result: Dict[str, Any], ttl: float) -> None:
+        async with async_session_scope(self.session_factory) as session:
+            await session.execute(
+                update(WebhookDeliveryModel)
+                .where(WebhookDeliveryModel.key == key)
+                .values(
+                    status="done",
+                    result=result,
+                    expires_at=datetime.utcnow() + timedelta(seconds=ttl)
+                )
+            )
+
+    async def release(self, key: str) -> None:
+        async with async_session_scope(self.session_factory) as session:
+            await session.execute(
+                delete(WebhookDeliveryModel).where(
+                    WebhookDeliveryModel.key == key,
+                    WebhookDeliveryModel.status == "processing"
+                )
+            )
+
+    async def _maybe_cleanup(self) -> None:
+        """Borra por lotes las entregas vencidas, como mucho una vez por intervalo"""
+        if time.monotonic() - self._last_cleanup < self.cleanup_interval:
+            return
+        self._last_cleanup = time.monotonic()
+        expired = (
+            select(WebhookDeliveryModel.key)
+            .where(WebhookDeliveryModel.expires_at < datetime.utcnow())
+            .limit(self.cleanup_batch)
+        )
+        try:
+            async with async_session_scope(self.session_factory) as session:
+                result = await session.execute(
+                    delete(WebhookDeliveryModel).where(WebhookDeliveryModel.key.in_(expired.scalar_subquery()))
+                )
+            if result.rowcount:
+                logger.info(f"{result.rowcount} entregas de webhooks vencidas eliminadas")
+        except Exception as e:
+            logger.error(f"Error limpiando entregas de webhooks: {str(e)}")
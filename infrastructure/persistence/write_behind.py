@@ -0,0 +1,274 @@
+# infrastructure/persistence/write_behind.py
+import asyncio
+import logging
+from uuid import UUID
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from sqlalchemy.exc import DBAPIError
+from core.domain.entities import Message
+from core.ports.outbound.repositories import IMessageRepository
+from infrastructure.persistence.session_context import after_commit, after_rollback
+from infrastructure.runtime import DeadlineExceeded, deadline_scope, remaining_timeout
+
+logger = logging.getLogger(__name__)
+
+def _is_permanent(error: Exception) -> bool:
+    """
+    Errores propios del mensaje (no de la base de datos): reintentar el lote no sirve.
+    Se mira el SQLSTATE (22 datos, 23 integridad) porque asyncpg no siempre se
+    traduce a DataError/IntegrityError.
+    """
+    if not isinstance(error, DBAPIError):
+        return False
+    sqlstate = getattr(error.orig, "pgcode", None) or getattr(error.orig, "sqlstate", None)
+    return bool(sqlstate) and sqlstate[:2] in ("22", "23")
+
+def _order_key(message: Message) -> Tuple[datetime, UUID]:
+    # Mismo orden que la base de datos: (timestamp, id)
+    return (message.timestamp, message.id)
+
+class WriteBehindMessageRepository(IMessageRepository):
+    """
+    Escritura diferida de mensajes: create() deja el mensaje en un buffer en memoria
+    y una tarea de fondo lo persiste en lotes (INSERT multi-fila vía create_many)
+    cuando hay `batch_size` mensajes o pasan `flush_interval` segundos.
+
+    - El buffer está acotado a `max_buffer` mensajes: create() reserva un hueco (o
+      espera a que lo haya, dentro del deadline de la petición) y la reserva se
+      ocupa al hacer commit o se libera con el rollback. Cuentan los mensajes en el
+      buffer, los reservados y el lote que se está escribiendo (también si vuelve
+      al buffer para reintentarse).
+    - Dentro de una unidad de trabajo el mensaje se encola al hacer commit: nunca se
+      escribe un mensaje de una transacción que hizo rollback y la conversación a la
+      que apunta (FK) ya está confirmada cuando se escribe el lote.
+    - Si la base de datos falla el lote vuelve al buffer y se reintenta; si falla por
+      un mensaje inválido se escriben uno a uno y se descartan los inválidos.
+    - Las lecturas (get_by_conversation, get_page, stream_by_conversation) incluyen
+      los mensajes aún no escritos.
+    - aclose() drena el buffer (shutdown).
+    """
+
+    def __init__(
+        self,
+        inner: IMessageRepository,
+        max_buffer: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.2,
+        retry_delay: float = 1.0
+    ):
+        self.inner = inner
+        self.max_buffer = max_buffer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_delay = retry_delay
+        self._buffer: List[Message] = []
+        self._in_flight: List[Message] = []
+        # Huecos reservados por create() cuya transacción aún no terminó
+        self._reserved = 0
+        self._has_items = asyncio.Event()
+        self._full = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.dropped = 0
+        self.backpressure_waits = 0
+
+    async def create(self, message: Message) -> Message:
+        if self._closing:
+            return await self.inner.create(message)
+        await self._reserve()
+        after_commit(lambda: self._enqueue(message))
+        after_rollback(self._release)
+        return message
+
+    async def create_many(self, messages: List[Message]) -> List[Message]:
+        for message in messages:
+            await self.create(message)
+        return messages
+
+    def _pending_for(self, conversation_id: UUID) -> List[Message]:
+        # Se toman antes de consultar: un lote que se escriba durante la consulta
+        # está en la respuesta de la base de datos o en esta copia
+        return [
+            message for message in self._in_flight + self._buffer
+            if message.conversation_id == conversation_id
+        ]
+
+    async def get_by_conversation(self, conversation_id: UUID) -> List[Message]:
+        pending = self._pending_for(conversation_id)
+        messages = await self.inner.get_by_conversation(conversation_id)
+        if not pending:
+            return messages
+        by_id = {message.id: message for message in messages}
+        for message in pending:
+            by_id.setdefault(message.id, message)
+        return sorted(by_id.values(), key=_order_key)
+
+    async def get_page(
+        self,
+        conversation_id: UUID,
+        limit: int = 50,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[Message]:
+        pending = self._pending_for(conversation_id)
+        page = await self.inner.get_page(conversation_id, limit, after)
+        if not pending:
+            return page
+        by_id = {message.id: message for message in page}
+        for message in pending:
+            if after is None or _order_key(message) > after:
+                by_id.setdefault(message.id, message)
+        return sorted(by_id.values(), key=_order_key)[:limit]
+
+    async def stream_by_conversation(
+        self,
+        conversation_id: UUID,
+        batch_size: int = 500
+    ) -> AsyncIterator[Message]:
+        pending = {message.id: message for message in self._pending_for(conversation_id)}
+        async for message in self.inner.stream_by_conversation(conversation_id, batch_size):
+            pending.pop(message.id, None)
+            yield message
+        # Los pendientes son los más recientes: van al final
+        for message in sorted(pending.values(), key=_order_key):
+            yield message
+
+    def _occupancy(self) -> int:
+        return len(self._buffer) + len(self._in_flight) + self._reserved
+
+    def _signal_space(self) -> None:
+        if self._occupancy() < self.max_buffer:
+            self._space.set()
+
+    async def _reserve(self) -> None:
+        if self._occupancy() >= self.max_buffer:
+            self.backpressure_waits += 1
+            while self._occupancy() >= self.max_buffer:
+                self._space.clear()
+                try:
+                    await asyncio.wait_for(self._space.wait(), remaining_timeout())
+                except asyncio.TimeoutError as e:
+                    raise DeadlineExceeded("Buffer de mensajes lleno") from e
+        # Sin await entre la comprobación y la reserva: nadie más puede pasar antes
+        self._reserved += 1
+
+    def _release(self) -> None:
+        """La transacción hizo rollback: su mensaje no se escribirá"""
+        self._reserved -= 1
+        self._signal_space()
+
+    def _enqueue(self, message: Message) -> None:
+        self._reserved -= 1
+        self._buffer.append(message)
+        self.enqueued += 1
+        self._has_items.set()
+        if len(self._buffer) >= self.batch_size:
+            self._full.set()
+        if self._task is None:
+            # La tarea de fondo no hereda el deadline de la petición que la arranca
+            with deadline_scope(None):
+                self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_items.wait()
+            if len(self._buffer) < self.batch_size and not self._closing:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._full.clear()
+
+            batch = self._buffer[:self.batch_size]
+            del self._buffer[:self.batch_size]
+            if not self._buffer:
+                self._has_items.clear()
+                if self._closing:
+                    self._has_items.set()
+
+            if batch:
+                # El lote sigue ocupando su hueco hasta que se escribe o se descarta
+                self._in_flight = batch
+                try:
+                    await self._write(batch)
+                finally:
+                    self._in_flight = []
+                    self._signal_space()
+            elif self._closing:
+                return
+
+    async def _write(self, batch: List[Message]) -> None:
+        try:
+            await self.inner.create_many(batch)
+            self.written += len(batch)
+            self.batches += 1
+            return
+        except Exception as e:
+            if not _is_permanent(e):
+                self._requeue(batch, e)
+                await asyncio.sleep(self.retry_delay)
+                return
+            logger.error(f"Lote de {len(batch)} mensajes rechazado, se escribe uno a uno: {str(e)}")
+
+        for position, message in enumerate(batch):
+            try:
+                await self.inner.create_many([message])
+                self.written += 1
+            except Exception as e:
+                if not _is_permanent(e):
+                    self._requeue(batch[position:], e)
+                    await asyncio.sleep(self.retry_delay)
+                    return
+                self.dropped += 1
+                logger.error(f"Mensaje {message.id} descartado: {str(e)}")
+            # Escrito o descartado: deja de ocupar hueco
+            self._in_flight = batch[position + 1:]
+            self._signal_space()
+
+    def _requeue(self, batch: List[Message], error: Exception) -> None:
+        """
+        Devuelve el lote al principio del buffer para reintentarlo. Sus huecos ya
+        estaban contados como lote en curso: pasan al buffer sin superar max_buffer.
+        """
+        self.retries += 1
+        logger.error(f"Error al escribir lote de {len(batch)} mensajes, se reintentará: {str(error)}")
+        self._buffer[:0] = batch
+        self._in_flight = []
+        self._has_items.set()
+
+    async def aclose(self, timeout: Optional[float] = None) -> None:
+        """Escribe los mensajes pendientes y detiene la tarea de fondo (shutdown)"""
+        self._closing = True
+        if self._task is None:
+            return
+        self._has_items.set()
+        self._full.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except asyncio.TimeoutError:
+            lost = len(self._buffer) + len(self._in_flight)
+            logger.error(f"Drenado del buffer de mensajes agotó el tiempo: {lost} mensajes sin escribir")
+            self._task.cancel()
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buffered": len(self._buffer),
+            "in_flight": len(self._in_flight),
+            "reserved": self._reserved,
+            "max_buffer": self.max_buffer,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": self.flush_interval * 1000,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "avg_batch_size": self.written / self.batches if self.batches else 0.0,
+            "retries": self.retries,
+            "dropped": self.dropped,
+            "backpressure_waits": self.backpressure_waits
+        }
@@ -0,0 +1,16 @@
+# infrastructure/queue/__init__.py
+from .jobs import MessageJob, MessageJobProcessor, MessageQueue, QueueFull
+from .in_process import InProcessMessageQueue
+from .postgres import ClaimedJob, PostgresMessageQueue
+from .worker import PostgresQueueWorker
+
+__all__ = [
+    'MessageJob',
+    'MessageJobProcessor',
+    'MessageQueue',
+    'QueueFull',
+    'InProcessMessageQueue',
+    'ClaimedJob',
+    'PostgresMessageQueue',
+    'PostgresQueueWorker'
+]
@@ -0,0 +1,109 @@
+# infrastructure/queue/in_process.py
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+from infrastructure.runtime import LatencyTracker, deadline_scope
+from .jobs import MessageJob, MessageJobProcessor, MessageQueue, QueueFull
+
+logger = logging.getLogger(__name__)
+
+
+class InProcessMessageQueue(MessageQueue):
+    """
+    Cola acotada en memoria con un número fijo de workers que procesan los mensajes
+    de los webhooks después de responder 200 a la plataforma. Si se llena, enqueue()
+    lanza QueueFull para que el webhook responda 503 y la plataforma reintente.
+    Los mensajes encolados se pierden si el proceso termina sin drenarla.
+    """
+
+    def __init__(self, processor: MessageJobProcessor, workers: int = 8, max_size: int = 1000):
+        self.processor = processor
+        self.workers = workers
+        self.max_size = max_size
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._tasks: List[asyncio.Task] = []
+        self._closed = False
+        self._started_at = time.monotonic()
+        self._busy = 0
+        self._busy_seconds = 0.0
+        self._queue_wait = LatencyTracker()
+        self._reply_latency = LatencyTracker()
+        self._counters = {"enqueued": 0, "processed": 0, "replied": 0, "failed": 0, "rejected": 0}
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._started_at = time.monotonic()
+        # Los workers no heredan el deadline de quien los arranca
+        with deadline_scope(None):
+            loop = asyncio.get_running_loop()
+            self._tasks = [
+                loop.create_task(self._worker(), name=f"message_worker_{n}")
+                for n in range(self.workers)
+            ]
+        logger.info(f"Cola de mensajes en proceso iniciada con {self.workers} workers")
+
+    async def enqueue(self, job: MessageJob) -> None:
+        if self._closed:
+            raise QueueFull("La cola de mensajes se está cerrando")
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._counters["rejected"] += 1
+            raise QueueFull(f"Cola de mensajes llena ({self.max_size})")
+        self._counters["enqueued"] += 1
+
+    async def _worker(self) -> None:
+        while True:
+            job: MessageJob = await self._queue.get()
+            self._busy += 1
+            started = time.monotonic()
+            self._queue_wait.record(time.time() - job.enqueued_at)
+            try:
+                replied = await self.processor.process(job)
+                self._counters["processed"] += 1
+                if replied:
+                    self._counters["replied"] += 1
+                    self._reply_latency.record(time.time() - job.enqueued_at)
+            except Exception as e:
+                self._counters["failed"] += 1
+                logger.error(
+                    f"Error procesando mensaje {job.channel} de {job.external_id} "
+                    f"(negocio {job.business_id}): {str(e)}"
+                )
+            finally:
+                self._busy -= 1
+                self._busy_seconds += time.monotonic() - started
+                self._queue.task_done()
+
+    async def aclose(self, timeout: float = 30.0) -> None:
+        """Deja de aceptar mensajes, espera a que se vacíe la cola y detiene los workers"""
+        self._closed = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self._queue.qsize() + self._busy} mensajes sin procesar al cerrar la cola")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @staticmethod
+    def _ms(seconds: Optional[float]) -> Optional[float]:
+        return round(seconds * 1000, 1) if seconds is not None else None
+
+    async def stats(self) -> Dict:
+        uptime = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            **self._counters,
+            "depth": self._queue.qsize(),
+            "max_size": self.max_size,
+            "workers": self.workers,
+            "busy_workers": self._busy,
+            # Fracción de tiempo ocupado de los workers desde el arranque
+            "utilization": round(min(1.0, self._busy_seconds / (self.workers * uptime)), 4),
+            "queue_wait_p95_ms": self._ms(self._queue_wait.percentile(95)),
+            "enqueue_to_reply_p50_ms": self._ms(self._reply_latency.percentile(50)),
+            "enqueue_to_reply_p95_ms": self._ms(self._reply_latency.percentile(95))
+        }
@@ -0,0 +1,87 @@
+# infrastructure/queue/jobs.py
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+from uuid import UUID, uuid4
+from core.domain.entities import Message
+from core.ports.inbound import IMessageReceiverPort
+from core.ports.outbound import IChannelSenderPort
+from infrastructure.config.database import request_session_scope
+from infrastructure.runtime import Deadline, run_with_deadline
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MessageJob:
+    """Mensaje entrante de un webhook pendiente de procesar y responder"""
+    channel: str
+    business_id: str
+    external_id: str
+    content: str
+    metadata: Dict[str, Any]
+    # Destinatario y emisor de la respuesta en el canal (chat_id, número WhatsApp)
+    recipient: str
+    reply_from: Optional[str] = None
+    enqueued_at: float = field(default_factory=time.time)
+    # Identidad del trabajo: se conserva entre reintentos de la cola durable
+    id: UUID = field(default_factory=uuid4)
+
+
+class MessageQueue(ABC):
+    """Cola en la que los webhooks dejan los mensajes para procesarlos fuera de la petición"""
+
+    @abstractmethod
+    async def enqueue(self, job: MessageJob) -> None:
+        """Encola el mensaje; lanza QueueFull si no se puede aceptar"""
+
+    @abstractmethod
+    async def stats(self) -> Dict:
+        """Métricas de la cola"""
+
+
+class QueueFull(Exception):
+    """La cola de mensajes entrantes no admite más trabajos"""
+
+
+class MessageJobProcessor:
+    """
+    Ejecuta un MessageJob fuera de la petición del webhook: el caso de uso dentro de
+    su propia sesión de DB y presupuesto, y la respuesta por el sender del canal.
+    """
+
+    def __init__(
+        self,
+        message_receiver: IMessageReceiverPort,
+        senders: Dict[str, IChannelSenderPort],
+        budget_seconds: Optional[float] = 60.0
+    ):
+        self.message_receiver = message_receiver
+        self.senders = senders
+        self.budget_seconds = budget_seconds
+
+    async def process(self, job: MessageJob) -> bool:
+        """Procesa el mensaje; devuelve True si se envió una respuesta"""
+        with request_session_scope():
+            _, _, message = await run_with_deadline(
+                self.message_receiver.handle_new_message(
+                    channel=job.channel,
+                    external_id=job.external_id,
+                    business_id=job.business_id,
+                    message_content=job.content,
+                    metadata=job.metadata,
+                    coalesce_burst=True,
+                    # Id fijo por trabajo: un reintento no vuelve a guardar el mensaje
+                    message_id=Message.derived_id(job.id, "user")
+                ),
+                Deadline.after(self.budget_seconds) if self.budget_seconds else None
+            )
+        if not message or not message.content:
+            return False
+        sender = self.senders.get(job.channel)
+        if sender is None:
+            logger.error(f"Sin sender configurado para el canal {job.channel}")
+            return False
+        return await sender.send(job.business_id, job.recipient, message.content, sender=job.reply_from)
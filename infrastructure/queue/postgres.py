@@ -0,0 +1,197 @@
+# infrastructure/queue/postgres.py
+import logging
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List
+from uuid import UUID
+from sqlalchemy import and_, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from infrastructure.persistence.async_repositories import async_session_scope
+from infrastructure.persistence.models import InboundJob as InboundJobModel
+from .jobs import MessageJob, MessageQueue
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("pending", "processing")
+
+
+@dataclass
+class ClaimedJob:
+    """Trabajo reclamado por un worker; `attempts` identifica esta entrega"""
+    id: UUID
+    attempts: int
+    max_attempts: int
+    job: MessageJob
+
+
+class PostgresMessageQueue(MessageQueue):
+    """
+    Cola durable en la tabla chat_inbound_jobs, compartida por todas las réplicas.
+
+    Un worker reclama trabajos con SELECT ... FOR UPDATE SKIP LOCKED y los deja
+    invisibles durante `visibility_timeout`; si no los completa a tiempo (caída,
+    reinicio) vuelven a estar disponibles para otro worker. Cada reclamo incrementa
+    `attempts`, que sirve de token: un worker que perdió el trabajo por timeout no
+    puede completarlo ni fallarlo. Tras `max_attempts` intentos el trabajo pasa a
+    `dead` con el último error. La entrega es al menos una vez.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        visibility_timeout: float = 120.0,
+        max_attempts: int = 5,
+        retry_backoff: float = 5.0,
+        retry_backoff_max: float = 300.0
+    ):
+        self.session_factory = session_factory
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+
+    async def enqueue(self, job: MessageJob) -> None:
+        now = datetime.utcnow()
+        async with async_session_scope(self.session_factory) as session:
+            await session.execute(insert(InboundJobModel).values(
+                id=job.id,
+                channel=job.channel,
+                business_id=job.business_id,
+                external_id=job.external_id,
+                content=job.content,
+                custommetadata=job.metadata or {},
+                recipient=job.recipient,
+                reply_from=job.reply_from,
+                status="pending",
+                attempts=0,
+                max_attempts=self.max_attempts,
+                available_at=now,
+                enqueued_at=datetime.utcfromtimestamp(job.enqueued_at),
+                created_at=now,
+                updated_at=now
+            ))
+
+    async def claim(self, worker_id: str, limit: int) -> List[ClaimedJob]:
+        now = datetime.utcnow()
+        async with async_session_scope(self.session_factory) as session:
+            # Trabajos que agotaron sus intentos sin que el worker respondiera (p. ej.
+            # un mensaje que tumba el proceso): no se vuelven a entregar
+            await session.execute(
+                update(InboundJobModel)
+                .where(
+                    InboundJobModel.status == "processing",
+                    InboundJobModel.available_at <= now,
+                    InboundJobModel.attempts >= InboundJobModel.max_attempts
+                )
+                .values(status="dead", last_error="Timeout de visibilidad en el último intento", updated_at=now)
+            )
+            available = (
+                select(InboundJobModel.id)
+                .where(
+                    InboundJobModel.status.in_(ACTIVE_STATUSES),
+                    InboundJobModel.available_at <= now
+                )
+                .order_by(InboundJobModel.available_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            result = await session.execute(
+                update(InboundJobModel)
+                .where(InboundJobModel.id.in_(available.scalar_subquery()))
+                .values(
+                    status="processing",
+                    attempts=InboundJobModel.attempts + 1,
+                    available_at=now + timedelta(seconds=self.visibility_timeout),
+                    locked_by=worker_id,
+                    updated_at=now
+                )
+                .returning(InboundJobModel)
+                .execution_options(synchronize_session=False)
+            )
+            return [self._to_claimed(row) for row in result.scalars().all()]
+
+    @staticmethod
+    def _to_claimed(row: InboundJobModel) -> ClaimedJob:
+        return ClaimedJob(
+            id=row.id,
+            attempts=row.attempts,
+            max_attempts=row.max_attempts,
+            job=MessageJob(
+                channel=row.channel,
+                business_id=row.business_id,
+                external_id=row.external_id,
+                content=row.content,
+                metadata=row.custommetadata or {},
+                recipient=row.recipient,
+                reply_from=row.reply_from,
+                enqueued_at=(row.enqueued_at - datetime(1970, 1, 1)).total_seconds(),
+                id=row.id
+            )
+        )
+
+    @staticmethod
+    def _owned(claimed: ClaimedJob):
+        return and_(
+            InboundJobModel.id == claimed.id,
+            InboundJobModel.status == "processing",
+            InboundJobModel.attempts == claimed.attempts
+        )
+
+    async def complete(self, claimed: ClaimedJob) -> bool:
+        """Borra el trabajo terminado; False si otro worker ya lo había reclamado"""
+        async with async_session_scope(self.session_factory) as session:
+            result = await session.execute(delete(InboundJobModel).where(self._owned(claimed)))
+        return result.rowcount == 1
+
+    async def fail(self, claimed: ClaimedJob, error: str) -> str:
+        """Reprograma el trabajo con backoff o lo pasa a dead; devuelve el nuevo estado"""
+        now = datetime.utcnow()
+        if claimed.attempts >= claimed.max_attempts:
+            values = {"status": "dead"}
+        else:
+            delay = min(self.retry_backoff_max, self.retry_backoff * 2 ** (claimed.attempts - 1))
+            values = {
+                "status": "pending",
+                "available_at": now + timedelta(seconds=random.uniform(delay / 2, delay))
+            }
+        async with async_session_scope(self.session_factory) as session:
+            await session.execute(
+                update(InboundJobModel)
+                .where(self._owned(claimed))
+                .values(**values, last_error=error[:2000], locked_by=None, updated_at=now)
+            )
+        return values["status"]
+
+    async def release(self, claimed: ClaimedJob) -> None:
+        """Devuelve a la cola un trabajo sin procesar (parada del worker) sin gastar el intento"""
+        async with async_session_scope(self.session_factory) as session:
+            await session.execute(
+                update(InboundJobModel)
+                .where(self._owned(claimed))
+                .values(
+                    status="pending",
+                    attempts=InboundJobModel.attempts - 1,
+                    available_at=datetime.utcnow(),
+                    locked_by=None
+                )
+            )
+
+    async def stats(self) -> Dict:
+        async with async_session_scope(self.session_factory) as session:
+            rows = (await session.execute(
+                select(
+                    InboundJobModel.status,
+                    func.count(),
+                    func.min(InboundJobModel.enqueued_at)
+                ).group_by(InboundJobModel.status)
+            )).all()
+        counts = {status: count for status, count, _ in rows}
+        oldest = min((first for status, _, first in rows if status in ACTIVE_STATUSES), default=None)
+        return {
+            "pending": counts.get("pending", 0),
+            "processing": counts.get("processing", 0),
+            "dead": counts.get("dead", 0),
+            "depth": counts.get("pending", 0) + counts.get("processing", 0),
+            "oldest_age_seconds": round((datetime.utcnow() - oldest).total_seconds(), 1) if oldest else None
+        }
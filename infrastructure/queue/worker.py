@@ -0,0 +1,120 @@
+# infrastructure/queue/worker.py
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Dict, Optional, Set
+from infrastructure.runtime import LatencyTracker
+from .jobs import MessageJobProcessor
+from .postgres import ClaimedJob, PostgresMessageQueue
+
+logger = logging.getLogger(__name__)
+
+
+class PostgresQueueWorker:
+    """
+    Consume la cola durable con hasta `concurrency` mensajes en paralelo. Se pueden
+    arrancar tantas réplicas como hagan falta (worker.py): SKIP LOCKED reparte los
+    trabajos entre ellas sin coordinación.
+    """
+
+    def __init__(
+        self,
+        queue: PostgresMessageQueue,
+        processor: MessageJobProcessor,
+        concurrency: int = 8,
+        poll_interval: float = 1.0,
+        worker_id: Optional[str] = None
+    ):
+        self.queue = queue
+        self.processor = processor
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._in_flight: Dict[asyncio.Task, ClaimedJob] = {}
+        self._reply_latency = LatencyTracker()
+        self._counters = {"processed": 0, "replied": 0, "retried": 0, "dead": 0, "lost": 0}
+
+    async def run(self, stop: asyncio.Event, drain_timeout: float = 30.0) -> None:
+        logger.info(f"Worker {self.worker_id} consumiendo la cola con concurrencia {self.concurrency}")
+        while not stop.is_set():
+            free = self.concurrency - len(self._in_flight)
+            claimed = []
+            if free > 0:
+                try:
+                    claimed = await self.queue.claim(self.worker_id, free)
+                except Exception as e:
+                    logger.error(f"Error reclamando trabajos de la cola: {str(e)}")
+            for item in claimed:
+                task = asyncio.create_task(self._handle(item))
+                self._in_flight[task] = item
+                task.add_done_callback(self._in_flight.pop)
+            if free == 0 or len(claimed) < free:
+                # Sin huecos o cola vacía: esperar un trabajo en curso, la parada o el siguiente sondeo
+                await self._wait(stop)
+        await self._drain(drain_timeout)
+
+    async def _wait(self, stop: asyncio.Event) -> None:
+        waiters: Set[asyncio.Future] = set(self._in_flight)
+        stopper = asyncio.ensure_future(stop.wait())
+        waiters.add(stopper)
+        await asyncio.wait(waiters, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED)
+        stopper.cancel()
+
+    async def _handle(self, claimed: ClaimedJob) -> None:
+        try:
+            replied = await self.processor.process(claimed.job)
+        except Exception as e:
+            await self._fail(claimed, e)
+            return
+        try:
+            if not await self.queue.complete(claimed):
+                # Superó el timeout de visibilidad y otro worker lo reclamó
+                self._counters["lost"] += 1
+                logger.warning(f"Trabajo {claimed.id} completado después de su timeout de visibilidad")
+        except Exception as e:
+            # Sigue en processing: se volverá a entregar al vencer su visibilidad
+            logger.error(f"Error completando trabajo {claimed.id}: {str(e)}")
+        self._counters["processed"] += 1
+        if replied:
+            self._counters["replied"] += 1
+            self._reply_latency.record(time.time() - claimed.job.enqueued_at)
+
+    async def _fail(self, claimed: ClaimedJob, error: Exception) -> None:
+        try:
+            status = await self.queue.fail(claimed, f"{type(error).__name__}: {str(error)}")
+        except Exception as e:
+            logger.error(f"Error reprogramando trabajo {claimed.id}: {str(e)}")
+            return
+        self._counters["dead" if status == "dead" else "retried"] += 1
+        logger.error(
+            f"Error procesando trabajo {claimed.id} (intento {claimed.attempts}/{claimed.max_attempts}, "
+            f"ahora {status}): {str(error)}"
+        )
+
+    async def _drain(self, timeout: float) -> None:
+        """Espera los trabajos en curso y devuelve a la cola los que no terminen"""
+        if not self._in_flight:
+            return
+        _, pending = await asyncio.wait(set(self._in_flight), timeout=timeout)
+        unfinished = [self._in_flight[task] for task in pending if task in self._in_flight]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for claimed in unfinished:
+            await self.queue.release(claimed)
+        if pending:
+            logger.warning(f"{len(pending)} trabajos devueltos a la cola al detener el worker")
+
+    def stats(self) -> Dict:
+        p50 = self._reply_latency.percentile(50)
+        p95 = self._reply_latency.percentile(95)
+        return {
+            **self._counters,
+            "worker_id": self.worker_id,
+            "in_flight": len(self._in_flight),
+            "concurrency": self.concurrency,
+            "enqueue_to_reply_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "enqueue_to_reply_p95_ms": round(p95 * 1000, 1) if p95 is not None else None
+        }
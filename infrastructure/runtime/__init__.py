@@ -0,0 +1,36 @@
+# infrastructure/runtime/__init__.py
+from .deadline import (
+    Deadline,
+    DeadlineExceeded,
+    current_deadline,
+    deadline_scope,
+    remaining_timeout,
+    run_with_deadline,
+    budget_from_env
+)
+from .resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    ResilientCall
+)
+from .rate_limit import (
+    KeyedLimiter,
+    TokenBucket
+)
+
+__all__ = [
+    'Deadline',
+    'DeadlineExceeded',
+    'current_deadline',
+    'deadline_scope',
+    'remaining_timeout',
+    'run_with_deadline',
+    'budget_from_env',
+    'CircuitBreaker',
+    'CircuitOpenError',
+    'LatencyTracker',
+    'ResilientCall',
+    'KeyedLimiter',
+    'TokenBucket'
+]
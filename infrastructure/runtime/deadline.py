@@ -0,0 +1,92 @@
+# infrastructure/runtime/deadline.py
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Iterator, Optional
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Se agotó el presupuesto de tiempo de la petición"""
+
+
+class Deadline:
+    """
+    Presupuesto de tiempo de una petición entrante (gRPC o webhook).
+    Se propaga con un contextvar a todas las corrutinas de la petición para que
+    cada llamada externa use como timeout lo que queda del presupuesto.
+    """
+
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """Timeout para la próxima llamada: lo que queda del presupuesto, acotado por `cap`"""
+        remaining = self.remaining()
+        if remaining <= 0.0:
+            raise DeadlineExceeded("Presupuesto de tiempo de la petición agotado")
+        return remaining if cap is None else min(cap, remaining)
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("current_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """
+    Fija el deadline de las corrutinas del bloque. Con None se ejecuta sin deadline
+    (p.ej. cargas compartidas por varias peticiones, que no deben heredar el de una sola).
+    """
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def remaining_timeout(default: Optional[float] = None) -> Optional[float]:
+    """Timeout a usar en una llamada externa: `default` acotado por el deadline actual"""
+    deadline = current_deadline()
+    if deadline is None:
+        return default
+    return deadline.timeout(default)
+
+
+async def run_with_deadline(awaitable: Awaitable[Any], deadline: Optional[Deadline]) -> Any:
+    """
+    Ejecuta `awaitable` con `deadline` como deadline actual y lo cancela en cuanto
+    se agota el presupuesto (incluidas las etapas que sigan en curso).
+    """
+    if deadline is None:
+        return await awaitable
+    with deadline_scope(deadline):
+        try:
+            return await asyncio.wait_for(awaitable, deadline.timeout())
+        except asyncio.TimeoutError as e:
+            if isinstance(e, DeadlineExceeded):
+                raise
+            raise DeadlineExceeded("Presupuesto de tiempo de la petición agotado") from e
+
+
+def budget_from_env(value: Optional[str]) -> Optional[Deadline]:
+    """Crea un deadline a partir de un presupuesto en segundos configurado (vacío o 0 = sin deadline)"""
+    seconds = float(value) if value else 0.0
+    return Deadline.after(seconds) if seconds > 0 else None
@@ -0,0 +1,123 @@
+# infrastructure/runtime/rate_limit.py
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, Hashable, Optional
+
+
+class TokenBucket:
+    """Límite de tasa (`rate` por segundo) que admite ráfagas de hasta `burst`"""
+
+    def __init__(self, rate: float, burst: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        """Espera a que haya un token; devuelve los segundos esperados"""
+        waited = 0.0
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return waited
+            delay = (1 - self.tokens) / self.rate
+            waited += delay
+            await asyncio.sleep(delay)
+
+
+@dataclass
+class _DestinationState:
+    semaphore: asyncio.Semaphore
+    next_at: float = 0.0
+    users: int = 0
+
+
+class KeyedLimiter:
+    """
+    Límites por destino para enviar a plataformas de mensajería:
+
+    - como mucho `per_key_concurrency` envíos simultáneos al mismo destino (1 = en
+      orden) separados al menos `per_key_interval` segundos;
+    - una tasa por grupo (`group_rate`/s, p. ej. por bot o número emisor);
+    - como mucho `max_concurrency` envíos en curso en total.
+
+    El estado de un destino se descarta cuando queda inactivo.
+    """
+
+    def __init__(
+        self,
+        per_key_interval: float = 0.0,
+        per_key_concurrency: int = 1,
+        group_rate: Optional[float] = None,
+        group_burst: float = 1.0,
+        max_concurrency: int = 20,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.per_key_interval = per_key_interval
+        self.per_key_concurrency = per_key_concurrency
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.clock = clock
+        self._keys: Dict[Hashable, _DestinationState] = {}
+        self._groups: Dict[Hashable, TokenBucket] = {}
+        self._total = asyncio.Semaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.throttled_seconds = 0.0
+
+    @asynccontextmanager
+    async def slot(self, key: Hashable, group: Hashable = None) -> AsyncIterator[None]:
+        state = self._keys.get(key)
+        if state is None:
+            state = _DestinationState(asyncio.Semaphore(self.per_key_concurrency))
+            self._keys[key] = state
+        state.users += 1
+        try:
+            async with state.semaphore:
+                wait = state.next_at - self.clock()
+                if wait > 0:
+                    self.throttled_seconds += wait
+                    await asyncio.sleep(wait)
+                if self.group_rate:
+                    bucket = self._groups.get(group)
+                    if bucket is None:
+                        bucket = TokenBucket(self.group_rate, self.group_burst, self.clock)
+                        self._groups[group] = bucket
+                    self.throttled_seconds += await bucket.acquire()
+                async with self._total:
+                    try:
+                        yield
+                    finally:
+                        state.next_at = self.clock() + self.per_key_interval
+        finally:
+            state.users -= 1
+            if state.users == 0:
+                self._schedule_release(key, state)
+
+    def _schedule_release(self, key: Hashable, state: _DestinationState) -> None:
+        delay = state.next_at - self.clock()
+        if delay <= 0:
+            self._keys.pop(key, None)
+            return
+        # Se conserva hasta que pase el intervalo mínimo del destino
+        asyncio.get_running_loop().call_later(delay, self._release_if_idle, key, state)
+
+    def _release_if_idle(self, key: Hashable, state: _DestinationState) -> None:
+        if state.users == 0 and self._keys.get(key) is state:
+            del self._keys[key]
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "destinations": len(self._keys),
+            "groups": len(self._groups),
+            "max_concurrency": self.max_concurrency,
+            "throttled_seconds": self.throttled_seconds
+        }
@@ -0,0 +1,220 @@
+# infrastructure/runtime/resilience.py
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """El circuito del servicio externo está abierto: se falla sin llamarlo"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por servicio externo.
+    - closed: las llamadas pasan; `failure_threshold` fallos seguidos lo abren
+    - open: las llamadas fallan al instante con CircuitOpenError durante `recovery_timeout`
+    - half_open: se dejan pasar `half_open_max_calls` llamadas de prueba; si tienen
+      éxito se cierra, si fallan se vuelve a abrir
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._half_open_calls = 0
+        self.times_opened = 0
+        self.rejected = 0
+        self.successes = 0
+        self.failures = 0
+
+    def before_call(self) -> None:
+        if self.state == OPEN:
+            if self._clock() - self.opened_at < self.recovery_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuito abierto para '{self.name}'")
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            if self._half_open_calls >= self.half_open_max_calls:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuito de '{self.name}' en prueba (half-open)")
+            self._half_open_calls += 1
+
+    def record_success(self) -> None:
+        self.successes += 1
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            self._transition(CLOSED)
+
+    def release(self) -> None:
+        """La llamada se canceló sin resultado: libera su turno de prueba"""
+        if self.state == HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(f"Circuit breaker '{self.name}': {self.state} -> {state}")
+        self.state = state
+        self._half_open_calls = 0
+        if state == OPEN:
+            self.opened_at = self._clock()
+            self.times_opened += 1
+        elif state == CLOSED:
+            self.consecutive_failures = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "successes": self.successes,
+            "failures": self.failures
+        }
+
+
+class LatencyTracker:
+    """Ventana deslizante de latencias recientes para calcular percentiles"""
+
+    def __init__(self, window: int = 256):
+        self._samples: deque = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class ResilientCall:
+    """
+    Envuelve las llamadas a un servicio externo con circuit breaker y, para
+    operaciones idempotentes, hedging: si la llamada no responde dentro del p95
+    observado se lanza un duplicado y se usa la primera respuesta exitosa.
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        hedge: bool = False,
+        hedge_percentile: float = 95.0,
+        hedge_min_delay: float = 0.05,
+        hedge_min_samples: int = 20,
+        is_failure: Callable[[BaseException], bool] = lambda e: True
+    ):
+        self.breaker = breaker
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.is_failure = is_failure
+        self.latency = LatencyTracker()
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        if not self.hedge or len(self.latency) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latency.percentile(self.hedge_percentile))
+
+    async def run(self, call: Callable[[], Awaitable[Any]], idempotent: bool = False) -> Any:
+        self.breaker.before_call()
+        delay = self.hedge_delay() if idempotent else None
+        try:
+            if delay is None:
+                result = await self._timed(call)
+            else:
+                result = await self._hedged(call, delay)
+        except Exception as e:
+            if self.is_failure(e):
+                self.breaker.record_failure()
+            else:
+                # Error del llamador (4xx, deadline): no dice nada del servicio, así que
+                # no cierra un circuito en prueba; solo libera el turno
+                self.breaker.release()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def _timed(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        result = await call()
+        self.latency.record(time.perf_counter() - started)
+        return result
+
+    async def _hedged(self, call: Callable[[], Awaitable[Any]], delay: float) -> Any:
+        tasks = [asyncio.ensure_future(self._timed(call))]
+        try:
+            # El try cubre también la espera inicial: si se cancela al llamador (deadline
+            # agotado) no queda ninguna llamada huérfana
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return tasks[0].result()
+
+            self.hedges_sent += 1
+            hedge = asyncio.ensure_future(self._timed(call))
+            tasks.append(hedge)
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            unfinished = [task for task in tasks if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            if unfinished:
+                await asyncio.gather(*unfinished, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.breaker.stats(),
+            "p95_ms": (self.latency.percentile(95) or 0.0) * 1000,
+            "hedging": self.hedge,
+            "hedges_sent": self.hedges_sent,
+            "hedge_wins": self.hedge_wins,
+            "hedge_win_rate": self.hedge_wins / self.hedges_sent if self.hedges_sent else 0.0
+        }
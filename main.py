@@ -3,10 +3,18 @@ import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import logging
-from infrastructure.config.database import init_db
+from infrastructure.config.database import init_db, dispose_async_engine
 from infrastructure.config.di import get_websocket_adapter
 from infrastructure.config.di import get_message_receiver
+from infrastructure.config.di import init_http_pool, close_http_pool, close_db_executor, close_message_writer
+from infrastructure.config.di import init_container, close_container
+from infrastructure.config.di import init_message_queue, close_message_queue
 from api.endpoints.chat import router as chat_router
+from api.endpoints.config_cache import router as config_cache_router
+from api.endpoints.resilience import router as resilience_router
+from api.endpoints.database import router as database_router
+from api.endpoints.history import router as history_router
+from api.endpoints.channels import router as channels_router
 import grpc
 from concurrent import futures
 from proto import chat_pb2_grpc
@@ -33,6 +41,16 @@ app.add_middleware(
 
 # Incluir endpoints REST (webhooks)
 app.include_router(chat_router, prefix="/api/v1")
+# Invalidación de la caché de configuración (llamado desde Django)
+app.include_router(config_cache_router, prefix="/api/v1")
+# Métricas de circuit breakers y hedging
+app.include_router(resilience_router, prefix="/api/v1")
+# Métricas del pool de hilos de la base de datos
+app.include_router(database_router, prefix="/api/v1")
+# Historial de conversaciones (paginado y exportación)
+app.include_router(history_router, prefix="/api/v1")
+# Métricas de los envíos salientes por canal
+app.include_router(channels_router, prefix="/api/v1")
 
 # Agregar esta función
 
@@ -63,15 +81,23 @@ async def startup_event():
     """Inicialización del servicio"""
     global grpc_server
     try:
-        # 1. Base de datos
+        # 1. Base de datos: solo se verifica, el esquema lo aplica `alembic upgrade head`
         init_db()
-        logger.info("Base de datos inicializada")
+        logger.info("Base de datos verificada")
+
+        # 2. Pool HTTP compartido para los servicios externos
+        init_http_pool()
+
+        # Adapters y caso de uso del proceso (se crean una sola vez)
+        init_container()
+        # Workers de los webhooks (solo con WEBHOOK_PROCESSING_MODE=async)
+        init_message_queue()
         
-        # 2. Iniciar servidor gRPC
+        # 3. Iniciar servidor gRPC
         grpc_server = await start_grpc_server()
         logger.info("Servidor gRPC iniciado")
 
-        # 3. Cliente WebSocket para WebFlux
+        # 4. Cliente WebSocket para WebFlux
         #websocket_adapter = get_websocket_adapter()
 
         # Tarea en segundo plano para conexión persistente
@@ -93,6 +119,15 @@ async def shutdown_event():
         if grpc_server:
             await grpc_server.stop(grace=5)
             logger.info("Servidor gRPC detenido")
+
+        # Procesar los mensajes encolados mientras siguen disponibles DB y pool HTTP
+        await close_message_queue()
+        close_container()
+        await close_http_pool()
+        # Drenar el buffer de mensajes antes de cerrar engine y pool de hilos
+        await close_message_writer()
+        await dispose_async_engine()
+        close_db_executor()
         
         logger.info("Servicio apagado correctamente")
     except Exception as e:
@@ -0,0 +1,217 @@
+# scripts/benchmark_query_plans.py
+"""
+Planes de ejecución de las consultas calientes del chat sobre un dataset sembrado
+de millones de mensajes, con y sin los índices de las migraciones.
+
+Siembra un negocio nuevo (usuarios, 5 conversaciones por usuario con una activa y
+mensajes repartidos, más una conversación "larga") y ejecuta EXPLAIN (ANALYZE,
+BUFFERS) de cada consulta. La variante sin índices los elimina dentro de una
+transacción que se revierte: usar una base de pruebas, no producción (toma locks
+exclusivos mientras dura).
+
+Uso (con el esquema en `alembic upgrade head`):
+    python -m scripts.benchmark_query_plans --users 20000 --messages 2000000
+    python -m scripts.benchmark_query_plans --business-id <uuid> --skip-seed
+    python -m scripts.benchmark_query_plans --business-id <uuid> --cleanup
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+from infrastructure.config.database import engine  # noqa: E402
+
+# Índices que se eliminan para la comparación (constraint o índice)
+INDEXES = [
+    "ALTER TABLE chat_end_users DROP CONSTRAINT uq_chat_end_users_identity",
+    "DROP INDEX uq_chat_conversations_active_user",
+    "DROP INDEX ix_chat_messages_conversation_timestamp"
+]
+
+QUERIES = {
+    "usuario por identidad": """
+        SELECT * FROM chat_end_users
+        WHERE external_id = :external_id AND channel = 'whatsapp' AND business_id = :business_id
+        LIMIT 1
+    """,
+    "conversación activa": """
+        SELECT * FROM chat_conversations
+        WHERE end_user_id = :end_user_id AND business_id = :business_id
+          AND is_active = true AND started_at >= :threshold
+        ORDER BY started_at DESC
+        LIMIT 1
+    """,
+    "historial, primera página": """
+        SELECT * FROM chat_messages
+        WHERE conversation_id = :conversation_id
+        ORDER BY timestamp, id
+        LIMIT 50
+    """,
+    "historial, página por keyset": """
+        SELECT * FROM chat_messages
+        WHERE conversation_id = :conversation_id
+          AND (timestamp, id) > (:after_timestamp, :after_id)
+        ORDER BY timestamp, id
+        LIMIT 50
+    """
+}
+
+
+def seed(connection, business_id: str, users: int, messages: int, long_conversation: int) -> None:
+    started = time.perf_counter()
+    connection.execute(text("""
+        INSERT INTO chat_end_users (id, business_id, external_id, channel, custommetadata, created_at, updated_at)
+        SELECT gen_random_uuid(), :business_id, 'bench-' || g, 'whatsapp', '{}', now(), now()
+        FROM generate_series(1, :users) g
+    """), {"business_id": business_id, "users": users})
+    # 5 conversaciones por usuario; solo la más reciente sigue activa
+    connection.execute(text("""
+        INSERT INTO chat_conversations
+            (id, end_user_id, business_id, channel, started_at, is_active, custommetadata, created_at, updated_at)
+        SELECT gen_random_uuid(), u.id, :business_id, 'whatsapp',
+               now() AT TIME ZONE 'utc' - make_interval(days => 5 - k), k = 5, '{}', now(), now()
+        FROM chat_end_users u, generate_series(1, 5) k
+        WHERE u.business_id = :business_id
+    """), {"business_id": business_id})
+    connection.execute(text("""
+        CREATE TEMP TABLE bench_conversations ON COMMIT DROP AS
+        SELECT row_number() OVER (ORDER BY id) - 1 AS n, id
+        FROM chat_conversations WHERE business_id = :business_id
+    """), {"business_id": business_id})
+    conversations = connection.execute(text("SELECT count(*) FROM bench_conversations")).scalar()
+    connection.execute(text("""
+        INSERT INTO chat_messages (id, conversation_id, sender_type, content, timestamp, custommetadata, created_at)
+        SELECT gen_random_uuid(), c.id, CASE WHEN g % 2 = 0 THEN 'user' ELSE 'bot' END,
+               'mensaje de prueba ' || g,
+               now() AT TIME ZONE 'utc' - make_interval(secs => :messages - g), '{}', now()
+        FROM generate_series(1, :messages) g
+        JOIN bench_conversations c ON c.n = g % :conversations
+    """), {"messages": messages, "conversations": conversations})
+    # Conversación larga (la activa del primer usuario) para el historial
+    connection.execute(text("""
+        INSERT INTO chat_messages (id, conversation_id, sender_type, content, timestamp, custommetadata, created_at)
+        SELECT gen_random_uuid(), c.id, 'user', 'mensaje largo ' || g,
+               now() AT TIME ZONE 'utc' - make_interval(secs => :count - g), '{}', now()
+        FROM generate_series(1, :count) g,
+             (SELECT conv.id FROM chat_conversations conv
+              JOIN chat_end_users u ON u.id = conv.end_user_id
+              WHERE u.business_id = :business_id AND u.external_id = 'bench-1' AND conv.is_active) c
+    """), {"count": long_conversation, "business_id": business_id})
+    connection.commit()
+    for table in ("chat_end_users", "chat_conversations", "chat_messages"):
+        connection.execute(text(f"ANALYZE {table}"))
+    connection.commit()
+    print(
+        f"Sembrados {users} usuarios, {conversations} conversaciones y "
+        f"{messages + long_conversation} mensajes en {time.perf_counter() - started:.1f}s"
+    )
+
+
+def parameters(connection, business_id: str) -> dict:
+    row = connection.execute(text("""
+        SELECT u.id AS end_user_id, c.id AS conversation_id
+        FROM chat_end_users u
+        JOIN chat_conversations c ON c.end_user_id = u.id AND c.is_active
+        WHERE u.business_id = :business_id AND u.external_id = 'bench-1'
+    """), {"business_id": business_id}).one()
+    # Cursor a mitad de la conversación larga: página profunda
+    after = connection.execute(text("""
+        SELECT timestamp, id FROM chat_messages
+        WHERE conversation_id = :conversation_id
+        ORDER BY timestamp, id
+        OFFSET (SELECT count(*) / 2 FROM chat_messages WHERE conversation_id = :conversation_id)
+        LIMIT 1
+    """), {"conversation_id": row.conversation_id}).one()
+    # Usuario a mitad de la tabla: un Seq Scan no termina en las primeras filas
+    users = connection.execute(text(
+        "SELECT count(*) FROM chat_end_users WHERE business_id = :business_id"
+    ), {"business_id": business_id}).scalar()
+    return {
+        "business_id": business_id,
+        "external_id": f"bench-{users // 2}",
+        "end_user_id": row.end_user_id,
+        "conversation_id": row.conversation_id,
+        "threshold": datetime.utcnow() - timedelta(days=30),
+        "after_timestamp": after.timestamp,
+        "after_id": after.id
+    }
+
+
+def plan_nodes(plan: dict) -> str:
+    """Resumen del plan: tipo de cada nodo y el índice que usa"""
+    node = plan["Node Type"]
+    if plan.get("Index Name"):
+        node += f" ({plan['Index Name']})"
+    children = [plan_nodes(child) for child in plan.get("Plans", [])]
+    return node + (" > " + ", ".join(children) if children else "")
+
+
+def explain(connection, params: dict) -> dict:
+    results = {}
+    for name, sql in QUERIES.items():
+        result = connection.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar()
+        plan = result[0]
+        results[name] = {
+            "ms": plan["Execution Time"],
+            "buffers": plan["Plan"].get("Shared Hit Blocks", 0) + plan["Plan"].get("Shared Read Blocks", 0),
+            "plan": plan_nodes(plan["Plan"])
+        }
+    return results
+
+
+def cleanup(connection, business_id: str) -> None:
+    connection.execute(text("""
+        DELETE FROM chat_messages m USING chat_conversations c
+        WHERE m.conversation_id = c.id AND c.business_id = :business_id
+    """), {"business_id": business_id})
+    connection.execute(text("DELETE FROM chat_conversations WHERE business_id = :business_id"), {"business_id": business_id})
+    connection.execute(text("DELETE FROM chat_end_users WHERE business_id = :business_id"), {"business_id": business_id})
+    connection.commit()
+    print(f"Datos del negocio {business_id} eliminados")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--messages", type=int, default=2000000)
+    parser.add_argument("--long-conversation", type=int, default=100000)
+    parser.add_argument("--business-id", default=None, help="Negocio ya sembrado (con --skip-seed o --cleanup)")
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--cleanup", action="store_true", help="Elimina los datos sembrados y termina")
+    args = parser.parse_args()
+
+    business_id = args.business_id or str(uuid.uuid4())
+    with engine.connect() as connection:
+        if args.cleanup:
+            cleanup(connection, business_id)
+            return
+        if not args.skip_seed:
+            seed(connection, business_id, args.users, args.messages, args.long_conversation)
+        print(f"business_id: {business_id}")
+        params = parameters(connection, business_id)
+        connection.commit()
+
+        # Una pasada de calentamiento para comparar con la caché de páginas caliente
+        explain(connection, params)
+        with_indexes = explain(connection, params)
+        connection.commit()
+
+        for statement in INDEXES:
+            connection.execute(text(statement))
+        without_indexes = explain(connection, params)
+        connection.rollback()
+
+    for name in QUERIES:
+        print(f"\n{name}")
+        for label, results in (("sin índices", without_indexes), ("con índices", with_indexes)):
+            result = results[name]
+            print(f"  {label:>11}: {result['ms']:9.3f} ms | {result['buffers']:7d} bloques | {result['plan']}")
+
+
+if __name__ == "__main__":
+    main()
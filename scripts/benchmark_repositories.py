@@ -0,0 +1,122 @@
+# scripts/benchmark_repositories.py
+"""
+Mide cuánto bloquean el event loop los repositorios sync (psycopg2), threaded
+(psycopg2 en un pool de hilos) y async (asyncpg) con consultas de solo lectura
+concurrentes contra la base real.
+
+Un "ticker" duerme 1 ms en bucle: cualquier retraso extra sobre ese 1 ms es
+tiempo en que el loop estuvo bloqueado y no pudo atender gRPC ni webhooks.
+
+Uso:
+    python -m scripts.benchmark_repositories --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infrastructure.config.database import (  # noqa: E402
+    SessionLocal,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    get_async_session_factory,
+    dispose_async_engine
+)
+from infrastructure.persistence.repositories import DatabaseEndUserRepository  # noqa: E402
+from infrastructure.persistence.async_repositories import AsyncDatabaseEndUserRepository  # noqa: E402
+from infrastructure.persistence.threaded_repositories import (  # noqa: E402
+    DatabaseExecutor,
+    ThreadedEndUserRepository
+)
+
+TICK = 0.001
+
+
+async def ticker(stop: asyncio.Event, lags: list) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(max(0.0, time.perf_counter() - started - TICK))
+
+
+async def run_backend(name: str, make_repo, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    business_id = str(uuid.uuid4())
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            # Usuario inexistente: consulta de solo lectura que recorre el índice
+            await make_repo().get_by_external_id(f"bench-{i}", "websocket", business_id)
+
+    # Calentar el pool de conexiones antes de medir
+    await one(-1)
+
+    lags: list = []
+    stop = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(stop, lags))
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await tick_task
+
+    lags.sort()
+    return {
+        "backend": name,
+        "elapsed_s": elapsed,
+        "throughput_rps": requests / elapsed,
+        "blocked_total_s": sum(lags),
+        "blocked_ratio": sum(lags) / elapsed,
+        "lag_p50_ms": lags[len(lags) // 2] * 1000 if lags else 0.0,
+        "lag_p99_ms": lags[int(len(lags) * 0.99)] * 1000 if lags else 0.0,
+        "lag_max_ms": lags[-1] * 1000 if lags else 0.0
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    executor = DatabaseExecutor(SessionLocal, max_workers=DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    results = [
+        await run_backend(
+            "sync",
+            lambda: DatabaseEndUserRepository(SessionLocal()),
+            args.requests,
+            args.concurrency
+        ),
+        await run_backend(
+            "threaded",
+            lambda: ThreadedEndUserRepository(executor),
+            args.requests,
+            args.concurrency
+        ),
+        await run_backend(
+            "async",
+            lambda: AsyncDatabaseEndUserRepository(get_async_session_factory()),
+            args.requests,
+            args.concurrency
+        )
+    ]
+    await dispose_async_engine()
+    print(f"executor: {executor.stats()}")
+    executor.shutdown()
+
+    for result in results:
+        print(
+            f"{result['backend']:>8}: {result['throughput_rps']:.1f} req/s | "
+            f"loop bloqueado {result['blocked_total_s']:.2f}s "
+            f"({result['blocked_ratio']:.0%} del tiempo) | "
+            f"lag p50 {result['lag_p50_ms']:.1f} ms, p99 {result['lag_p99_ms']:.1f} ms, "
+            f"max {result['lag_max_ms']:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+# scripts/channel_api_stub.py
+"""
+Servidor local que imita los endpoints de envío de Telegram (sendMessage) y Twilio
+(Messages.json) para probar los envíos salientes sin tocar las plataformas reales.
+
+Simula latencia, errores 5xx y respuestas 429 con su tiempo de espera, y registra
+por destinatario los envíos simultáneos y el intervalo mínimo entre envíos para
+comprobar que se respetan los límites. GET /stats devuelve lo observado y
+POST /reset lo reinicia.
+
+Uso:
+    python -m scripts.channel_api_stub --port 8099 --latency-ms 150 --failure-rate 0.05 --rate-limit-rate 0.02
+    TELEGRAM_API_BASE_URL=http://localhost:8099 TWILIO_API_BASE_URL=http://localhost:8099 uvicorn main:app
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+class DestinationLog:
+    """Envíos en curso, máximo simultáneo e intervalo mínimo por destinatario"""
+
+    def __init__(self):
+        self.in_flight: Dict[str, int] = defaultdict(int)
+        self.max_in_flight: Dict[str, int] = defaultdict(int)
+        self.last_at: Dict[str, float] = {}
+        self.min_interval: Dict[str, float] = {}
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    def start(self, destination: str) -> None:
+        now = time.monotonic()
+        if destination in self.last_at:
+            interval = now - self.last_at[destination]
+            self.min_interval[destination] = min(self.min_interval.get(destination, interval), interval)
+        self.last_at[destination] = now
+        self.in_flight[destination] += 1
+        self.max_in_flight[destination] = max(self.max_in_flight[destination], self.in_flight[destination])
+
+    def finish(self, destination: str) -> None:
+        self.in_flight[destination] -= 1
+
+    def stats(self) -> Dict:
+        return {
+            **self.counters,
+            "destinations": len(self.last_at),
+            "max_concurrent_per_destination": max(self.max_in_flight.values(), default=0),
+            "min_interval_per_destination_s": round(min(self.min_interval.values()), 3) if self.min_interval else None
+        }
+
+
+def create_app(latency_ms: float, failure_rate: float, rate_limit_rate: float, retry_after: int) -> FastAPI:
+    app = FastAPI(title="Channel API stub")
+    logs = {"telegram": DestinationLog(), "twilio": DestinationLog()}
+
+    async def simulate(platform: str, destination: str):
+        """Devuelve la respuesta de error a simular o None si el envío se acepta"""
+        log = logs[platform]
+        log.start(destination)
+        try:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * latency_ms / 1000)
+            roll = random.random()
+            if roll < rate_limit_rate:
+                log.counters["rate_limited"] += 1
+                return 429
+            if roll < rate_limit_rate + failure_rate:
+                log.counters["failed"] += 1
+                return 500
+            log.counters["accepted"] += 1
+            return None
+        finally:
+            log.finish(destination)
+
+    @app.post("/bot{token}/sendMessage")
+    async def telegram_send(token: str, request: Request):
+        payload = await request.json()
+        chat_id = str(payload.get("chat_id", ""))
+        error = await simulate("telegram", f"{token}:{chat_id}")
+        if error == 429:
+            return JSONResponse(status_code=429, content={
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {retry_after}",
+                "parameters": {"retry_after": retry_after}
+            })
+        if error:
+            return JSONResponse(status_code=error, content={"ok": False, "error_code": error})
+        return {"ok": True, "result": {"message_id": random.randint(1, 10 ** 9), "chat": {"id": chat_id}}}
+
+    @app.post("/2010-04-01/Accounts/{account_sid}/Messages.json")
+    async def twilio_send(account_sid: str, request: Request):
+        form = await request.form()
+        error = await simulate("twilio", str(form.get("To", "")))
+        if error == 429:
+            return JSONResponse(
+                status_code=429,
+                headers={"Retry-After": str(retry_after)},
+                content={"code": 20429, "message": "Too Many Requests", "status": 429}
+            )
+        if error:
+            return JSONResponse(status_code=error, content={"code": 20500, "status": error})
+        return JSONResponse(status_code=201, content={
+            "sid": f"SM{uuid.uuid4().hex}",
+            "to": form.get("To"),
+            "from": form.get("From"),
+            "status": "queued"
+        })
+
+    @app.get("/stats")
+    async def stats():
+        return {platform: log.stats() for platform, log in logs.items()}
+
+    @app.post("/reset")
+    async def reset():
+        for platform in logs:
+            logs[platform] = DestinationLog()
+        return {"status": "reset"}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Proporción de respuestas 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Proporción de respuestas 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Segundos de espera indicados en los 429")
+    args = parser.parse_args()
+    app = create_app(args.latency_ms, args.failure_rate, args.rate_limit_rate, args.retry_after)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
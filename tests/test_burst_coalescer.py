@@ -0,0 +1,130 @@
+# tests/test_burst_coalescer.py
+import asyncio
+import uuid
+from datetime import datetime
+import pytest
+from core.domain.entities import Message
+from core.use_cases.burst_coalescer import BurstCoalescer
+
+
+def make_message(content: str) -> Message:
+    return Message(
+        id=uuid.uuid4(),
+        conversation_id=uuid.uuid4(),
+        sender_type="user",
+        content=content,
+        timestamp=datetime.utcnow()
+    )
+
+
+async def join_after(coalescer: BurstCoalescer, delay: float, key, content: str, window: float):
+    await asyncio.sleep(delay)
+    return await coalescer.join(key, make_message(content), window)
+
+
+async def test_last_message_of_a_burst_receives_all_of_them():
+    coalescer = BurstCoalescer(max_wait=5)
+    loop = asyncio.get_running_loop()
+    began = loop.time()
+
+    results = await asyncio.gather(
+        join_after(coalescer, 0.00, "conv", "hola", 0.1),
+        join_after(coalescer, 0.03, "conv", "quería saber", 0.1),
+        join_after(coalescer, 0.06, "conv", "el precio del plan", 0.1)
+    )
+
+    assert results[0] is None and results[1] is None
+    assert [m.content for m in results[2]] == ["hola", "quería saber", "el precio del plan"]
+    # Debounce por el final: la ventana cuenta desde el último mensaje
+    assert loop.time() - began == pytest.approx(0.16, abs=0.05)
+    assert coalescer.stats() == {"open_bursts": 0, "bursts": 1, "messages": 3, "coalesced": 2}
+
+
+async def test_conversations_are_coalesced_independently():
+    coalescer = BurstCoalescer(max_wait=5)
+
+    first, second = await asyncio.gather(
+        join_after(coalescer, 0.0, "a", "uno", 0.05),
+        join_after(coalescer, 0.0, "b", "dos", 0.05)
+    )
+
+    assert [m.content for m in first] == ["uno"]
+    assert [m.content for m in second] == ["dos"]
+
+
+async def test_max_wait_caps_a_continuous_burst():
+    coalescer = BurstCoalescer(max_wait=0.2)
+    # Un mensaje cada 40 ms con ventana de 100 ms: sin tope no se cerraría nunca
+    results = await asyncio.gather(*[
+        join_after(coalescer, position * 0.04, "conv", str(position), 0.1)
+        for position in range(10)
+    ])
+
+    bursts = [burst for burst in results if burst is not None]
+    assert len(bursts) >= 2
+    # Ningún mensaje se pierde ni se responde dos veces, y el orden se mantiene
+    contents = [m.content for burst in bursts for m in burst]
+    assert contents == [str(position) for position in range(10)]
+    assert len(bursts[0]) <= 6
+    assert coalescer.stats()["open_bursts"] == 0
+
+
+async def test_cancelling_the_closing_waiter_hands_the_burst_to_an_earlier_one():
+    coalescer = BurstCoalescer(max_wait=5)
+    first = asyncio.ensure_future(coalescer.join("conv", make_message("hola"), 0.1))
+    await asyncio.sleep(0.02)
+    closer = asyncio.ensure_future(coalescer.join("conv", make_message("precio"), 0.1))
+    await asyncio.sleep(0.02)
+
+    closer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await closer
+
+    burst = await asyncio.wait_for(first, 1)
+    assert [m.content for m in burst] == ["hola", "precio"]
+    assert coalescer.stats()["open_bursts"] == 0
+
+
+async def test_cancelling_the_only_waiter_discards_the_burst():
+    coalescer = BurstCoalescer(max_wait=5)
+    waiter = asyncio.ensure_future(coalescer.join("conv", make_message("hola"), 0.1))
+    await asyncio.sleep(0.01)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert coalescer.stats()["open_bursts"] == 0
+
+    # El siguiente mensaje abre una ráfaga nueva, sin el cancelado
+    burst = await coalescer.join("conv", make_message("otra"), 0.01)
+    assert [m.content for m in burst] == ["otra"]
+
+
+async def test_earlier_waiter_takes_over_when_the_closer_is_cancelled_after_its_window():
+    coalescer = BurstCoalescer(max_wait=5)
+    first = asyncio.ensure_future(coalescer.join("conv", make_message("hola"), 0.05))
+    await asyncio.sleep(0.03)
+    closer = asyncio.ensure_future(coalescer.join("conv", make_message("precio"), 0.05))
+    # Pasada la ventana del primero: ya cedió el cierre al segundo, que sigue esperando
+    await asyncio.sleep(0.04)
+    assert not first.done()
+
+    closer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await closer
+
+    burst = await asyncio.wait_for(first, 1)
+    assert [m.content for m in burst] == ["hola", "precio"]
+    assert coalescer.stats()["open_bursts"] == 0
+
+
+async def test_earlier_waiters_return_only_after_the_burst_is_flushed():
+    coalescer = BurstCoalescer(max_wait=5)
+    first = asyncio.ensure_future(coalescer.join("conv", make_message("hola"), 0.05))
+    await asyncio.sleep(0.03)
+    closer = asyncio.ensure_future(coalescer.join("conv", make_message("precio"), 0.05))
+
+    done, _ = await asyncio.wait({first}, timeout=0.04)
+    assert not done
+    assert await asyncio.wait_for(first, 1) is None
+    assert closer.done() and len(closer.result()) == 2
@@ -0,0 +1,95 @@
+# tests/test_stage_graph.py
+import asyncio
+import pytest
+from core.use_cases.stage_graph import StageGraph
+
+
+class StageFailed(Exception):
+    pass
+
+
+async def test_independent_stages_run_concurrently_and_receive_dependencies():
+    started = []
+
+    async def stage(name, value, **deps):
+        started.append(name)
+        await asyncio.sleep(0.05)
+        return value + sum(deps.values())
+
+    graph = StageGraph()
+    graph.add("a", lambda: stage("a", 1))
+    graph.add("b", lambda: stage("b", 10))
+    graph.add("c", lambda a, b: stage("c", 100, a=a, b=b), depends_on=["a", "b"])
+
+    loop = asyncio.get_running_loop()
+    began = loop.time()
+    results = await graph.run()
+
+    assert results == {"a": 1, "b": 10, "c": 111}
+    assert started[:2] == ["a", "b"] and started[2] == "c"
+    # a y b en paralelo: dos etapas de 50 ms seguidas, no tres
+    assert loop.time() - began < 0.14
+
+
+async def test_failure_cancels_running_stages_and_propagates_original_exception():
+    error = StageFailed("contexto no disponible")
+    slow_cancelled = asyncio.Event()
+    dependent_started = False
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            slow_cancelled.set()
+            raise
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise error
+
+    async def dependent(failing):
+        nonlocal dependent_started
+        dependent_started = True
+
+    graph = StageGraph()
+    graph.add("slow", slow)
+    graph.add("failing", failing)
+    graph.add("dependent", dependent, depends_on=["failing"])
+
+    with pytest.raises(StageFailed) as raised:
+        await asyncio.wait_for(graph.run(), 1)
+
+    assert raised.value is error
+    assert slow_cancelled.is_set()
+    assert not dependent_started
+
+
+async def test_cancelling_run_cancels_running_stages():
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    graph = StageGraph().add("slow", slow)
+    task = asyncio.ensure_future(graph.run())
+    await asyncio.sleep(0.01)
+    task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert cancelled.is_set()
+
+
+def test_add_rejects_duplicates_and_undeclared_dependencies():
+    async def noop(**_):
+        return None
+
+    graph = StageGraph().add("a", noop)
+    with pytest.raises(ValueError):
+        graph.add("a", noop)
+    with pytest.raises(ValueError):
+        graph.add("b", noop, depends_on=["missing"])
@@ -0,0 +1,193 @@
+# tests/test_write_behind.py
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+import pytest
+from sqlalchemy.exc import DBAPIError
+from core.domain.entities import Message
+from core.ports.outbound.repositories import IMessageRepository
+from infrastructure.persistence.unit_of_work import SyncUnitOfWork
+from infrastructure.persistence.write_behind import WriteBehindMessageRepository
+
+_BASE_TIME = datetime(2024, 1, 1)
+
+
+def make_message(position: int, conversation_id: uuid.UUID = None) -> Message:
+    return Message(
+        id=uuid.uuid4(),
+        conversation_id=conversation_id or uuid.uuid4(),
+        sender_type="user",
+        content=f"mensaje {position}",
+        timestamp=_BASE_TIME + timedelta(seconds=position)
+    )
+
+
+class _PgError(Exception):
+    def __init__(self, pgcode: str):
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+
+def permanent_error() -> DBAPIError:
+    # 23503: violación de clave foránea (error del mensaje, no de la base de datos)
+    return DBAPIError("INSERT INTO chat_messages ...", {}, _PgError("23503"))
+
+
+class FakeMessageRepository(IMessageRepository):
+    """Repositorio en memoria que puede fallar los primeros lotes o rechazar mensajes"""
+
+    def __init__(self, transient_failures: int = 0, rejected: tuple = (), delay: float = 0.0):
+        self.transient_failures = transient_failures
+        self.rejected = set(rejected)
+        self.delay = delay
+        self.batches: List[List[Message]] = []
+        self.stored: List[Message] = []
+
+    async def create(self, message: Message) -> Message:
+        self.stored.append(message)
+        return message
+
+    async def create_many(self, messages: List[Message]) -> List[Message]:
+        await asyncio.sleep(self.delay)
+        if self.transient_failures:
+            self.transient_failures -= 1
+            raise ConnectionError("base de datos no disponible")
+        if any(message.id in self.rejected for message in messages):
+            raise permanent_error()
+        self.batches.append(list(messages))
+        self.stored.extend(messages)
+        return messages
+
+    async def get_by_conversation(self, conversation_id):
+        return [m for m in self.stored if m.conversation_id == conversation_id]
+
+    async def get_page(self, conversation_id, limit=50, after=None):
+        return (await self.get_by_conversation(conversation_id))[:limit]
+
+    async def stream_by_conversation(self, conversation_id, batch_size=500):
+        for message in await self.get_by_conversation(conversation_id):
+            yield message
+
+
+class FakeSession:
+    """Session mínima para SyncUnitOfWork: commit y rollback no hacen nada"""
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+async def test_messages_are_written_in_batches_and_visible_before_flush():
+    inner = FakeMessageRepository()
+    repo = WriteBehindMessageRepository(inner, batch_size=3, flush_interval=0.01)
+    conversation_id = uuid.uuid4()
+    messages = [make_message(i, conversation_id) for i in range(7)]
+
+    for message in messages:
+        await repo.create(message)
+    # Aún en el buffer: las lecturas ya los incluyen
+    assert [m.id for m in await repo.get_by_conversation(conversation_id)] == [m.id for m in messages]
+
+    await repo.aclose(1)
+    assert [m.id for m in inner.stored] == [m.id for m in messages]
+    assert max(len(batch) for batch in inner.batches) == 3
+
+
+async def test_transient_failures_requeue_the_batch_in_order():
+    inner = FakeMessageRepository(transient_failures=2)
+    repo = WriteBehindMessageRepository(inner, batch_size=4, flush_interval=0.01, retry_delay=0.01)
+    messages = [make_message(i) for i in range(6)]
+
+    for message in messages:
+        await repo.create(message)
+    await repo.aclose(1)
+
+    assert [m.id for m in inner.stored] == [m.id for m in messages]
+    stats = repo.stats()
+    assert stats["retries"] == 2
+    assert stats["written"] == 6
+    assert stats["dropped"] == 0
+
+
+async def test_permanent_error_drops_only_the_invalid_message():
+    messages = [make_message(i) for i in range(5)]
+    invalid = messages[2]
+    inner = FakeMessageRepository(rejected=(invalid.id,))
+    repo = WriteBehindMessageRepository(inner, batch_size=5, flush_interval=0.01, retry_delay=0.01)
+
+    for message in messages:
+        await repo.create(message)
+    await repo.aclose(1)
+
+    assert [m.id for m in inner.stored] == [m.id for m in messages if m is not invalid]
+    stats = repo.stats()
+    assert stats["dropped"] == 1
+    assert stats["retries"] == 0
+    assert stats["buffered"] == stats["in_flight"] == stats["reserved"] == 0
+
+
+async def test_aclose_drains_everything_buffered():
+    inner = FakeMessageRepository(delay=0.005)
+    # flush_interval largo: solo el cierre fuerza la escritura
+    repo = WriteBehindMessageRepository(inner, batch_size=50, flush_interval=60)
+    messages = [make_message(i) for i in range(120)]
+
+    for message in messages:
+        await repo.create(message)
+    await repo.aclose(2)
+
+    assert len(inner.stored) == 120
+    assert repo.stats()["buffered"] == 0
+    # Después del cierre create() escribe directamente
+    late = make_message(999)
+    await repo.create(late)
+    assert inner.stored[-1] is late
+
+
+async def test_rolled_back_messages_are_never_written():
+    inner = FakeMessageRepository()
+    repo = WriteBehindMessageRepository(inner, batch_size=10, flush_interval=0.01)
+    unit_of_work = SyncUnitOfWork(FakeSession())
+    kept, discarded = make_message(1), make_message(2)
+
+    async with unit_of_work.transaction():
+        await repo.create(kept)
+    with pytest.raises(RuntimeError):
+        async with unit_of_work.transaction():
+            await repo.create(discarded)
+            raise RuntimeError("fallo del turno")
+    await repo.aclose(1)
+
+    assert [m.id for m in inner.stored] == [kept.id]
+    assert repo.stats()["reserved"] == 0
+
+
+async def test_max_buffer_bounds_open_transactions_and_requeued_batches():
+    inner = FakeMessageRepository(transient_failures=3, delay=0.002)
+    repo = WriteBehindMessageRepository(
+        inner, max_buffer=8, batch_size=3, flush_interval=0.005, retry_delay=0.01
+    )
+    unit_of_work = SyncUnitOfWork(FakeSession())
+    peak = 0
+
+    async def turn(position: int):
+        nonlocal peak
+        async with unit_of_work.transaction():
+            await repo.create(make_message(position))
+            stats = repo.stats()
+            peak = max(peak, stats["buffered"] + stats["in_flight"] + stats["reserved"])
+            # Transacción abierta un rato: otras pasan por create() mientras tanto
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(asyncio.gather(*[turn(i) for i in range(60)]), 5)
+    await repo.aclose(2)
+
+    assert peak <= 8
+    assert len(inner.stored) == 60
+    assert repo.stats()["backpressure_waits"] > 0
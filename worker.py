@@ -0,0 +1,52 @@
+# worker.py
+"""
+Worker de la cola durable de mensajes (WEBHOOK_PROCESSING_MODE=durable).
+
+Procesa los mensajes que los webhooks dejan en chat_inbound_jobs y envía las
+respuestas. Se escala aparte del front HTTP/gRPC de main.py arrancando más
+réplicas:
+    python worker.py
+"""
+import asyncio
+import logging
+import signal
+from infrastructure.config.database import init_db, dispose_async_engine
+from infrastructure.config.di import (
+    init_http_pool,
+    close_http_pool,
+    init_container,
+    close_container,
+    close_message_writer,
+    close_db_executor,
+    build_queue_worker
+)
+import os
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    init_db()
+    init_http_pool()
+    init_container()
+    worker = build_queue_worker()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await worker.run(stop, drain_timeout=float(os.getenv("MESSAGE_QUEUE_DRAIN_SECONDS", "30")))
+    finally:
+        logger.info(f"Worker detenido: {worker.stats()}")
+        close_container()
+        await close_http_pool()
+        await close_message_writer()
+        await dispose_async_engine()
+        close_db_executor()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())